@@ -1,8 +1,22 @@
 import re
+import os
 import json
 import random
+import asyncio
 import ollama
 
+# Keep this at (or below) the Ollama server's OLLAMA_NUM_PARALLEL, extra
+# requests would just queue on the server
+MAX_IN_FLIGHT = int(os.getenv("OLLAMA_NUM_PARALLEL", "2"))
+MAX_RETRIES = 2
+RETRY_BACKOFF_SECONDS = 1.0
+
+# Token budgeting (~4 characters per token for phi3 on English prose)
+CHARS_PER_TOKEN = 4
+MAX_CTX = int(os.getenv("LLM_MAX_CTX", "4096"))
+CTX_STEP = 512
+ANSWER_TOKENS = 1536
+
 class SimpleRAG:
     def __init__(self, srs_text):
         # Split by newlines or sentences, filtering out garbage
@@ -12,18 +26,35 @@ class SimpleRAG:
             if len(line.strip()) > 5
         ]
 
-    def get_batched_context(self, batch_size=20):
-        """Yields chunks of the SRS to avoid overwhelming the model context."""
-        for i in range(0, len(self.chunks), batch_size):
-            yield "\n".join(self.chunks[i:i + batch_size])
+    def get_batched_context(self, budget_tokens=None):
+        """
+        Yields batches of whole chunks, each small enough to fit the prompt
+        and its answer inside MAX_CTX.
+        """
+        budget_chars = (budget_tokens or _batch_budget()) * CHARS_PER_TOKEN
+        batch, size = [], 0
+        for chunk in self.chunks:
+            if batch and size + len(chunk) + 1 > budget_chars:
+                yield "\n".join(batch)
+                batch, size = [], 0
+            batch.append(chunk)
+            size += len(chunk) + 1
+        if batch:
+            yield "\n".join(batch)
 
-def generate_clean_epics_tasks(srs_text: str):
-    rag = SimpleRAG(srs_text)
-    all_epics = []
+def _estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
 
-    # Iterate through the SRS in batches to ensure the model "reads" everything
-    for context_batch in rag.get_batched_context(batch_size=15):
-        prompt = f"""
+def _batch_budget() -> int:
+    return MAX_CTX - _estimate_tokens(_build_prompt("")) - ANSWER_TOKENS
+
+def _num_ctx(prompt: str) -> int:
+    """Smallest num_ctx (in CTX_STEP increments) holding prompt + answer."""
+    needed = _estimate_tokens(prompt) + ANSWER_TOKENS
+    return min(MAX_CTX, -(-needed // CTX_STEP) * CTX_STEP)
+
+def _build_prompt(context_batch: str) -> str:
+    return f"""
         You are a Project Manager. Convert the following SRS requirements into a JSON list of Epics.
         
         Requirements:
@@ -33,29 +64,85 @@ def generate_clean_epics_tasks(srs_text: str):
         Each object must have: "epic_name", "description", and "tasks" (a list of objects with "task_name", "timeline_days", "status", "sequence").
         """
 
+async def _generate_batch(client, semaphore, index, context_batch, max_retries):
+    """Map step: one batch -> list of epics. Retries only this batch on failure."""
+    for attempt in range(max_retries + 1):
         try:
-            response = ollama.chat(
-                model="phi3:mini",
-                format="json", # Forces JSON output
-                messages=[{"role": "user", "content": prompt}],
-                options={"num_ctx": 4096, "temperature": 0.1} # Increased context window
-            )
-            
+            prompt = _build_prompt(context_batch)
+            async with semaphore:
+                response = await client.chat(
+                    model="phi3:mini",
+                    format="json", # Forces JSON output
+                    messages=[{"role": "user", "content": prompt}],
+                    options={"num_ctx": _num_ctx(prompt), "temperature": 0.1} # Sized to the batch
+                )
+
             batch_data = json.loads(response["message"]["content"])
             if isinstance(batch_data, list):
-                all_epics.extend(batch_data)
-            else:
-                all_epics.append(batch_data)
+                return index, batch_data
+            return index, [batch_data]
 
         except Exception as e:
-            print(f"Error processing batch: {e}")
+            print(f"Error processing batch {index} (attempt {attempt + 1}): {e}")
+            if attempt < max_retries:
+                await asyncio.sleep(RETRY_BACKOFF_SECONDS * (2 ** attempt))
 
-    # Final cleanup: Merge duplicate epics if they appeared in different batches
-    return merge_epics(all_epics)
+    return index, []
+
+async def iter_merged_epics(srs_text: str, budget_tokens=None, max_in_flight=MAX_IN_FLIGHT, max_retries=MAX_RETRIES):
+    """
+    Sends every SRS batch concurrently (at most max_in_flight at once) and
+    yields the merged epics each time the run of finished batches from the
+    start of the document grows. Each batch is folded into the accumulator
+    exactly once, in batch order, so earlier sequences never shift.
+    """
+    rag = SimpleRAG(srs_text)
+    client = ollama.AsyncClient()
+    semaphore = asyncio.Semaphore(max_in_flight)
+
+    jobs = [
+        asyncio.create_task(_generate_batch(client, semaphore, index, context_batch, max_retries))
+        for index, context_batch in enumerate(rag.get_batched_context(budget_tokens=budget_tokens))
+    ]
 
-def merge_epics(epics_list):
-    """Merges tasks from epics with the same name."""
     merged = {}
+    pending = {}
+    next_index = 0
+
+    for finished in asyncio.as_completed(jobs):
+        index, batch_epics = await finished
+        pending[index] = batch_epics
+
+        # Reduce in batch order so the output doesn't depend on timing: only
+        # the contiguous prefix of finished batches is folded in
+        if next_index not in pending:
+            continue
+
+        while next_index in pending:
+            merge_epics(pending.pop(next_index), merged)
+            next_index += 1
+
+        # Snapshot the task lists: the accumulator keeps growing after a yield
+        yield [{**epic, "tasks": list(epic["tasks"])} for epic in merged.values()]
+
+async def agenerate_clean_epics_tasks(srs_text: str, budget_tokens=None, max_in_flight=MAX_IN_FLIGHT):
+    merged = []
+    async for merged in iter_merged_epics(srs_text, budget_tokens, max_in_flight):
+        print(f"Merged {len(merged)} epics so far")
+    return merged
+
+def generate_clean_epics_tasks(srs_text: str):
+    # Batches are sent concurrently so the SRS costs ~N / max_in_flight calls
+    # of latency instead of N
+    return asyncio.run(agenerate_clean_epics_tasks(srs_text))
+
+def merge_epics(epics_list, merged=None):
+    """
+    Merges tasks from epics with the same name. Pass the merged dict of an
+    earlier call to fold more epics into it; the input task dicts are
+    copied, never modified.
+    """
+    merged = {} if merged is None else merged
     for entry in epics_list:
         name = entry.get("epic_name", "General")
         if name not in merged:
@@ -67,6 +154,7 @@ def merge_epics(epics_list):
         
         # Add tasks and ensure they have metadata
         for i, task in enumerate(entry.get("tasks", [])):
+            task = dict(task)
             task["timeline_days"] = task.get("timeline_days", random.randint(1, 5))
             task["status"] = "Backlog"
             task["sequence"] = len(merged[name]["tasks"]) + 1
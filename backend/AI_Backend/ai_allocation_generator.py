@@ -1,16 +1,33 @@
 import json
 import random
-import ollama
+from AI_Backend.llm_client import achat, run_sync
+from AI_Backend.llm_cache import llm_cache
+from AI_Backend.tokens import fits_context, num_ctx_for
+
+# Bump whenever the prompt below changes so stale cached generations are ignored
+PROMPT_VERSION = "2"
+MODEL = "phi3"
+OPTIONS = {"temperature": 0.1}
+
+# Answer size: one {id, task_name, assigned_to, ...} object per task
+ANSWER_TOKENS_PER_TASK = 48
+ANSWER_TOKENS_BASE = 64
 
 class TaskAllocator:
-    def __init__(self, team_data, tasks_data):
+    def __init__(self, team_data, tasks_data, draft=None):
         self.team = team_data["team"]
         self.tasks = tasks_data
 
-    def allocate_tasks(self):
-        """
-        Uses PhiMini to allocate tasks to team members based on skills and availability.
-        """
+        # Optional {task_id: member_name} proposal to refine instead of
+        # allocating from scratch
+        if draft:
+            self.tasks = [
+                {**task, "proposed_assignee": draft.get(task.get("id"))}
+                for task in tasks_data
+            ]
+        self.draft = draft
+
+    def build_prompt(self) -> str:
         prompt = f"""
         You are a smart project manager assistant.
         
@@ -24,6 +41,7 @@ class TaskAllocator:
         1. Assign each task to the team member whose skills best match the task.
         2. Consider availability_days so no one is overbooked.
         3. Return ONLY JSON  with objects containing:
+           - id (copied from the task)
            - task_name
            - assigned_to
            - timeline_days
@@ -31,27 +49,82 @@ class TaskAllocator:
         4. Ensure everyone has tasks within their availability.
         """
 
+        if self.draft:
+            prompt += """
+        5. Each task has a proposed_assignee from a skill-matching engine that
+           already respects availability_days. Keep it unless another member
+           is clearly a better fit.
+        """
+
+        return prompt
+
+    def answer_tokens(self) -> int:
+        return ANSWER_TOKENS_BASE + ANSWER_TOKENS_PER_TASK * len(self.tasks)
+
+    def fits_context(self) -> bool:
+        """
+        False when the prompt plus the expected answer would not fit the
+        largest num_ctx; such a prompt must be split, not sent truncated.
+        """
+        return fits_context(self.build_prompt(), self.answer_tokens())
+
+    async def aallocate_tasks(self, use_cache: bool = True):
+        """
+        Uses PhiMini to allocate tasks to team members based on skills and availability.
+        Returns [] without calling the model when the prompt would not fit
+        the context window (callers shard or fall back to the skill engine).
+        """
+        prompt = self.build_prompt()
+        answer_tokens = self.answer_tokens()
+
+        if not fits_context(prompt, answer_tokens):
+            print(f"⚠️ Allocation prompt for {len(self.tasks)} tasks does not fit the context window, not sent")
+            return []
+
+        options = {
+            **OPTIONS,
+            "num_ctx": num_ctx_for(prompt, answer_tokens)
+        }
+        cache_key = llm_cache.make_key(
+            "allocation",
+            json.dumps({"team": self.team, "tasks": self.tasks}, sort_keys=True),
+            PROMPT_VERSION,
+            MODEL,
+            {**options, "format": "json"}
+        )
+
+        if use_cache:
+            cached = await llm_cache.aget(cache_key)
+            if cached is not None:
+                print("⚡ai_allocation cache hit")
+                return cached
+
         try:
             print("😊ai_allocation")
-            response = ollama.chat(
-                model="phi3",
-                messages=[{"role": "user", "content": prompt}],
-                options={"num_ctx": 4096, "temperature": 0.1},
+            content = await achat(
+                prompt,
+                model=MODEL,
+                options=options,
                 format = "json"
             )
             
             # Parse the model output
             try:
-                allocated = json.loads(response["message"]["content"])
+                allocated = json.loads(content)
+                if allocated:
+                    await llm_cache.aset(cache_key, allocated)
                 return allocated
             except json.JSONDecodeError:
                 print("Warning: Model output is not valid JSON. Returning raw content.")
-                return response["message"]["content"]
+                return content
 
         except Exception as e:
             print(f"Error calling Ollama: {e}")
             return []
 
+    def allocate_tasks(self, use_cache: bool = True):
+        return run_sync(self.aallocate_tasks(use_cache))
+
 # -----------------------------
 # Example usage
 # -----------------------------
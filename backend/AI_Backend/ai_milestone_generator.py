@@ -1,6 +1,15 @@
-import ollama
 import re
 import json
+from AI_Backend.llm_client import achat, agather_bounded, run_sync
+from AI_Backend.llm_cache import llm_cache
+from AI_Backend.tokens import estimate_tokens, input_budget, num_ctx_for, split_sections
+
+# Bump whenever the prompt below changes so stale cached generations are ignored
+PROMPT_VERSION = "2"
+MODEL = "phi3"
+
+# Tokens reserved for the JSON answer of one call
+ANSWER_TOKENS = 768
 
 def safe_json_parse(raw_output: str):
     try:
@@ -32,8 +41,8 @@ def safe_json_parse(raw_output: str):
         print("RAW OUTPUT:\n", raw_output)
         return []
     
-def generate_milestones(srs_text: str):
-    prompt = f"""
+def build_milestones_prompt(srs_text: str) -> str:
+    return f"""
 You are a professional software project manager.
 
 Your task:
@@ -41,7 +50,7 @@ From the following SRS document, create a list of **realistic and original proje
 Each milestone should be meaningful and represent a major checkpoint in the project.  
 
 STRICT RULES:
-1. Output only in JSON.
+1. Output only in JSON, as an object {{"milestones": [...]}}.
 2. Each milestone should have:
    - "name": short, catchy title
    - "description": 1 line explaining the milestone
@@ -55,23 +64,90 @@ STRICTLY AVOID:
 SRS:
 {srs_text}
 """
-    print("😊ai_milestones")
 
-    response = ollama.chat(
-        model="phi3",
-        format="json",
-        messages=[{"role": "user", "content": prompt}]
-    )
 
-    raw_output = response["message"]["content"]
+# SRS tokens that fit in one call next to the prompt and the answer
+SECTION_TOKENS = input_budget(build_milestones_prompt(""), ANSWER_TOKENS)
+
+
+async def agenerate_milestones(srs_text: str, use_cache: bool = True, schema: dict = None):
+    """
+    schema, when given, is a JSON schema passed to Ollama as `format` so
+    decoding is grammar-constrained to it; otherwise plain JSON mode.
+    """
+    if estimate_tokens(srs_text) <= SECTION_TOKENS:
+        return await _agenerate_section(srs_text, use_cache, schema)
+
+    sections = split_sections(srs_text, SECTION_TOKENS)
+    print(f"✂️ SRS split into {len(sections)} sections of <= {SECTION_TOKENS} tokens")
+
+    results = await agather_bounded([
+        lambda section=section: _agenerate_section(section, use_cache, schema)
+        for section in sections
+    ])
+
+    return merge_section_milestones(results)
+
+
+def merge_section_milestones(results: list) -> list:
+    """
+    Chains per-section milestones into one plan: each section's
+    timeline_days are shifted past the last milestone of the section before.
+    """
+    merged = []
+    offset = 0
+
+    for milestones in results:
+        latest = offset
+
+        for milestone in milestones or []:
+            if not isinstance(milestone, dict):
+                continue
+
+            try:
+                days = int(milestone.get("timeline_days") or 0)
+            except (TypeError, ValueError):
+                merged.append(milestone)
+                continue
+
+            merged.append({**milestone, "timeline_days": offset + days})
+            latest = max(latest, offset + days)
+
+        offset = latest
+
+    return merged
+
+
+async def _agenerate_section(srs_text: str, use_cache: bool = True, schema: dict = None):
+    prompt = build_milestones_prompt(srs_text)
+    options = {"num_ctx": num_ctx_for(prompt, ANSWER_TOKENS)}
+    format = schema or "json"
+    cache_key = llm_cache.make_key("milestones", srs_text, PROMPT_VERSION, MODEL, {**options, "format": format})
+
+    if use_cache:
+        cached = await llm_cache.aget(cache_key)
+        if cached is not None:
+            print("⚡ai_milestones cache hit")
+            return cached
+
+    print("😊ai_milestones")
+
+    raw_output = await achat(prompt, model=MODEL, format=format, options=options)
 
     print("\n===== RAW MILESTONE MODEL OUTPUT =====\n", raw_output)
 
     milestones = safe_json_parse(raw_output)
 
+    if milestones:
+        await llm_cache.aset(cache_key, milestones)
+
     return milestones
 
 
+def generate_milestones(srs_text: str, use_cache: bool = True, schema: dict = None):
+    return run_sync(agenerate_milestones(srs_text, use_cache, schema))
+
+
 if __name__ == "__main__":
     srs = "User can login and upload files. Admin can manage users and generate reports."
     
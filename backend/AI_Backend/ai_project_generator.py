@@ -0,0 +1,128 @@
+import json
+from AI_Backend.llm_client import achat, agather_bounded, run_sync
+from AI_Backend.llm_cache import llm_cache
+from AI_Backend.ai_milestone_generator import merge_section_milestones
+from AI_Backend.repair import salvage_epics
+from AI_Backend.tokens import estimate_tokens, input_budget, num_ctx_for, split_sections
+
+# Bump whenever the prompt below changes so stale cached generations are ignored
+PROMPT_VERSION = "1"
+MODEL = "phi3"
+
+# Tokens reserved for the JSON answer of one call (epics + milestones)
+ANSWER_TOKENS = 2048
+
+
+def build_project_prompt(srs_text: str) -> str:
+    return f"""
+You are a professional software project manager.
+
+Your task:
+Read the following SRS document once and produce BOTH the work breakdown and
+the project milestones as one JSON object:
+{{"epics": [...], "milestones": [...]}}
+
+STRICT RULES:
+1. Output only JSON.
+2. Each epic should have:
+   - "epic_name": short title
+   - "description": short description
+   - "tasks": array of tasks, where each task has:
+       * "task_name": concise and actionable
+       * "timeline_days": estimated time to complete the task (integer, feasible, in days)
+3. Each milestone should have:
+   - "name": short, catchy title
+   - "description": 1 line explaining the milestone
+   - "timeline_days": estimated days from project start (realistic days)
+4. Milestones must be sequential checkpoints consistent with the epics above.
+STRICTLY AVOID:
+- DO NOT return fields like "epic_name0", "task_name0", "name0" or any variations.
+- DO NOT generate unrealistic timelines (e.g., 0 days, 1000 days)
+
+SRS:
+{srs_text}
+"""
+
+
+# SRS tokens that fit in one call next to the prompt and the answer
+SECTION_TOKENS = input_budget(build_project_prompt(""), ANSWER_TOKENS)
+
+
+def parse_project_plan(raw_output: str):
+    """
+    Returns (plan, complete); complete is False when only the epics that
+    were finished before the answer broke off could be salvaged.
+    """
+    try:
+        data = json.loads(raw_output)
+    except json.JSONDecodeError as e:
+        print("\n❌ JSON parse failed:", e)
+        return {"epics": salvage_epics(raw_output), "milestones": []}, False
+
+    if not isinstance(data, dict):
+        return {"epics": [], "milestones": []}, False
+
+    return {
+        "epics": data.get("epics") or [],
+        "milestones": data.get("milestones") or [],
+    }, True
+
+
+async def agenerate_project_plan(srs_text: str, use_cache: bool = True, schema: dict = None):
+    """
+    Joint generation: epics, tasks and milestones come back from one prompt,
+    so the SRS is evaluated once instead of once per generator.
+
+    Returns {"epics": [...], "milestones": [...]} (raw model objects).
+    """
+    if estimate_tokens(srs_text) <= SECTION_TOKENS:
+        return await _agenerate_section(srs_text, use_cache, schema)
+
+    sections = split_sections(srs_text, SECTION_TOKENS)
+    print(f"✂️ SRS split into {len(sections)} sections of <= {SECTION_TOKENS} tokens")
+
+    results = await agather_bounded([
+        lambda section=section: _agenerate_section(section, use_cache, schema)
+        for section in sections
+    ])
+
+    return {
+        "epics": [epic for plan in results for epic in plan["epics"]],
+        "milestones": merge_section_milestones([plan["milestones"] for plan in results]),
+    }
+
+
+async def _agenerate_section(srs_text: str, use_cache: bool = True, schema: dict = None):
+    prompt = build_project_prompt(srs_text)
+    options = {"num_ctx": num_ctx_for(prompt, ANSWER_TOKENS)}
+    format = schema or "json"
+    cache_key = llm_cache.make_key("project_plan", srs_text, PROMPT_VERSION, MODEL, {**options, "format": format})
+
+    if use_cache:
+        cached = await llm_cache.aget(cache_key)
+        if cached is not None:
+            print("⚡ai_project cache hit")
+            return cached
+
+    print("😊ai_project")
+    raw_output = await achat(prompt, model=MODEL, format=format, options=options)
+
+    print("\n===== RAW PROJECT MODEL OUTPUT =====\n", raw_output)
+
+    plan, complete = parse_project_plan(raw_output)
+
+    # Failed or salvaged parses are not cached so the next request retries
+    if complete and (plan["epics"] or plan["milestones"]):
+        await llm_cache.aset(cache_key, plan)
+
+    return plan
+
+
+def generate_project_plan(srs_text: str, use_cache: bool = True, schema: dict = None):
+    return run_sync(agenerate_project_plan(srs_text, use_cache, schema))
+
+
+if __name__ == "__main__":
+    srs = "User can login and upload files. Admin can manage users and generate reports."
+    result = generate_project_plan(srs)
+    print(json.dumps(result, indent=2))
@@ -1,7 +1,17 @@
-import ollama
 import re
 import json
-import random
+from AI_Backend.llm_client import achat, achat_stream, agather_bounded, run_sync
+from AI_Backend.llm_cache import llm_cache
+from AI_Backend.json_stream import IncrementalEpicParser
+from AI_Backend.repair import arepair_sections, salvage_epics
+from AI_Backend.tokens import estimate_tokens, input_budget, num_ctx_for, split_sections
+
+# Bump whenever the prompt below changes so stale cached generations are ignored
+PROMPT_VERSION = "2"
+MODEL = "phi3"
+
+# Tokens reserved for the JSON answer of one call
+ANSWER_TOKENS = 1536
 
 def safe_json_parse(raw_output: str):
     try:
@@ -24,13 +34,44 @@ def safe_json_parse(raw_output: str):
         print("\n❌ JSON parse failed:", e)
         print("RAW OUTPUT:\n", raw_output)
         return []
-    
-def generate_epics_tasks_json_with_timeline(srs_text: str):
+
+
+def parse_epics(raw_output: str, structured: bool = False):
+    """
+    Returns (epics, complete). Schema-constrained output is valid JSON by
+    construction and is read directly; free-form "json" output goes through
+    safe_json_parse. When either fails (e.g. the answer was cut off), every
+    complete epic is salvaged and complete is False.
+    """
+    if structured:
+        try:
+            data = json.loads(raw_output)
+        except json.JSONDecodeError as e:
+            print("\n❌ JSON parse failed:", e)
+            data = None
+
+        if isinstance(data, dict):
+            return data.get("epics") or [], True
+        if isinstance(data, list):
+            return data, True
+    else:
+        epics = safe_json_parse(raw_output)
+        if epics:
+            return epics, True
+
+    salvaged = salvage_epics(raw_output)
+    if salvaged:
+        print(f"🩹 Salvaged {len(salvaged)} complete epics from malformed output")
+
+    return salvaged, False
+
+
+def build_epics_prompt(srs_text: str, existing_epics: list = None) -> str:
     prompt = f"""
 You are a professional software project manager.
 
 Your task:
-Convert the following SRS document into a JSON array of Epics with Tasks.
+Convert the following SRS document into a JSON object {{"epics": [...]}} listing Epics with Tasks.
 
 STRICT RULES:
 1. Output only JSON.
@@ -50,20 +91,166 @@ STRICTLY AVOID:
 SRS:
 {srs_text}
 """
-    print("😊ai_generater")
-    response = ollama.chat(
-        model="phi3",
-        format="json",
-        messages=[{"role": "user", "content": prompt}]
+
+    if existing_epics:
+        # Follow-up prompt from the repair engine: reuse the epics we already have
+        names = ", ".join(
+            sorted({str(epic.get("epic_name")) for epic in existing_epics if isinstance(epic, dict) and epic.get("epic_name")})
+        )
+        prompt += f"""
+Epics already extracted from other parts of this SRS: {names}
+Reuse one of these epic names when a requirement belongs to it.
+"""
+
+    return prompt
+
+
+# SRS tokens that fit in one call next to the prompt and the answer
+SECTION_TOKENS = input_budget(build_epics_prompt(""), ANSWER_TOKENS)
+
+
+def plan_sections(srs_text: str) -> list:
+    """
+    The SRS as-is when it fits in one call, otherwise split on section and
+    sentence boundaries so nothing is truncated by the context window.
+    """
+    if estimate_tokens(srs_text) <= SECTION_TOKENS:
+        return [srs_text]
+
+    sections = split_sections(srs_text, SECTION_TOKENS)
+    print(f"✂️ SRS split into {len(sections)} sections of <= {SECTION_TOKENS} tokens")
+    return sections
+
+
+def _options(prompt: str) -> dict:
+    return {"num_ctx": num_ctx_for(prompt, ANSWER_TOKENS)}
+
+
+def _cache_key(srs_text: str, options: dict, format) -> str:
+    return llm_cache.make_key("epics", srs_text, PROMPT_VERSION, MODEL, {**options, "format": format})
+
+
+async def agenerate_epics_tasks_json_with_timeline(
+    srs_text: str,
+    use_cache: bool = True,
+    schema: dict = None,
+    validate=None
+):
+    """
+    schema, when given, is a JSON schema passed to Ollama as `format` so
+    decoding is grammar-constrained to it; otherwise plain JSON mode.
+
+    validate(epics) -> valid epics lets the caller reject invalid entries;
+    sections with missing, truncated or invalid output are repaired with
+    follow-up prompts for just those sections (see arepair_sections).
+    """
+    sections = plan_sections(srs_text)
+
+    outcomes = await agather_bounded([
+        lambda section=section: _agenerate_section(section, use_cache, schema, validate)
+        for section in sections
+    ])
+
+    if all(complete and epics for epics, complete in outcomes):
+        return [epic for epics, _ in outcomes for epic in epics]
+
+    results, repaired = await arepair_sections(
+        sections,
+        outcomes,
+        lambda text, existing: _agenerate_section(text, False, schema, validate, existing)
     )
 
-    raw_output = response["message"]["content"]
+    # Fully repaired sections are cached whole so the next request skips the
+    # repair; sections that are still partial are retried next time
+    for section, (_, complete), epics, whole in zip(sections, outcomes, results, repaired):
+        if epics and not complete and whole:
+            prompt = build_epics_prompt(section)
+            await llm_cache.aset(_cache_key(section, _options(prompt), schema or "json"), epics)
+
+    return [epic for epics in results for epic in epics]
+
+
+async def _agenerate_section(
+    srs_text: str,
+    use_cache: bool = True,
+    schema: dict = None,
+    validate=None,
+    existing_epics: list = None
+):
+    """
+    Returns (epics, complete) for one section.
+    """
+    prompt = build_epics_prompt(srs_text, existing_epics)
+    options = _options(prompt)
+    format = schema or "json"
+    cache_key = _cache_key(srs_text, options, format)
+
+    if use_cache:
+        cached = await llm_cache.aget(cache_key)
+        if cached is not None:
+            print("⚡ai_generater cache hit")
+            return cached, True
+
+    print("😊ai_generater")
+    raw_output = await achat(prompt, model=MODEL, format=format, options=options)
 
     print("\n===== RAW TASK MODEL OUTPUT =====\n", raw_output)
 
-    epics = safe_json_parse(raw_output)
+    epics, complete = parse_epics(raw_output, structured=schema is not None)
+
+    if validate is not None:
+        valid = validate(epics)
+        complete = complete and len(valid) == len(epics)
+        epics = valid
+
+    # Partial output is not cached; follow-up prompts (existing_epics) are
+    # cached by the caller once the section is whole again
+    if epics and complete and existing_epics is None:
+        await llm_cache.aset(cache_key, epics)
+
+    return epics, complete
+
+
+async def astream_epics_tasks(srs_text: str, use_cache: bool = True, schema: dict = None):
+    """
+    Streaming variant of agenerate_epics_tasks_json_with_timeline: yields each
+    epic as soon as its closing brace arrives from the model. Sections of a
+    long SRS are streamed one after another.
+    """
+    for section in plan_sections(srs_text):
+        async for epic in _astream_section(section, use_cache, schema):
+            yield epic
+
+
+async def _astream_section(srs_text: str, use_cache: bool = True, schema: dict = None):
+    prompt = build_epics_prompt(srs_text)
+    options = _options(prompt)
+    format = schema or "json"
+    cache_key = llm_cache.make_key("epics", srs_text, PROMPT_VERSION, MODEL, {**options, "format": format})
+
+    if use_cache:
+        cached = await llm_cache.aget(cache_key)
+        if cached is not None:
+            print("⚡ai_generater cache hit")
+            for epic in cached:
+                yield epic
+            return
+
+    print("😊ai_generater (stream)")
+    parser = IncrementalEpicParser()
+    epics = []
+
+    async for chunk in achat_stream(prompt, model=MODEL, format=format, options=options):
+        for epic in parser.feed(chunk):
+            epics.append(epic)
+            yield epic
+
+    if epics:
+        await llm_cache.aset(cache_key, epics)
+
 
-    return epics
+def generate_epics_tasks_json_with_timeline(srs_text: str, use_cache: bool = True, schema: dict = None):
+    return run_sync(agenerate_epics_tasks_json_with_timeline(srs_text, use_cache, schema))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,106 @@
+import json
+
+
+class IncrementalEpicParser:
+    """
+    Error-tolerant incremental parser for streamed model output.
+
+    Feed it text chunks as they arrive; it returns every epic object whose
+    closing brace has been seen. Epics are the objects directly inside the
+    top-level array, or inside the first array of a wrapper object such as
+    {"epics": [...]}. Anything before the JSON (markdown fences, prose) is
+    skipped, and an epic that fails json.loads is dropped instead of
+    failing the whole generation.
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._offset = 0          # absolute index of self._buffer[0]
+        self._stack = []          # open containers: "{" or "["
+        self._in_string = False
+        self._escape = False
+        self._epic_start = None   # absolute index of the current epic's "{"
+        self._top_start = None    # absolute index of a top-level "{"
+        self.emitted = 0
+
+    def _is_epic_level(self) -> bool:
+        # [ {epic} ]  or  { "epics": [ {epic} ] }
+        return self._stack == ["["] or self._stack == ["{", "["]
+
+    def _text(self, start: int, end: int) -> str:
+        data = "".join(self._buffer)
+        return data[start - self._offset:end - self._offset]
+
+    def _compact(self):
+        # Drop text no open object can still reference
+        keep_from = min(
+            (i for i in (self._epic_start, self._top_start) if i is not None),
+            default=self._offset + sum(len(b) for b in self._buffer)
+        )
+        data = "".join(self._buffer)
+        self._buffer = [data[keep_from - self._offset:]]
+        self._offset = keep_from
+
+    def feed(self, chunk: str) -> list:
+        epics = []
+        position = self._offset + sum(len(b) for b in self._buffer)
+        self._buffer.append(chunk)
+
+        for i, ch in enumerate(chunk):
+            index = position + i
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"' and self._stack:
+                self._in_string = True
+
+            elif ch in "{[":
+                if ch == "{" and not self._stack:
+                    self._top_start = index
+                if ch == "{" and self._is_epic_level():
+                    self._epic_start = index
+                self._stack.append(ch)
+
+            elif ch in "}]":
+                if not self._stack:
+                    continue
+                self._stack.pop()
+
+                if ch == "}" and self._epic_start is not None and self._is_epic_level():
+                    epic = self._load(self._epic_start, index + 1)
+                    self._epic_start = None
+                    # Inside a wrapper object the array could also be the
+                    # "tasks" of a single bare epic, so require epic keys there
+                    if epic is not None and (
+                        self._stack == ["["] or "tasks" in epic or "epic_name" in epic
+                    ):
+                        epics.append(epic)
+                        self._top_start = None
+
+                elif ch == "}" and not self._stack and self._top_start is not None:
+                    # A bare top-level epic object without any array around it
+                    if not self.emitted and not epics:
+                        epic = self._load(self._top_start, index + 1)
+                        if epic is not None and "tasks" in epic:
+                            epics.append(epic)
+                    self._top_start = None
+
+        self.emitted += len(epics)
+        self._compact()
+
+        return epics
+
+    def _load(self, start: int, end: int):
+        try:
+            value = json.loads(self._text(start, end))
+        except json.JSONDecodeError:
+            return None
+
+        return value if isinstance(value, dict) else None
@@ -0,0 +1,185 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# -------------------------
+# Cache settings
+# -------------------------
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./.llm_cache/generations.db")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "500"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+
+
+def normalize_text(text: str) -> str:
+    """
+    Collapses whitespace so re-extracted copies of the same SRS hash the same.
+    """
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+class LLMCache:
+    """
+    Persistent, content-addressed cache for parsed LLM generations.
+
+    Entries live in a small SQLite file and are evicted least-recently-used
+    once the entry count or total size goes over its limit, or when older
+    than the TTL.
+    """
+
+    def __init__(self, path: str, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS generations (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_generations_last_access "
+                "ON generations (last_access)"
+            )
+            self._conn.commit()
+
+        return self._conn
+
+    @staticmethod
+    def make_key(namespace: str, text: str, prompt_version: str, model: str, options: dict = None) -> str:
+        payload = json.dumps(
+            {
+                "namespace": namespace,
+                "text": normalize_text(text),
+                "prompt_version": prompt_version,
+                "model": model,
+                "options": options or {},
+            },
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, created_at FROM generations WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+            now = time.time()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    conn.execute("DELETE FROM generations WHERE key = ?", (key,))
+                    conn.commit()
+                self.misses += 1
+                return None
+
+            conn.execute(
+                "UPDATE generations SET last_access = ? WHERE key = ?",
+                (now, key)
+            )
+            conn.commit()
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def set(self, key: str, value):
+        data = json.dumps(value)
+        now = time.time()
+
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO generations (key, value, size, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, data, len(data), now, now)
+            )
+            self._evict(conn, now)
+            conn.commit()
+
+    # Async callers: the SQLite I/O (and the lock) stays off the event loop
+
+    async def aget(self, key: str):
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value):
+        await asyncio.to_thread(self.set, key, value)
+
+    def _evict(self, conn, now: float):
+        conn.execute(
+            "DELETE FROM generations WHERE created_at < ?",
+            (now - self.ttl_seconds,)
+        )
+
+        count, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM generations"
+        ).fetchone()
+
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        # Walk from least recently used and drop until both limits hold
+        for key, size in conn.execute(
+            "SELECT key, size FROM generations ORDER BY last_access"
+        ).fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM generations WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM generations")
+            conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, total = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM generations"
+            ).fetchone()
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": count,
+            "bytes": total,
+        }
+
+
+llm_cache = LLMCache(
+    LLM_CACHE_PATH,
+    max_entries=LLM_CACHE_MAX_ENTRIES,
+    max_bytes=LLM_CACHE_MAX_BYTES,
+    ttl_seconds=LLM_CACHE_TTL_SECONDS
+)
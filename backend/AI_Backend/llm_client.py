@@ -0,0 +1,104 @@
+import asyncio
+import os
+
+import httpx
+import ollama
+
+# -------------------------
+# Ollama connection settings
+# -------------------------
+OLLAMA_HOST = os.getenv("OLLAMA_HOST")
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "8"))
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "600"))
+# Keep this at (or below) the server's OLLAMA_NUM_PARALLEL, extra requests
+# would just queue on the server
+OLLAMA_NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "2"))
+
+DEFAULT_MODEL = "phi3"
+
+_async_client = None
+_async_client_loop = None
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=OLLAMA_MAX_CONNECTIONS,
+        max_keepalive_connections=OLLAMA_MAX_CONNECTIONS
+    )
+
+
+def get_async_client() -> ollama.AsyncClient:
+    """
+    Returns the shared AsyncClient for the running event loop.
+
+    The underlying httpx pool is bound to the loop it was created on, so a
+    new client is built if we are called from a different loop.
+    """
+    global _async_client, _async_client_loop
+
+    loop = asyncio.get_running_loop()
+
+    if _async_client is None or _async_client_loop is not loop:
+        _async_client = ollama.AsyncClient(
+            host=OLLAMA_HOST,
+            timeout=OLLAMA_TIMEOUT,
+            limits=_limits()
+        )
+        _async_client_loop = loop
+
+    return _async_client
+
+
+async def achat(prompt: str, model: str = DEFAULT_MODEL, format=None, options: dict = None) -> str:
+    """
+    Sends a single user prompt to Ollama without blocking the event loop
+    and returns the message content.
+    """
+    response = await get_async_client().chat(
+        model=model,
+        format=format,
+        messages=[{"role": "user", "content": prompt}],
+        options=options
+    )
+
+    return response["message"]["content"]
+
+
+async def achat_stream(prompt: str, model: str = DEFAULT_MODEL, format=None, options: dict = None):
+    """
+    Streams the message content from Ollama chunk by chunk as it is generated.
+    """
+    stream = await get_async_client().chat(
+        model=model,
+        format=format,
+        messages=[{"role": "user", "content": prompt}],
+        options=options,
+        stream=True
+    )
+
+    async for part in stream:
+        content = part["message"]["content"]
+        if content:
+            yield content
+
+
+async def agather_bounded(factories, limit: int = OLLAMA_NUM_PARALLEL) -> list:
+    """
+    Awaits zero-argument coroutine factories with at most limit in flight
+    and returns their results in input order.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(factory):
+        async with semaphore:
+            return await factory()
+
+    return await asyncio.gather(*(run(factory) for factory in factories))
+
+
+def run_sync(coro):
+    """
+    Sync shim for the __main__ scripts: runs an async generator call to
+    completion on a fresh event loop.
+    """
+    return asyncio.run(coro)
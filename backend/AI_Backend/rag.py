@@ -1,21 +1,184 @@
 import re
+import os
 import json
-import random
-import ollama
+import hashlib
+import numpy as np
+from scipy import sparse
+from AI_Backend.llm_client import achat, agather_bounded, run_sync
+from AI_Backend.skill_matcher import STEM_LENGTH, tokenize
+from AI_Backend.repair import arepair_sections, salvage_epics
+from AI_Backend.tokens import estimate_tokens, input_budget, num_ctx_for, split_sections
+
+# Where per-project BM25 indexes are persisted
+RAG_INDEX_DIR = os.getenv("RAG_INDEX_DIR", "./.rag_index")
+DEFAULT_TOP_K = 8
+MAX_TOP_K = 50
+# Bump whenever search_tokenize changes so persisted indexes are rebuilt
+INDEX_VERSION = "2"
+
+# Only function words: unlike skill matching, an SRS search for "users" or
+# "system" must still find the requirements that mention them
+SEARCH_STOPWORDS = {
+    "a", "an", "and", "the", "of", "for", "to", "in", "on", "with", "by", "as",
+    "is", "be", "are", "or", "at", "from", "into", "it", "its", "this", "that",
+}
+
+# Tokens reserved for the JSON answer of one call
+ANSWER_TOKENS = 1536
+
+def search_tokenize(text: str) -> list:
+    words = re.findall(r"[a-z0-9+#.]+", (text or "").lower())
+    return [
+        w.strip(".")[:STEM_LENGTH]
+        for w in words
+        if w.strip(".") and w.strip(".") not in SEARCH_STOPWORDS
+    ]
+
+class BM25Index:
+    """
+    In-process BM25 index over SRS chunks.
+
+    Document-term BM25 weights are precomputed into a CSR matrix, so a query
+    is one sparse mat-vec plus a top-k partition.
+    """
+
+    def __init__(self, chunks, k1=1.5, b=0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.vocabulary = {}
+        self.weights = self._build(chunks)
+
+    def _build(self, chunks):
+        rows, cols, counts = [], [], []
+
+        for row, chunk in enumerate(chunks):
+            tf = {}
+            for token in search_tokenize(chunk):
+                col = self.vocabulary.setdefault(token, len(self.vocabulary))
+                tf[col] = tf.get(col, 0) + 1
+            rows.extend([row] * len(tf))
+            cols.extend(tf.keys())
+            counts.extend(tf.values())
+
+        shape = (len(chunks), max(len(self.vocabulary), 1))
+        tf = sparse.csr_matrix(
+            (np.array(counts, dtype=np.float64), (rows, cols)),
+            shape=shape
+        )
+
+        n_docs = max(len(chunks), 1)
+        doc_len = np.asarray(tf.sum(axis=1)).ravel()
+        avg_len = doc_len.mean() if len(doc_len) and doc_len.mean() > 0 else 1.0
+
+        df = np.bincount(tf.indices, minlength=shape[1])
+        idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+        # BM25 term weight for every stored (doc, term) entry
+        row_of_entry = np.repeat(np.arange(shape[0]), np.diff(tf.indptr))
+        norm = self.k1 * (1 - self.b + self.b * doc_len[row_of_entry] / avg_len)
+        data = idf[tf.indices] * tf.data * (self.k1 + 1) / (tf.data + norm)
+
+        return sparse.csr_matrix((data, tf.indices, tf.indptr), shape=shape)
+
+    def search(self, query: str, k: int = DEFAULT_TOP_K):
+        """
+        Returns up to k (chunk_index, score) pairs, best first; chunks that
+        share no term with the query are left out.
+        """
+        cols = sorted({self.vocabulary[t] for t in search_tokenize(query) if t in self.vocabulary})
+        if not cols or not self.chunks or k < 1:
+            return []
+
+        scores = np.asarray(self.weights[:, cols].sum(axis=1)).ravel()
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [(int(i), float(scores[i])) for i in top if scores[i] > 0]
+
+    # ---------- Persistence ----------
+
+    def save(self, path: str, content_hash: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        sparse.save_npz(path + ".npz", self.weights)
+        with open(path + ".json", "w", encoding="utf-8") as f:
+            json.dump({
+                "content_hash": content_hash,
+                "version": INDEX_VERSION,
+                "k1": self.k1,
+                "b": self.b,
+                "vocabulary": self.vocabulary,
+                "chunks": self.chunks
+            }, f)
+
+    @classmethod
+    def load(cls, path: str, content_hash: str):
+        """
+        Returns the saved index, or None if missing, built from other text
+        or by an older tokenizer.
+        """
+        try:
+            with open(path + ".json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["content_hash"] != content_hash or meta.get("version") != INDEX_VERSION:
+                return None
+            weights = sparse.load_npz(path + ".npz").tocsr()
+        except (OSError, ValueError, KeyError):
+            return None
+
+        index = cls.__new__(cls)
+        index.chunks = meta["chunks"]
+        index.k1 = meta["k1"]
+        index.b = meta["b"]
+        index.vocabulary = meta["vocabulary"]
+        index.weights = weights
+        return index
 
 class SimpleRAG:
-    def __init__(self, srs_text):
+    def __init__(self, srs_text, index=None):
         self.chunks = [line.strip() for line in srs_text.split('.') if line.strip() and not line.strip().isdigit()]
+        self._index = index
+
+    @classmethod
+    def for_project(cls, project_id, srs_text):
+        """
+        SimpleRAG backed by the project's persisted BM25 index, (re)built
+        only when missing or when the SRS text changed.
+        """
+        content_hash = hashlib.sha256(srs_text.encode("utf-8")).hexdigest()
+        path = os.path.join(RAG_INDEX_DIR, f"project_{project_id}")
+
+        index = BM25Index.load(path, content_hash)
+        if index is None:
+            index = BM25Index(cls(srs_text).chunks)
+            index.save(path, content_hash)
+
+        return cls(srs_text, index=index)
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = BM25Index(self.chunks)
+        return self._index
 
     def retrieve_all(self):
         return self.chunks
 
-def generate_clean_epics_tasks(srs_text: str):
-    rag = SimpleRAG(srs_text)
-    retrieved_text = " ".join(rag.retrieve_all())
+    def retrieve(self, query, k=DEFAULT_TOP_K):
+        """Top-k chunks for query, returned in document order."""
+        hits = self.index.search(query, k)
+        return [self.chunks[i] for i, _ in sorted(hits)]
+
+    def retrieve_scored(self, query, k=DEFAULT_TOP_K):
+        return [
+            {"chunk": self.chunks[i], "position": i, "score": round(score, 4)}
+            for i, score in self.index.search(query, k)
+        ]
 
-    # --- Strong prompt for Ollama ---
-    prompt = f"""
+def build_rag_prompt(retrieved_text: str) -> str:
+    return f"""
 You are a professional software project manager.
 
 Task:
@@ -35,79 +198,117 @@ SRS:
 {retrieved_text}
 """
 
-    # --- Ollama call ---
-    epics_tasks = []
+# SRS tokens that fit in one call next to the prompt and the answer
+SECTION_TOKENS = input_budget(build_rag_prompt(""), ANSWER_TOKENS)
+
+async def _agenerate_section(retrieved_text: str, existing_epics: list = None):
+    """Returns (epics, complete) for one section of retrieved text."""
+    prompt = build_rag_prompt(retrieved_text)
+    if existing_epics:
+        names = ", ".join(sorted({e.get("epic_name", "") for e in existing_epics if isinstance(e, dict)}))
+        prompt += f"\nEpics already extracted: {names}. Reuse these names where they fit.\n"
+    options = {"num_ctx": num_ctx_for(prompt, ANSWER_TOKENS)}
+
     try:
-        response = ollama.chat(
-            model="phi3:mini",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        raw_output = response["message"]["content"].strip()
-        match = re.search(r'\[.*\]', raw_output, re.DOTALL)
-        if match:
-            epics_tasks = json.loads(match.group())
+        raw_output = (await achat(prompt, model="phi3:mini", options=options)).strip()
     except Exception as e:
-        print("LLM failed, using fallback:", e)
+        print("LLM failed:", e)
+        return [], False
 
-    # --- Fallback generator if LLM fails or returns empty ---
-    if not epics_tasks:
-        # Heuristic: split SRS into logical epics by keywords
-        epics_keywords = {
-            "User Management": ["user", "registration", "login", "profile", "password"],
-            "Admin Dashboard": ["admin", "report", "dashboard"],
-            "Content Management": ["content", "edit", "upload"],
-            "Deployment": ["deploy", "cloud", "server"]
-        }
-        # Assign lines to epics
-        epics_tasks_dict = {k: [] for k in epics_keywords}
-        other_tasks = []
-        for line in rag.chunks:
-            assigned = False
-            for epic_name, keywords in epics_keywords.items():
-                if any(kw.lower() in line.lower() for kw in keywords):
-                    epics_tasks_dict[epic_name].append(line)
-                    assigned = True
-                    break
-            if not assigned:
-                other_tasks.append(line)
-
-        epics_tasks = []
-        for epic_name, tasks_list in epics_tasks_dict.items():
-            if tasks_list:
-                tasks = []
-                for i, t in enumerate(tasks_list):
-                    tasks.append({
-                        "task_name": t[:120],
-                        "timeline_days": random.randint(1,5),
-                        "status": "Backlog",
-                        "sequence": i+1
-                    })
-                epics_tasks.append({
-                    "epic_name": epic_name,
-                    "description": f"Tasks related to {epic_name}",
-                    "tasks": tasks
-                })
-        # Any leftover tasks
-        if other_tasks:
-            tasks = []
-            for i, t in enumerate(other_tasks):
-                tasks.append({
+    match = re.search(r'\[.*\]', raw_output, re.DOTALL)
+    if match:
+        try:
+            return json.loads(match.group()), True
+        except json.JSONDecodeError:
+            pass
+
+    # Malformed or cut-off answer: keep the epics that did complete
+    return salvage_epics(raw_output), False
+
+def fallback_epics(chunks):
+    """
+    Keyword grouping used only when the model produced nothing for any
+    section even after repair. Timelines are estimated from requirement
+    length instead of being random.
+    """
+    epics_keywords = {
+        "User Management": ["user", "registration", "login", "profile", "password"],
+        "Admin Dashboard": ["admin", "report", "dashboard"],
+        "Content Management": ["content", "edit", "upload"],
+        "Deployment": ["deploy", "cloud", "server"]
+    }
+    # Assign lines to epics
+    epics_tasks_dict = {k: [] for k in epics_keywords}
+    other_tasks = []
+    for line in chunks:
+        assigned = False
+        for epic_name, keywords in epics_keywords.items():
+            if any(kw.lower() in line.lower() for kw in keywords):
+                epics_tasks_dict[epic_name].append(line)
+                assigned = True
+                break
+        if not assigned:
+            other_tasks.append(line)
+
+    groups = [
+        (epic_name, f"Tasks related to {epic_name}", tasks_list)
+        for epic_name, tasks_list in epics_tasks_dict.items()
+    ]
+    # Any leftover tasks
+    groups.append(("Other Features", "Miscellaneous tasks", other_tasks))
+
+    return [
+        {
+            "epic_name": epic_name,
+            "description": description,
+            "tasks": [
+                {
                     "task_name": t[:120],
-                    "timeline_days": random.randint(1,5),
+                    "timeline_days": estimate_days(t),
                     "status": "Backlog",
-                    "sequence": i+1
-                })
-            epics_tasks.append({
-                "epic_name": "Other Features",
-                "description": "Miscellaneous tasks",
-                "tasks": tasks
-            })
+                    "sequence": i + 1
+                }
+                for i, t in enumerate(tasks_list)
+            ]
+        }
+        for epic_name, description, tasks_list in groups
+        if tasks_list
+    ]
+
+def estimate_days(requirement: str) -> int:
+    # Longer requirements usually bundle more work; clamp to the prompt's 1-5 days
+    return min(5, max(1, len(tokenize(requirement)) // 4))
+
+async def agenerate_clean_epics_tasks(srs_text: str, query: str = None, top_k: int = DEFAULT_TOP_K):
+    rag = SimpleRAG(srs_text)
+    # With a query (an epic or module name) only the relevant chunks go in the prompt
+    chunks = rag.retrieve(query, top_k) if query else rag.retrieve_all()
+    retrieved_text = " ".join(chunks)
+
+    # --- Ollama call(s), one per section when the text exceeds the budget ---
+    sections = (
+        [retrieved_text]
+        if estimate_tokens(retrieved_text) <= SECTION_TOKENS
+        else split_sections(retrieved_text, SECTION_TOKENS)
+    )
+    outcomes = await agather_bounded([
+        lambda section=section: _agenerate_section(section)
+        for section in sections
+    ])
+
+    # --- Re-prompt only the sections whose output was missing or cut off ---
+    results, _ = await arepair_sections(sections, outcomes, _agenerate_section)
+    epics_tasks = [epic for epics in results for epic in epics if isinstance(epic, dict)]
+
+    # --- Fallback generator if the LLM still returned nothing ---
+    if not epics_tasks:
+        epics_tasks = fallback_epics(chunks)
 
     # Ensure all tasks have timeline/status/sequence
     for epic in epics_tasks:
         for i, task in enumerate(epic.get("tasks", [])):
             if "timeline_days" not in task:
-                task["timeline_days"] = random.randint(1,5)
+                task["timeline_days"] = estimate_days(str(task.get("task_name", "")))
             if "status" not in task:
                 task["status"] = "Backlog"
             if "sequence" not in task:
@@ -115,6 +316,9 @@ SRS:
 
     return epics_tasks
 
+def generate_clean_epics_tasks(srs_text: str, query: str = None, top_k: int = DEFAULT_TOP_K):
+    return run_sync(agenerate_clean_epics_tasks(srs_text, query, top_k))
+
 # --- Main ---
 if __name__ == "__main__":
     with open("srs.txt", "r", encoding="utf-8") as f:
@@ -0,0 +1,107 @@
+import os
+from AI_Backend.json_stream import IncrementalEpicParser
+from AI_Backend.llm_client import agather_bounded
+from AI_Backend.skill_matcher import tokenize
+from AI_Backend.tokens import split_paragraphs, split_sentences
+
+# -------------------------
+# Repair settings
+# -------------------------
+# Follow-up rounds per generation; each round only re-prompts what is still missing
+REPAIR_MAX_ROUNDS = int(os.getenv("LLM_REPAIR_ROUNDS", "1"))
+# A requirement counts as covered when this share of its terms appears in
+# the generated epics/tasks
+MIN_COVERAGE = 0.5
+
+
+def salvage_epics(raw_output: str) -> list:
+    """
+    Every complete epic object in malformed or truncated model output.
+    """
+    return IncrementalEpicParser().feed(raw_output or "")
+
+
+def _epic_terms(epics: list) -> set:
+    terms = set()
+
+    for epic in epics:
+        if not isinstance(epic, dict):
+            continue
+        for value in epic.values():
+            if isinstance(value, str):
+                terms.update(tokenize(value))
+        for task in epic.get("tasks") or []:
+            if isinstance(task, dict):
+                for value in task.values():
+                    if isinstance(value, str):
+                        terms.update(tokenize(value))
+
+    return terms
+
+
+def uncovered_text(section: str, epics: list) -> str:
+    """
+    The sentences of section that the generated epics barely mention; these
+    are what a follow-up prompt has to cover.
+    """
+    covered = _epic_terms(epics)
+    missing = []
+
+    for paragraph in split_paragraphs(section):
+        for sentence in split_sentences(paragraph):
+            terms = set(tokenize(sentence))
+            if terms and len(terms & covered) / len(terms) < MIN_COVERAGE:
+                missing.append(sentence)
+
+    return "\n".join(missing)
+
+
+async def arepair_sections(sections: list, outcomes: list, regenerate, max_rounds: int = REPAIR_MAX_ROUNDS) -> tuple:
+    """
+    Keeps every epic that was generated and re-prompts only what failed.
+
+    outcomes[i] is (epics, complete) for sections[i]. A section with no
+    output is sent again whole; a section with partial output (truncated
+    JSON, invalid entries) sends only its uncovered sentences.
+    regenerate(text, existing_epics) must return (epics, complete).
+
+    Returns (results, complete): one list of epics per section, and per
+    section whether it is whole (nothing left to re-prompt). Sections still
+    pending after max_rounds, or that only have salvaged epics, are not
+    complete and must not be cached as such.
+    """
+    results = [list(epics or []) for epics, _ in outcomes]
+
+    pending = {
+        i: sections[i] if not results[i] else uncovered_text(sections[i], results[i])
+        for i, (_, complete) in enumerate(outcomes)
+        if not complete or not results[i]
+    }
+
+    for round_number in range(max_rounds):
+        pending = {i: text for i, text in pending.items() if text.strip()}
+        if not pending:
+            break
+
+        print(f"🩹 Repair round {round_number + 1}: re-prompting {len(pending)}/{len(sections)} sections")
+
+        indexes = list(pending)
+        repaired = await agather_bounded([
+            lambda i=i: regenerate(pending[i], results[i])
+            for i in indexes
+        ])
+
+        next_pending = {}
+        for i, (epics, complete) in zip(indexes, repaired):
+            results[i].extend(epics or [])
+            if not epics:
+                next_pending[i] = pending[i]
+            elif not complete:
+                next_pending[i] = uncovered_text(pending[i], epics)
+
+        pending = next_pending
+
+    incomplete = {i for i, text in pending.items() if text.strip()}
+    complete = [i not in incomplete for i in range(len(sections))]
+
+    return results, complete
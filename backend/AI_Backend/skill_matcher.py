@@ -0,0 +1,157 @@
+import re
+import numpy as np
+
+# Words that say nothing about which skill a task needs
+STOPWORDS = {
+    "a", "an", "and", "the", "of", "for", "to", "in", "on", "with", "by", "as",
+    "is", "be", "are", "or", "at", "from", "into", "shall", "should", "must",
+    "will", "can", "system", "user", "users", "allow", "allows", "provide",
+    "support", "implement", "create", "build", "add", "new", "feature",
+}
+
+# Tokens are cut to this many characters so "database"/"databases" and
+# "deploy"/"deployment" land on the same vocabulary entry
+STEM_LENGTH = 6
+
+# Relative weight of a member's role words against their listed skills
+ROLE_WEIGHT = 0.5
+
+# How strongly an already-loaded member is penalized when picking the best
+# match (0 = pure skill match, higher = spread work more evenly)
+LOAD_PENALTY = 0.3
+
+
+def tokenize(text: str) -> list:
+    words = re.findall(r"[a-z0-9+#.]+", (text or "").lower())
+    return [
+        w.strip(".")[:STEM_LENGTH]
+        for w in words
+        if w.strip(".") and w.strip(".") not in STOPWORDS
+    ]
+
+
+class SkillAllocationEngine:
+    """
+    Deterministic, LLM-free task allocation.
+
+    Builds a task x member skill-similarity matrix in NumPy and assigns tasks
+    greedily (longest first) to the best-matching member that still has
+    availability_days left. Members without availability_days are treated
+    as having unlimited capacity.
+    """
+
+    def __init__(self, team: list, tasks: list):
+        self.team = team
+        self.tasks = tasks
+
+    # ---------- Similarity ----------
+
+    def _vectorize(self):
+        member_tokens = []
+        for member in self.team:
+            weighted = [(t, 1.0) for skill in member.get("skills") or [] for t in tokenize(skill)]
+            weighted += [(t, ROLE_WEIGHT) for t in tokenize(member.get("role", ""))]
+            member_tokens.append(weighted)
+
+        vocabulary = {}
+        for weighted in member_tokens:
+            for token, _ in weighted:
+                vocabulary.setdefault(token, len(vocabulary))
+
+        members = np.zeros((len(self.team), max(len(vocabulary), 1)))
+        for row, weighted in enumerate(member_tokens):
+            for token, weight in weighted:
+                members[row, vocabulary[token]] = max(members[row, vocabulary[token]], weight)
+
+        tasks = np.zeros((len(self.tasks), members.shape[1]))
+        for row, task in enumerate(self.tasks):
+            text = f"{task.get('task_name', '')} {task.get('epic_name', '')}"
+            columns = [vocabulary[t] for t in tokenize(text) if t in vocabulary]
+            if columns:
+                np.add.at(tasks[row], columns, 1.0)
+
+        return tasks, members
+
+    def similarity_matrix(self) -> np.ndarray:
+        """
+        Cosine similarity between every task and every member, shape
+        (len(tasks), len(team)).
+        """
+        tasks, members = self._vectorize()
+
+        task_norm = np.linalg.norm(tasks, axis=1, keepdims=True)
+        member_norm = np.linalg.norm(members, axis=1, keepdims=True)
+
+        tasks = np.divide(tasks, task_norm, out=np.zeros_like(tasks), where=task_norm > 0)
+        members = np.divide(members, member_norm, out=np.zeros_like(members), where=member_norm > 0)
+
+        return tasks @ members.T
+
+    # ---------- Assignment ----------
+
+    def allocate(self, capacity: dict = None) -> dict:
+        """
+        Returns {"task_assignments": [...], "unassigned": [...], "member_load": {...}}.
+
+        capacity optionally overrides each member's remaining days (e.g. a
+        ledger shared with other allocation passes).
+        """
+        if not self.team or not self.tasks:
+            return {"task_assignments": [], "unassigned": [t.get("id") for t in self.tasks], "member_load": {}}
+
+        similarity = self.similarity_matrix()
+
+        names = [m["name"] for m in self.team]
+        capacity = capacity or {}
+
+        remaining = np.array([
+            np.inf if days is None else float(days)
+            for days in (capacity.get(m["name"], m.get("availability_days")) for m in self.team)
+        ])
+        total = np.where(np.isfinite(remaining), np.maximum(remaining, 1.0), 1.0)
+        load = np.zeros(len(self.team))
+
+        days = np.array([max(int(t.get("timeline_days") or 0), 0) for t in self.tasks])
+
+        assignments = [None] * len(self.tasks)
+        unassigned = []
+
+        # Longest tasks first leaves the small ones to fill the gaps
+        for index in np.argsort(-days, kind="stable"):
+            task = self.tasks[index]
+            feasible = remaining >= days[index]
+
+            if not feasible.any():
+                unassigned.append(task.get("id"))
+                assignments[index] = {**self._task_fields(task), "assigned_to": None, "match_score": 0.0}
+                continue
+
+            # Unlimited members are penalized by raw load instead of load share
+            load_share = np.where(np.isfinite(remaining), load / total, load / (load.sum() + 1.0))
+            score = similarity[index] - LOAD_PENALTY * load_share
+            score = np.where(feasible, score, -np.inf)
+
+            member = int(np.argmax(score))
+            remaining[member] -= days[index]
+            load[member] += days[index]
+
+            assignments[index] = {
+                **self._task_fields(task),
+                "assigned_to": names[member],
+                "match_score": round(float(similarity[index, member]), 4)
+            }
+
+        return {
+            "task_assignments": assignments,
+            "unassigned": unassigned,
+            "member_load": {name: int(load[i]) for i, name in enumerate(names)},
+        }
+
+    @staticmethod
+    def _task_fields(task: dict) -> dict:
+        return {
+            "id": task.get("id"),
+            "task_name": task.get("task_name"),
+            "timeline_days": task.get("timeline_days"),
+            "epic_name": task.get("epic_name"),
+        }
@@ -0,0 +1,186 @@
+import hashlib
+import os
+import re
+
+# phi3's tokenizer averages roughly 4 characters per token on English prose
+CHARS_PER_TOKEN = 4
+
+# -------------------------
+# Context window planning
+# -------------------------
+# Largest num_ctx any call may ask for; input that doesn't fit is split
+LLM_MAX_CTX = int(os.getenv("LLM_MAX_CTX", "4096"))
+LLM_MIN_CTX = int(os.getenv("LLM_MIN_CTX", "1024"))
+# num_ctx is rounded up to a multiple of this so similar prompts share a
+# loaded model instead of forcing Ollama to reload with a new context size
+CTX_STEP = 512
+# estimate_tokens is a heuristic; keep headroom so it never truncates
+CTX_SAFETY = 1.15
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate used for budgeting prompts; no tokenizer round-trip.
+    """
+    if not text:
+        return 0
+
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def tokens_needed(prompt: str, answer_tokens: int) -> int:
+    """
+    Context a call needs for the prompt plus the expected answer, with the
+    CTX_SAFETY headroom.
+    """
+    return int((estimate_tokens(prompt) + answer_tokens) * CTX_SAFETY)
+
+
+def fits_context(prompt: str, answer_tokens: int, max_ctx: int = LLM_MAX_CTX) -> bool:
+    return tokens_needed(prompt, answer_tokens) <= max_ctx
+
+
+def num_ctx_for(prompt: str, answer_tokens: int, max_ctx: int = LLM_MAX_CTX) -> int:
+    """
+    Smallest num_ctx (in CTX_STEP increments) that holds the prompt plus the
+    expected answer, capped at max_ctx.
+    """
+    needed = tokens_needed(prompt, answer_tokens)
+    size = max(LLM_MIN_CTX, -(-needed // CTX_STEP) * CTX_STEP)
+
+    if size > max_ctx:
+        print(f"⚠️ Prompt needs ~{needed} tokens, over the {max_ctx} num_ctx cap")
+        return max_ctx
+
+    return size
+
+
+def input_budget(template: str, answer_tokens: int, max_ctx: int = LLM_MAX_CTX) -> int:
+    """
+    Tokens of input text that fit in one call next to the prompt template
+    and the expected answer.
+    """
+    usable = int(max_ctx / CTX_SAFETY) - estimate_tokens(template) - answer_tokens
+    return max(usable, 1)
+
+
+def split_sentences(text: str) -> list:
+    return [s.strip() for s in re.split(r"(?<=[.!?;])\s+", text) if s.strip()]
+
+
+def split_sections(text: str, budget_tokens: int) -> list:
+    """
+    Splits text into sections of at most budget_tokens, cutting on
+    paragraph boundaries, then sentence boundaries, and only as a last
+    resort inside a sentence.
+    """
+    builder = SectionBuilder(budget_tokens)
+    return builder.add(text) + builder.flush()
+
+
+# Numbered SRS headings ("3", "3.2", "3.2.1 Login") always start a section
+SECTION_HEADING = re.compile(r"^\d+(\.\d+)*\.?\s+\S")
+# Roughly one paragraph in CONTENT_ANCHOR_EVERY also closes a section, chosen
+# by hashing its text so the choice doesn't depend on what came before
+CONTENT_ANCHOR_EVERY = 4
+
+
+def content_sections(text: str, budget_tokens: int) -> list:
+    """
+    Content-defined sections for diffing two revisions of a document.
+
+    Boundaries depend only on nearby text (headings, hash-chosen anchor
+    paragraphs, the budget), so an edit changes the sections around it and
+    leaves the rest of the document's sections byte-identical.
+    """
+    builder = SectionBuilder(budget_tokens)
+    min_tokens = budget_tokens // 4
+    sections = []
+
+    for paragraph in split_paragraphs(text):
+        if builder.pending_tokens and SECTION_HEADING.match(paragraph):
+            sections += builder.flush()
+
+        sections += builder.add(paragraph)
+
+        digest = hashlib.md5(paragraph.encode("utf-8")).digest()
+        if builder.pending_tokens >= min_tokens and digest[0] % CONTENT_ANCHOR_EVERY == 0:
+            sections += builder.flush()
+
+    return sections + builder.flush()
+
+
+def split_paragraphs(text: str) -> list:
+    """
+    Splits text on blank lines, falling back to single lines when the text
+    has no paragraph breaks (pdfplumber output often has none).
+    """
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+
+    if len(paragraphs) <= 1:
+        paragraphs = [line.strip() for line in text.splitlines() if line.strip()]
+
+    return paragraphs
+
+
+class SectionBuilder:
+    """
+    Groups incoming text into sections of at most budget_tokens, cutting on
+    paragraph/line boundaries (oversized paragraphs fall back to sentences).
+    """
+
+    def __init__(self, budget_tokens: int):
+        self.budget_tokens = budget_tokens
+        self._parts = []
+        self._chars = 0
+
+    def add(self, text: str) -> list:
+        """
+        Adds text and returns every section that is now complete.
+        """
+        sections = []
+
+        for paragraph in split_paragraphs(text):
+            for piece in self._fit(paragraph):
+                # Count characters (plus the joining newline) and convert
+                # once, so many short pieces don't each round down to 1 token
+                chars = len(piece) + 1
+
+                if self._parts and (self._chars + chars) // CHARS_PER_TOKEN > self.budget_tokens:
+                    sections.append(self._take())
+
+                self._parts.append(piece)
+                self._chars += chars
+
+        return sections
+
+    def _fit(self, paragraph: str) -> list:
+        if estimate_tokens(paragraph) <= self.budget_tokens:
+            return [paragraph]
+
+        pieces = []
+        max_chars = self.budget_tokens * CHARS_PER_TOKEN
+
+        for sentence in split_sentences(paragraph):
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                pieces.append(sentence[:cut].strip())
+                sentence = sentence[cut:].strip()
+            if sentence:
+                pieces.append(sentence)
+
+        return pieces
+
+    @property
+    def pending_tokens(self) -> int:
+        return self._chars // CHARS_PER_TOKEN
+
+    def flush(self) -> list:
+        return [self._take()] if self._parts else []
+
+    def _take(self) -> str:
+        section = "\n".join(self._parts)
+        self._parts = []
+        self._chars = 0
+        return section
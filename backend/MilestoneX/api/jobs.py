@@ -0,0 +1,78 @@
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from ..database import get_db
+from ..schema.job_schema import JobSubmitResponse, JobResponse
+from ..services.job_service import JobService, FINISHED_STATUSES
+import asyncio
+import json
+
+router = APIRouter()
+
+# Seconds between keep-alive comments / DB polls on the SSE stream
+SSE_POLL_SECONDS = 2.0
+
+
+@router.post(
+    "/jobs/analyze-project",
+    response_model=JobSubmitResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def submit_analyze_project(
+    file: UploadFile = File(...),
+    use_cache: bool = True
+):
+
+    if not file.filename.endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files allowed")
+
+    content = await file.read()
+
+    job_id = await JobService.submit(file.filename, content, use_cache=use_cache)
+
+    return {"job_id": job_id, "status": "queued"}
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+def get_job(job_id: str, db: Session = Depends(get_db)):
+
+    job = JobService.get(db, job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return JobService.to_dict(job)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+
+    if not await asyncio.to_thread(JobService.snapshot, job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        last_sent = None
+
+        while True:
+            # Blocking DB read stays off the event loop
+            snapshot = await asyncio.to_thread(JobService.snapshot, job_id)
+
+            state = (snapshot["status"], snapshot["stage"], snapshot["progress"])
+
+            if state != last_sent:
+                last_sent = state
+                event = "done" if snapshot["status"] in FINISHED_STATUSES else "progress"
+                yield f"event: {event}\ndata: {json.dumps(snapshot, default=str)}\n\n"
+
+                if event == "done":
+                    return
+            else:
+                yield ": keep-alive\n\n"
+
+            await JobService.wait_for_change(SSE_POLL_SECONDS)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -11,7 +11,7 @@ router = APIRouter()
 async def generate_project_milestones(payload: MilestoneRequest):
 
     try:
-        milestones = MilestoneService.create_milestones(payload.text)
+        milestones = await MilestoneService.create_milestones(payload.text)
 
         if not milestones:
             raise HTTPException(
@@ -1,15 +1,25 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from ..services.pdf_services import PDFService
-from ..services.project_service import ProjectService
-from ..schema.project_schema import ProjectAnalysisResponse
+from ..services.project_service import ProjectService, GENERATION_MODE
+from ..schema.project_schema import ProjectAnalysisResponse, ReanalysisResponse
+from ..schema.generation_schema import EPICS_SCHEMA, MILESTONES_SCHEMA
 from ..services.allocation_service import AllocationService
-from sqlalchemy.orm import Session
-from ..database import get_db
+from ..services.ingestion_pipeline import IngestionPipeline, PIPELINE_MODES
+from ..services.reanalysis_service import ReanalysisService, RETIRED_STATUS
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db, AsyncSessionLocal
 from ..models.project import Project
 from ..models.task import Task
 from fastapi import Depends
-from ..schema.teams import AllocationRequest
-from AI_Backend.ai_allocation_generator import TaskAllocator
+from ..schema.teams import AllocationRequest, TeamResponse
+from AI_Backend.llm_cache import llm_cache
+from AI_Backend.ai_task_generator import astream_epics_tasks
+from AI_Backend.ai_milestone_generator import agenerate_milestones
+from AI_Backend.rag import SimpleRAG, DEFAULT_TOP_K, MAX_TOP_K
+from typing import Literal
+import asyncio
 import json
 
 router = APIRouter()
@@ -21,15 +31,35 @@ router = APIRouter()
 )
 async def analyze_project(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    use_cache: bool = True,
+    pipelined: bool = False,
+    generation_mode: Literal["separate", "joint", "scheduled"] = GENERATION_MODE,
+    db: AsyncSession = Depends(get_async_db)
 ):
 
     if not file.filename.endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files allowed")
 
+    if pipelined and generation_mode not in PIPELINE_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"generation_mode '{generation_mode}' cannot be combined with pipelined"
+        )
+
     try:
-        # 1️⃣ Extract SRS
-        extracted_text = await PDFService.extract_text(file)
+        if pipelined:
+            # 1️⃣ + 2️⃣ Generate per section while later pages are still extracted
+            result = await IngestionPipeline.run(
+                await file.read(),
+                use_cache=use_cache,
+                mode=generation_mode
+            )
+            extracted_text = result["srs_text"]
+            preprocessing = result["preprocessing"]
+        else:
+            # 1️⃣ Extract SRS (boilerplate stripped before it reaches phi3)
+            extracted_text, report = await PDFService.extract_pages(await file.read())
+            preprocessing = report["preprocess"]
 
         if not extracted_text:
             raise HTTPException(
@@ -37,93 +67,197 @@ async def analyze_project(
                 detail="Empty PDF"
             )
 
-        # 2️⃣ Generate AI Output
-        result = ProjectService.analyze_project(extracted_text)
-
-        # 3️⃣ Create Project
-        project = Project(srs_text=extracted_text)
-        db.add(project)
-        db.commit()
-        db.refresh(project)
+        if not pipelined:
+            # 2️⃣ Generate AI Output (tasks + milestones run concurrently)
+            result = await ProjectService.analyze_project(
+                extracted_text,
+                use_cache=use_cache,
+                mode=generation_mode
+            )
 
-        # 4️⃣ Store Tasks
-        for epic in result["epics"]:
+        if ProjectService.generation_failed(result):
+            raise HTTPException(
+                status_code=502,
+                detail=f"AI generation failed: {result['errors']}"
+            )
 
-            for task in epic["tasks"]:
+        # 3️⃣ Store Project + Tasks
+        response = await db.run_sync(ProjectService.save_analysis, extracted_text, result)
+        response["preprocessing"] = preprocessing
 
-                task_name = task.get("task_name", "").strip()
-                timeline = task.get("timeline_days", 0)
+        return response
 
-                # 🔥 Filter invalid AI tasks
-                if not task_name or int(timeline) <= 0:
-                    continue
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
 
-                db_task = Task(
-                    project_id=project.id,
-                    epic_name=epic["epic_name"],   # ✅ correct field
-                    description=epic["description"],
-                    task_name=task_name,
-                    timeline_days=int(timeline),
-                    assigned_to=None,
-                    status="pending"
-                )
+@router.post(
+    "/projects/{project_id}/reanalyze",
+    response_model=ReanalysisResponse
+)
+async def reanalyze_project(
+    project_id: int,
+    file: UploadFile = File(...),
+    use_cache: bool = True,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Re-analyzes an existing project against a revised SRS: only new or
+    changed sections are regenerated, tasks of removed sections are retired
+    and unchanged tasks keep their id, assignee and status.
+    """
 
-                db.add(db_task)
+    if not file.filename.endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files allowed")
 
-        db.commit()
+    project = await db.get(Project, project_id)
 
-        # 5️⃣ Fetch stored tasks
-        stored_tasks = db.query(Task).filter(
-            Task.project_id == project.id
-        ).all()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
 
-        # 6️⃣ Build response matching TaskResponse schema
-        from collections import defaultdict
+    try:
+        extracted_text, report = await PDFService.extract_pages(await file.read())
 
-        epic_map = defaultdict(lambda: {
-            "epic_name": "",
-            "description": "",
-            "tasks": []
-        })
+        if not extracted_text:
+            raise HTTPException(status_code=400, detail="Empty PDF")
 
-        for t in stored_tasks:
-            epic_map[t.epic_name]["epic_name"] = t.epic_name
-            epic_map[t.epic_name]["description"] = t.description
+        result = await ReanalysisService.reanalyze(
+            db,
+            project,
+            extracted_text,
+            use_cache=use_cache
+        )
 
-            epic_map[t.epic_name]["tasks"].append({
-                "task_name": t.task_name,
-                "timeline_days": t.timeline_days,
-                "status": t.status
-            })
+        if ReanalysisService.generation_failed(result):
+            raise HTTPException(
+                status_code=502,
+                detail=f"AI generation failed: {result['errors']}"
+            )
 
-        epics_response = list(epic_map.values())
+        result["preprocessing"] = report["preprocess"]
 
-        # 7️⃣ Return correct structure
-        return {
-            "project_id": project.id,
-            "epics": epics_response,
-            "milestones": result["milestones"]
-        }
+        return result
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post("/analyze-project/stream")
+async def analyze_project_stream(
+    file: UploadFile = File(...),
+    use_cache: bool = True
+):
+    """
+    Server-Sent Events variant of /analyze-project.
+
+    Emits an "epic" event for every epic as soon as the model finishes it,
+    then "milestones", then "done" with the stored ProjectAnalysisResponse.
+    """
+
+    if not file.filename.endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files allowed")
+
+    extracted_text = await PDFService.extract_text(file)
+
+    if not extracted_text:
+        raise HTTPException(status_code=400, detail="Empty PDF")
+
+    async def event_stream():
+        # Milestones are generated alongside the streamed epics
+        milestones_task = asyncio.create_task(
+            agenerate_milestones(extracted_text, use_cache, schema=MILESTONES_SCHEMA)
+        )
+
+        try:
+            epics = []
+            errors = {}
+
+            try:
+                async for raw_epic in astream_epics_tasks(extracted_text, use_cache, schema=EPICS_SCHEMA):
+                    epic = ProjectService.clean_epic(raw_epic)
+                    if epic is None:
+                        continue
+                    epics.append(epic)
+                    yield _sse("epic", epic)
+            except Exception as e:
+                errors["epics"] = str(e)
+                yield _sse("error", {"stage": "epics", "detail": str(e)})
+
+            try:
+                raw_milestones = await milestones_task
+            except Exception as e:
+                raw_milestones = []
+                errors["milestones"] = str(e)
+                yield _sse("error", {"stage": "milestones", "detail": str(e)})
+
+            milestones = ProjectService.clean_milestones(raw_milestones)
+            yield _sse("milestones", milestones)
+
+            if not epics and not milestones:
+                return
+
+            async with AsyncSessionLocal() as db:
+                response = await db.run_sync(
+                    ProjectService.save_analysis,
+                    extracted_text,
+                    {"epics": epics, "milestones": milestones, "errors": errors}
+                )
+
+            yield _sse("done", response)
+        finally:
+            # A disconnected client closes the stream early: stop the
+            # milestone call instead of leaving it running unobserved
+            milestones_task.cancel()
+            if milestones_task.done() and not milestones_task.cancelled():
+                milestones_task.exception()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 
 @router.post("/allocate/{project_id}")
 async def allocate_project_tasks(
     project_id: int,
     payload: AllocationRequest,
-    db: Session = Depends(get_db)
+    use_cache: bool = True,
+    mode: Literal["llm", "engine", "hybrid", "sharded"] = "llm",
+    db: AsyncSession = Depends(get_async_db)
 ):
 
-    tasks = db.query(Task).filter(Task.project_id == project_id).all()
+    project = await db.get(Project, project_id)
+
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    tasks = (await db.scalars(
+        select(Task).where(
+            Task.project_id == project_id,
+            Task.status != RETIRED_STATUS
+        )
+    )).all()
 
     if not tasks:
-        return {
-            "project_id": project_id,
-            "allocation": [],
-            "message": "No tasks found for this project"
-        }
+        raise HTTPException(status_code=400, detail="No tasks found for this project")
+
+    team_payload = [member.dict() for member in payload.team]
+
+    # Stored so later task edits can be allocated incrementally
+    try:
+        await db.run_sync(AllocationService.save_team, project_id, team_payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await db.commit()
 
     tasks_payload = [
     {
@@ -135,34 +269,94 @@ async def allocate_project_tasks(
         for t in tasks
     ]
 
-    team_payload = [member.dict() for member in payload.team]
-
-    allocation_result = AllocationService.allocate(
+    allocation_result = await AllocationService.allocate(
         team_payload,
-        tasks_payload
+        tasks_payload,
+        use_cache=use_cache,
+        mode=mode
     )
 
     # Extract actual list
-    assignments = []
+    assignments = AllocationService.extract_assignments(allocation_result)
 
-    if isinstance(allocation_result, dict):
-        assignments = allocation_result.get("task_assignments", [])
-    elif isinstance(allocation_result, list):
-        assignments = allocation_result
+    # Update DB (one UPDATE for every matched assignment)
+    await db.run_sync(AllocationService.apply_allocations, project_id, tasks, assignments)
 
-    # Update DB
-    for alloc in assignments:
-        db_task = db.query(Task).filter(
-            Task.project_id == project_id,
-            Task.id == alloc.get("id")
-        ).first()
+    await db.run_sync(AllocationService.refresh_load, project_id)
+    await db.commit()
 
-        if db_task:
-            db_task.assigned_to = alloc.get("assigned_to")
+    return {
+        "project_id": project_id,
+        "allocation": allocation_result
+    }
 
-    db.commit()
 
+@router.get("/projects/{project_id}/team", response_model=TeamResponse)
+async def get_project_team(project_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    The stored team with each member's current load.
+    """
     return {
         "project_id": project_id,
-        "allocation": allocation_result
-    }
\ No newline at end of file
+        "team": await db.run_sync(AllocationService.team_response, project_id)
+    }
+
+
+@router.put("/projects/{project_id}/team", response_model=TeamResponse)
+async def set_project_team(
+    project_id: int,
+    payload: AllocationRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Stores the team without allocating; existing assignments are kept and
+    new or edited tasks are allocated against it incrementally.
+    """
+    project = await db.get(Project, project_id)
+
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    try:
+        await db.run_sync(AllocationService.save_team, project_id, [member.dict() for member in payload.team])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await db.commit()
+
+    return {
+        "project_id": project_id,
+        "team": await db.run_sync(AllocationService.team_response, project_id)
+    }
+
+
+@router.get("/projects/{project_id}/search")
+async def search_project_srs(
+    project_id: int,
+    q: str,
+    k: int = Query(DEFAULT_TOP_K, ge=1, le=MAX_TOP_K),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    BM25 search over the project's SRS chunks (index is built once and
+    persisted per project).
+    """
+    project = await db.get(Project, project_id)
+
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    # Index build / load is CPU and disk work: keep it off the event loop
+    results = await asyncio.to_thread(
+        lambda: SimpleRAG.for_project(project.id, project.srs_text or "").retrieve_scored(q, k)
+    )
+
+    return {
+        "project_id": project.id,
+        "query": q,
+        "results": results
+    }
+
+
+@router.get("/llm-cache/stats")
+def llm_cache_stats():
+    return llm_cache.stats()
@@ -0,0 +1,120 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from ..database import get_db
+from ..models.project import Project
+from ..models.task import Task
+from ..schema.milestone_schema import MilestoneResponse
+from ..schema.schedule_schema import DependencyCreate, DependencyResponse, ScheduleResponse
+from ..services.schedule_service import ScheduleService
+
+
+router = APIRouter()
+
+
+def _get_project(db: Session, project_id: int) -> Project:
+    project = db.query(Project).filter(Project.id == project_id).first()
+
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    return project
+
+
+def _get_task(db: Session, task_id: int) -> Task:
+    task = db.query(Task).filter(Task.id == task_id).first()
+
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    return task
+
+
+@router.get("/projects/{project_id}/schedule", response_model=ScheduleResponse)
+def get_project_schedule(project_id: int, db: Session = Depends(get_db)):
+    """
+    Critical-path schedule of the project's active tasks: earliest start /
+    finish, slack and the critical chain, plus epic milestones.
+    """
+    _get_project(db, project_id)
+
+    try:
+        return ScheduleService.project_schedule(db, project_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post("/projects/{project_id}/schedule", response_model=ScheduleResponse)
+def rebuild_project_schedule(project_id: int, db: Session = Depends(get_db)):
+    """
+    Recomputes and stores every task's start / finish day. Projects created
+    before dependencies existed get their default epic sequence edges first.
+    """
+    _get_project(db, project_id)
+
+    try:
+        ScheduleService.ensure_sequence_edges(db, project_id)
+        db.flush()
+        ScheduleService.reschedule(db, project_id)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+
+    db.commit()
+
+    return ScheduleService.project_schedule(db, project_id)
+
+
+@router.get("/projects/{project_id}/milestones", response_model=MilestoneResponse)
+def get_project_milestones(project_id: int, db: Session = Depends(get_db)):
+    """
+    Milestones derived from epic finish times (no model call).
+    """
+    _get_project(db, project_id)
+
+    try:
+        return {"milestones": ScheduleService.project_schedule(db, project_id)["milestones"]}
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/tasks/{task_id}/dependencies", response_model=DependencyResponse)
+def get_task_dependencies(task_id: int, db: Session = Depends(get_db)):
+    task = _get_task(db, task_id)
+
+    return {"task_id": task.id, "depends_on": ScheduleService.depends_on(db, task.id)}
+
+
+@router.post("/tasks/{task_id}/dependencies", response_model=DependencyResponse)
+def add_task_dependency(
+    task_id: int,
+    payload: DependencyCreate,
+    db: Session = Depends(get_db)
+):
+    task = _get_task(db, task_id)
+    depends_on = _get_task(db, payload.depends_on_id)
+
+    try:
+        ScheduleService.add_dependency(db, task, depends_on)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    db.commit()
+
+    return {"task_id": task_id, "depends_on": ScheduleService.depends_on(db, task_id)}
+
+
+@router.delete("/tasks/{task_id}/dependencies/{depends_on_id}", response_model=DependencyResponse)
+def remove_task_dependency(
+    task_id: int,
+    depends_on_id: int,
+    db: Session = Depends(get_db)
+):
+    task = _get_task(db, task_id)
+
+    if not ScheduleService.remove_dependency(db, task, depends_on_id):
+        raise HTTPException(status_code=404, detail="Dependency not found")
+
+    db.commit()
+
+    return {"task_id": task_id, "depends_on": ScheduleService.depends_on(db, task_id)}
@@ -1,44 +1,170 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..schema.task_schema import TaskCreate, TaskResponse, TaskUpdate
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from ..schema.task_schema import (
+    TaskBatchDelete,
+    TaskBatchResponse,
+    TaskBatchUpdate,
+    TaskCreate,
+    TaskResponse,
+    TaskUpdate
+)
 from ..models.task import Task
-from ..database import get_db
+from ..services.task_service import TaskService, TASK_BATCH_MAX
+from ..database import get_async_db
 
 
 router = APIRouter()
 
+
+def _batch_response(results: list) -> dict:
+    succeeded = sum(1 for result in results if result["ok"])
+    return {"succeeded": succeeded, "failed": len(results) - succeeded, "results": results}
+
+
+def _check_batch_size(items: list):
+    if len(items) > TASK_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {TASK_BATCH_MAX} items per batch")
+
 @router.post("/projects/{project_id}/tasks", response_model=TaskResponse)
-def create_task(
+async def create_task(
     project_id: int,
     payload: TaskCreate,
-    db: Session = Depends(get_db)
+    allocate: bool = True,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    allocate assigns the new task to the best-matching member of the
+    project's stored team that has room (no model call).
+    """
+    try:
+        return await db.run_sync(
+            TaskService.create_task,
+            project_id,
+            payload.dict(exclude={"depends_on"}),
+            payload.depends_on,
+            allocate
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/projects/{project_id}/tasks/batch", response_model=TaskBatchResponse)
+async def create_tasks_batch(
+    project_id: int,
+    payload: list[TaskCreate],
+    allocate: bool = True,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    task = Task(
-        project_id=project_id,
-        epic_name=payload.epic_name,
-        description=payload.description,
-        task_name=payload.task_name,
-        timeline_days=payload.timeline_days,
-        status="pending"
+    """
+    Creates many tasks in one transaction (one commit). Items fail
+    individually; see the per-item results.
+    """
+    _check_batch_size(payload)
+
+    results = await db.run_sync(
+        TaskService.create_tasks,
+        project_id,
+        [(item.dict(exclude={"depends_on"}), item.depends_on) for item in payload],
+        allocate
     )
 
-    db.add(task)
-    db.commit()
-    db.refresh(task)
-
-    return task
+    return _batch_response(results)
 
-@router.get("/projects/{project_id}/tasks", response_model=list[TaskResponse])
-def get_project_tasks(project_id: int, db: Session = Depends(get_db)):
+# Declared before /tasks/{task_id} so "batch" is not parsed as a task id
+@router.put("/tasks/batch", response_model=TaskBatchResponse)
+async def update_tasks_batch(
+    payload: list[TaskBatchUpdate],
+    allocate: bool = True,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Applies many partial updates (e.g. a kanban drag or bulk re-status) in
+    one transaction. Only the fields set on each item change.
+    """
+    _check_batch_size(payload)
+
+    results = await db.run_sync(
+        TaskService.update_tasks,
+        [(item.id, item.dict(exclude_unset=True, exclude={"id"})) for item in payload],
+        allocate
+    )
 
-    tasks = db.query(Task).filter(Task.project_id == project_id).all()
+    return _batch_response(results)
 
-    return tasks
+@router.delete("/tasks/batch", response_model=TaskBatchResponse)
+async def delete_tasks_batch(
+    payload: TaskBatchDelete = Body(...),
+    db: AsyncSession = Depends(get_async_db)
+):
+    _check_batch_size(payload.ids)
+
+    results = await db.run_sync(TaskService.delete_tasks, payload.ids)
+
+    return _batch_response(results)
+
+# Rows come back projected to the requested fields, so the response is
+# documented as raw task objects rather than validated TaskResponse models
+@router.get(
+    "/projects/{project_id}/tasks",
+    response_class=JSONResponse,
+    responses={
+        200: {
+            "description": "Tasks ordered by id, each limited to the requested fields "
+                           "(every TaskResponse field when fields is omitted)",
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": {"type": "object"}}
+                }
+            },
+            "headers": {
+                "X-Next-Cursor": {
+                    "description": "cursor for the next page; absent on the last page",
+                    "schema": {"type": "integer"}
+                }
+            }
+        }
+    }
+)
+async def get_project_tasks(
+    project_id: int,
+    cursor: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    status: Optional[str] = None,
+    epic_name: Optional[str] = None,
+    assigned_to: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Keyset-paginated task listing.
+
+    cursor: id of the last task of the previous page (X-Next-Cursor header
+    of that response); the header is absent on the last page. Without
+    limit every matching task is returned.
+    fields: comma-separated projection, e.g. id,task_name,status,assigned_to
+    """
+    try:
+        columns = TaskService.parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    rows = (await db.execute(
+        TaskService.list_query(project_id, columns, status, epic_name, assigned_to, cursor, limit)
+    )).mappings().all()
+
+    headers = {}
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = str(rows[-1]["id"])
+
+    # Rows are already plain columns: skip per-task model validation
+    return JSONResponse(content=[dict(row) for row in rows], headers=headers)
 
 @router.get("/tasks/{task_id}", response_model=TaskResponse)
-def get_task(task_id: int, db: Session = Depends(get_db)):
+async def get_task(task_id: int, db: AsyncSession = Depends(get_async_db)):
 
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = await db.get(Task, task_id)
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -46,33 +172,32 @@ def get_task(task_id: int, db: Session = Depends(get_db)):
     return task
 
 @router.put("/tasks/{task_id}", response_model=TaskResponse)
-def update_task(
+async def update_task(
     task_id: int,
     payload: TaskUpdate,
-    db: Session = Depends(get_db)
+    allocate: bool = True,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    task = db.query(Task).filter(Task.id == task_id).first()
+    """
+    allocate moves the task to another member only if the edit puts its
+    member over capacity (or it has none); other assignments are untouched.
+    """
+    task = await db.run_sync(
+        TaskService.update_task,
+        task_id,
+        payload.dict(exclude_unset=True),
+        allocate
+    )
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    for key, value in payload.dict(exclude_unset=True).items():
-        setattr(task, key, value)
-
-    db.commit()
-    db.refresh(task)
-
     return task
 
 @router.delete("/tasks/{task_id}")
-def delete_task(task_id: int, db: Session = Depends(get_db)):
-
-    task = db.query(Task).filter(Task.id == task_id).first()
+async def delete_task(task_id: int, db: AsyncSession = Depends(get_async_db)):
 
-    if not task:
+    if not await db.run_sync(TaskService.delete_task, task_id):
         raise HTTPException(status_code=404, detail="Task not found")
 
-    db.delete(task)
-    db.commit()
-
-    return {"message": "Task deleted successfully"}
\ No newline at end of file
+    return {"message": "Task deleted successfully"}
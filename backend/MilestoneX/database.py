@@ -1,19 +1,152 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from sqlalchemy.pool import StaticPool
 from fastapi import Depends
+import os
 
 # -------------------------
 # Database URL
 # -------------------------
-DATABASE_URL = "sqlite:///./milestonex.db"
+# DATABASE_URL is the standard setting; MILESTONEX_DATABASE_URL overrides
+# it when several apps share one environment
+DATABASE_URL = os.getenv(
+    "MILESTONEX_DATABASE_URL",
+    os.getenv("DATABASE_URL", "sqlite:///./milestonex.db")
+)
+
+# Async drivers for the same database
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_url(url: str) -> str:
+    """
+    The async-driver form of a sync URL (sqlite -> aiosqlite,
+    postgresql -> asyncpg); URLs that already name a driver are kept.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+
+    if parsed.get_driver_name() in ("aiosqlite", "asyncpg") or backend not in ASYNC_DRIVERS:
+        return url
+
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("MILESTONEX_ASYNC_DATABASE_URL", async_url(DATABASE_URL))
+
+# -------------------------
+# Connection settings
+# -------------------------
+DB_POOL_SIZE = int(os.getenv("MILESTONEX_DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("MILESTONEX_DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("MILESTONEX_DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("MILESTONEX_DB_POOL_RECYCLE", "1800"))
+
+# Applied to every new SQLite connection. WAL lets readers run alongside
+# the single writer (no "database is locked" for concurrent uploads),
+# synchronous=NORMAL is durable in WAL mode, and busy_timeout makes a
+# second writer wait instead of failing at once.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("MILESTONEX_SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("MILESTONEX_SQLITE_SYNCHRONOUS", "NORMAL"),
+    "cache_size": int(os.getenv("MILESTONEX_SQLITE_CACHE_KB", "65536")) * -1,   # negative = KiB
+    "mmap_size": int(os.getenv("MILESTONEX_SQLITE_MMAP_BYTES", str(256 * 1024 * 1024))),
+    "temp_store": "MEMORY",
+    "busy_timeout": int(os.getenv("MILESTONEX_SQLITE_BUSY_TIMEOUT_MS", "5000")),
+}
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None, pragmas: dict = None):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in (pragmas or SQLITE_PRAGMAS).items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def make_engine(url: str = DATABASE_URL, pragmas: dict = None):
+    """
+    Engine with the pool and (for SQLite) the pragmas above.
+    In-memory SQLite gets a single shared connection.
+    """
+    if not url.startswith("sqlite"):
+        return create_engine(
+            url,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=True
+        )
+
+    if url in ("sqlite://", "sqlite:///:memory:"):
+        sqlite_engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+    else:
+        sqlite_engine = create_engine(
+            url,
+            # Sessions are handed across threads by FastAPI / to_thread
+            connect_args={"check_same_thread": False},
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT
+        )
+
+    @event.listens_for(sqlite_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, connection_record, pragmas)
+
+    return sqlite_engine
+
+
+def make_async_engine(url: str = ASYNC_DATABASE_URL, pragmas: dict = None):
+    """
+    Async counterpart of make_engine (same pool settings and pragmas).
+    """
+    if not url.startswith("sqlite"):
+        return create_async_engine(
+            url,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=True
+        )
+
+    if make_url(url).database in (None, "", ":memory:"):
+        async_engine = create_async_engine(url, poolclass=StaticPool)
+    else:
+        async_engine = create_async_engine(
+            url,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT
+        )
+
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, connection_record, pragmas)
+
+    return async_engine
+
 
 # -------------------------
 # Engine
 # -------------------------
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Required only for SQLite
-)
+engine = make_engine()
+
+# Used by the async routers; sync services run on it via
+# AsyncSession.run_sync
+async_engine = make_async_engine()
 
 # -------------------------
 # Session Local
@@ -24,6 +157,15 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Objects stay readable after commit: the async session cannot lazy-load
+# expired attributes
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # -------------------------
 # Base class
 # -------------------------
@@ -37,4 +179,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,14 +1,30 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from .api import upload, milestones
 from .api import project as project_api
 from fastapi.middleware.cors import CORSMiddleware
 
-from .database import engine
-from .models import project, task
+from .database import async_engine
+from .migrations import run_migrations
 from .api import task as task_api
+from .api import jobs as jobs_api
+from .api import schedule as schedule_api
+from .services.job_service import JobService
 
-project.Base.metadata.create_all(bind=engine)
-app = FastAPI(title="AI Project Manager Backend")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema upgrades run before anything touches the database
+    run_migrations()
+
+    # Background analysis workers (resumes jobs left over from the last run)
+    await JobService.start()
+    yield
+    await JobService.stop()
+    await async_engine.dispose()
+
+
+app = FastAPI(title="AI Project Manager Backend", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,6 +32,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Task listings return their pagination cursor in a header
+    expose_headers=["X-Next-Cursor"],
 )
 
 # app.include_router(upload.router, prefix="/api")
@@ -28,6 +46,8 @@ app.add_middleware(
 
 app.include_router(project_api.router, prefix="/api", tags=["Project"])
 app.include_router(task_api.router, prefix="/api", tags=["Tasks"])
+app.include_router(jobs_api.router, prefix="/api", tags=["Jobs"])
+app.include_router(schedule_api.router, prefix="/api", tags=["Schedule"])
 @app.get("/")
 def index():
     return {"message": "Hello, World!"}
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""
+Versioned schema migrations.
+
+Each migration runs once, in version order, inside its own transaction and
+is recorded in schema_migrations. Steps are written to be idempotent
+(checkfirst / column checks) so databases created by the old create_all()
+at import time upgrade cleanly from version 0.
+
+Add a schema change by appending a new (version, name, upgrade) entry to
+MIGRATIONS; never edit one that has shipped.
+"""
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, insert, select
+from .database import Base, engine
+from .models import project, task, task_dependency, team_member, job  # noqa: F401 (registers tables)
+
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String),
+    Column("applied_at", DateTime),
+)
+
+
+# -------------------------
+# Helpers
+# -------------------------
+def add_column(conn, table_name: str, column_name: str):
+    """
+    ALTER TABLE ... ADD COLUMN for a (nullable) model column, plus its
+    single-column index; skipped if the column exists.
+    """
+    existing = {column["name"] for column in inspect(conn).get_columns(table_name)}
+    if column_name in existing:
+        return
+
+    column = Base.metadata.tables[table_name].c[column_name]
+    column_type = column.type.compile(dialect=conn.dialect)
+    conn.exec_driver_sql(f'ALTER TABLE {table_name} ADD COLUMN "{column_name}" {column_type}')
+    print(f"🛠️ Added column {table_name}.{column_name}")
+
+    for index in Base.metadata.tables[table_name].indexes:
+        if [c.name for c in index.columns] == [column_name]:
+            index.create(conn, checkfirst=True)
+
+
+def create_index(conn, table_name: str, index_name: str):
+    index = next(i for i in Base.metadata.tables[table_name].indexes if i.name == index_name)
+    index.create(conn, checkfirst=True)
+
+
+# -------------------------
+# Migrations
+# -------------------------
+# The schema before migration 2, frozen as DDL so a fresh database goes
+# through every later step exactly like an upgraded one. Never derive it
+# from the current models.
+BASELINE_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS projects (
+        id INTEGER NOT NULL,
+        name VARCHAR,
+        srs_text TEXT,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_projects_id ON projects (id)",
+    """
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER NOT NULL,
+        project_id INTEGER,
+        epic_name VARCHAR,
+        description TEXT,
+        task_name VARCHAR,
+        timeline_days INTEGER,
+        assigned_to VARCHAR,
+        status VARCHAR,
+        PRIMARY KEY (id),
+        FOREIGN KEY(project_id) REFERENCES projects (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_tasks_id ON tasks (id)",
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id VARCHAR NOT NULL,
+        status VARCHAR,
+        stage VARCHAR,
+        progress INTEGER,
+        filename VARCHAR,
+        use_cache BOOLEAN,
+        pdf_content BLOB,
+        project_id INTEGER,
+        result TEXT,
+        error TEXT,
+        created_at DATETIME,
+        updated_at DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(project_id) REFERENCES projects (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_jobs_id ON jobs (id)",
+    """
+    CREATE TABLE IF NOT EXISTS task_dependencies (
+        id INTEGER NOT NULL,
+        project_id INTEGER,
+        task_id INTEGER,
+        depends_on_id INTEGER,
+        PRIMARY KEY (id),
+        CONSTRAINT uq_task_dependency UNIQUE (task_id, depends_on_id),
+        FOREIGN KEY(project_id) REFERENCES projects (id),
+        FOREIGN KEY(task_id) REFERENCES tasks (id),
+        FOREIGN KEY(depends_on_id) REFERENCES tasks (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_task_dependencies_id ON task_dependencies (id)",
+    "CREATE INDEX IF NOT EXISTS ix_task_dependencies_project_id ON task_dependencies (project_id)",
+    "CREATE INDEX IF NOT EXISTS ix_task_dependencies_task_id ON task_dependencies (task_id)",
+    "CREATE INDEX IF NOT EXISTS ix_task_dependencies_depends_on_id ON task_dependencies (depends_on_id)",
+    """
+    CREATE TABLE IF NOT EXISTS team_members (
+        id INTEGER NOT NULL,
+        project_id INTEGER,
+        name VARCHAR,
+        role VARCHAR,
+        skills TEXT,
+        availability_days INTEGER,
+        load_days INTEGER,
+        PRIMARY KEY (id),
+        CONSTRAINT uq_team_member_name UNIQUE (project_id, name),
+        FOREIGN KEY(project_id) REFERENCES projects (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_team_members_id ON team_members (id)",
+    "CREATE INDEX IF NOT EXISTS ix_team_members_project_id ON team_members (project_id)",
+]
+
+
+def _0001_baseline(conn):
+    # Fresh databases get the baseline tables; existing ones keep theirs
+    for statement in BASELINE_DDL:
+        conn.exec_driver_sql(statement)
+
+
+def _0002_task_section_and_schedule(conn):
+    for column_name in ("section_key", "sequence", "start_day", "finish_day"):
+        add_column(conn, "tasks", column_name)
+
+
+def _0003_task_composite_indexes(conn):
+    create_index(conn, "tasks", "ix_tasks_project_epic")
+    create_index(conn, "tasks", "ix_tasks_project_status")
+
+
+def _0004_task_listing_indexes(conn):
+    create_index(conn, "tasks", "ix_tasks_project_assignee")
+    create_index(conn, "tasks", "ix_tasks_project_id")
+
+
+def _0005_job_leases(conn):
+    for column_name in ("worker_id", "lease_expires_at"):
+        add_column(conn, "jobs", column_name)
+
+
+MIGRATIONS = [
+    (1, "baseline", _0001_baseline),
+    (2, "task section and schedule columns", _0002_task_section_and_schedule),
+    (3, "task composite indexes", _0003_task_composite_indexes),
+    (4, "task listing indexes", _0004_task_listing_indexes),
+    (5, "job leases", _0005_job_leases),
+]
+
+
+def current_version(bind=engine) -> int:
+    with bind.connect() as conn:
+        if not inspect(conn).has_table(schema_migrations.name):
+            return 0
+        return max(conn.scalars(select(schema_migrations.c.version)).all(), default=0)
+
+
+def run_migrations(bind=engine) -> int:
+    """
+    Applies every pending migration; returns the resulting version.
+    """
+    schema_migrations.create(bind, checkfirst=True)
+    version = current_version(bind)
+
+    for number, name, upgrade in MIGRATIONS:
+        if number <= version:
+            continue
+
+        with bind.begin() as conn:
+            upgrade(conn)
+            conn.execute(insert(schema_migrations).values(
+                version=number,
+                name=name,
+                applied_at=datetime.utcnow()
+            ))
+
+        print(f"🗄️ Migrated database to version {number}: {name}")
+        version = number
+
+    return version
+
+
+if __name__ == "__main__":
+    # Run from backend/:  python -m MilestoneX.migrations
+    print(f"Database at version {run_migrations()}")
@@ -0,0 +1,29 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, LargeBinary, ForeignKey
+from ..database import Base
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True, index=True)
+    status = Column(String, default="queued")   # queued / running / completed / failed
+    stage = Column(String, nullable=True)
+    progress = Column(Integer, default=0)
+
+    filename = Column(String, nullable=True)
+    use_cache = Column(Boolean, default=True)
+    # Kept until the job finishes so queued/running jobs can be resumed after a restart
+    pdf_content = Column(LargeBinary, nullable=True)
+
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
+    result = Column(Text, nullable=True)   # JSON ProjectAnalysisResponse
+    error = Column(Text, nullable=True)
+
+    # Set when a worker claims the job; a running job whose lease has
+    # expired was orphaned by a dead process and may be re-queued
+    worker_id = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
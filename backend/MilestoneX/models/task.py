@@ -1,10 +1,24 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 
 
+# Tasks of SRS sections that were removed by a re-analysis; kept for history
+# but ignored by allocation and scheduling
+RETIRED_STATUS = "retired"
+
+
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Every listing / allocation / analysis query filters on project_id
+        # first, then on one of these
+        Index("ix_tasks_project_epic", "project_id", "epic_name"),
+        Index("ix_tasks_project_status", "project_id", "status"),
+        Index("ix_tasks_project_assignee", "project_id", "assigned_to"),
+        # Unfiltered keyset pages: seeks project_id = ? AND id > ? in id order
+        Index("ix_tasks_project_id", "project_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
@@ -15,6 +29,18 @@ class Task(Base):
     timeline_days = Column(Integer)
 
     assigned_to = Column(String, nullable=True)
-    status = Column(String, default="pending") 
+    status = Column(String, default="pending")   # pending / ... / retired
+
+    # Order inside the epic as generated; predecessor edges live in
+    # task_dependencies
+    sequence = Column(Integer, nullable=True)
+
+    # Earliest start / finish in days from project start (ScheduleService)
+    start_day = Column(Integer, nullable=True)
+    finish_day = Column(Integer, nullable=True)
+
+    # Content hash of the SRS section the task was generated from (see
+    # SectionService); lets a revised SRS be re-analyzed section by section
+    section_key = Column(String, nullable=True, index=True)
 
     project = relationship("Project", back_populates="tasks")
\ No newline at end of file
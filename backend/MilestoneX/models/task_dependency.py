@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint
+from ..database import Base
+
+
+class TaskDependency(Base):
+    """
+    Predecessor edge: task_id cannot start before depends_on_id finishes.
+    """
+    __tablename__ = "task_dependencies"
+    __table_args__ = (
+        UniqueConstraint("task_id", "depends_on_id", name="uq_task_dependency"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True)
+
+    task_id = Column(Integer, ForeignKey("tasks.id"), index=True)
+    depends_on_id = Column(Integer, ForeignKey("tasks.id"), index=True)
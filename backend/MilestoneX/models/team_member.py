@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, UniqueConstraint
+from ..database import Base
+
+
+class TeamMember(Base):
+    """
+    The team a project was last allocated with, plus the per-member load
+    aggregate that incremental allocation reads instead of summing tasks.
+    """
+    __tablename__ = "team_members"
+    __table_args__ = (
+        UniqueConstraint("project_id", "name", name="uq_team_member_name"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True)
+
+    name = Column(String)
+    role = Column(String, nullable=True)
+    skills = Column(Text, default="[]")   # JSON list
+    availability_days = Column(Integer, nullable=True)   # None = unlimited
+
+    # Sum of timeline_days of the member's active tasks
+    load_days = Column(Integer, default=0)
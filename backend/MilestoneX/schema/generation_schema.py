@@ -0,0 +1,72 @@
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from typing import List
+from .milestone_schema import Milestone
+from .project_schema import EpicResponse
+
+
+class EpicsEnvelope(BaseModel):
+    epics: List[EpicResponse]
+
+
+class MilestonesEnvelope(BaseModel):
+    milestones: List[Milestone]
+
+
+class ProjectPlanEnvelope(BaseModel):
+    epics: List[EpicResponse]
+    milestones: List[Milestone]
+
+
+# Filled in by the server, never generated
+SERVER_FIELDS = {"id", "status", "sequence"}
+
+
+def generation_schema(model) -> dict:
+    """
+    JSON schema passed to Ollama as `format`: the model's own schema with
+    server-side fields removed and every remaining property required, so
+    the constrained output always carries the canonical keys.
+    """
+    schema = model.model_json_schema()
+
+    for definition in [schema, *schema.get("$defs", {}).values()]:
+        properties = definition.get("properties")
+        if properties is None:
+            continue
+        for field in SERVER_FIELDS & properties.keys():
+            del properties[field]
+        for prop in properties.values():
+            prop.pop("default", None)
+        definition["required"] = list(properties)
+
+    return schema
+
+
+EPICS_SCHEMA = generation_schema(EpicsEnvelope)
+MILESTONES_SCHEMA = generation_schema(MilestonesEnvelope)
+PROJECT_PLAN_SCHEMA = generation_schema(ProjectPlanEnvelope)
+
+# Built once at import; every model answer is validated through these
+EPIC_ADAPTER = TypeAdapter(EpicResponse)
+MILESTONE_ADAPTER = TypeAdapter(Milestone)
+
+
+def _validate_items(adapter: TypeAdapter, items, label: str) -> list:
+    valid = []
+
+    for item in items or []:
+        try:
+            valid.append(adapter.validate_python(item))
+        except ValidationError as e:
+            # One malformed entry is dropped instead of failing the whole answer
+            print(f"⚠️ Dropped invalid {label}:", e.errors()[0]["msg"])
+
+    return valid
+
+
+def validate_epics(raw_epics) -> List[EpicResponse]:
+    return _validate_items(EPIC_ADAPTER, raw_epics, "epic")
+
+
+def validate_milestones(raw_milestones) -> List[Milestone]:
+    return _validate_items(MILESTONE_ADAPTER, raw_milestones, "milestone")
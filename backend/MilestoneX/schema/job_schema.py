@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from .project_schema import ProjectAnalysisResponse
+
+
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+
+
+class JobResponse(BaseModel):
+    id: str
+    status: str
+    stage: Optional[str]
+    progress: int
+    project_id: Optional[int]
+    error: Optional[str]
+    result: Optional[ProjectAnalysisResponse] = None
+    created_at: datetime
+    updated_at: datetime
@@ -1,11 +1,44 @@
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field, field_validator
 from typing import List
+import re
+
+
+def coerce_days(value) -> int:
+    """
+    Lenient day count for model output: "5", 5.0 and "5 days" all give 5,
+    anything unparseable or negative gives 0.
+    """
+    try:
+        return max(0, int(float(value)))
+    except (TypeError, ValueError):
+        match = re.search(r"\d+", str(value or ""))
+        return int(match.group()) if match else 0
 
 
 class Milestone(BaseModel):
-    name: str
-    description: str
-    timeline_days: int
+    # Validation aliases absorb the key variants phi3 produces without a schema
+    name: str = Field(
+        "",
+        validation_alias=AliasChoices("name", "Name", "names", "milestone", "title", "name0")
+    )
+    description: str = Field(
+        "",
+        validation_alias=AliasChoices("description", "Description", "descriptions", "description0")
+    )
+    timeline_days: int = Field(
+        0,
+        validation_alias=AliasChoices("timeline_days", "Timeline_Days", "days", "timeline_days0")
+    )
+
+    @field_validator("timeline_days", mode="before")
+    @classmethod
+    def _days(cls, value):
+        return coerce_days(value)
+
+    @field_validator("name", "description", mode="before")
+    @classmethod
+    def _text(cls, value):
+        return "" if value is None else str(value)
 
 
 class MilestoneRequest(BaseModel):
@@ -13,4 +46,4 @@ class MilestoneRequest(BaseModel):
 
 
 class MilestoneResponse(BaseModel):
-    milestones: List[Milestone]
\ No newline at end of file
+    milestones: List[Milestone]
@@ -1,20 +1,67 @@
-from pydantic import BaseModel
-from typing import List, Optional
-from .milestone_schema import Milestone
+from pydantic import AliasChoices, BaseModel, Field, field_validator
+from typing import Any, Dict, List, Optional
+from .milestone_schema import Milestone, coerce_days
 
 class TaskNested(BaseModel):
-    task_name: str
-    timeline_days: int
-    status: str
+    id: Optional[int] = None
+    # Validation aliases absorb the key variants phi3 produces without a schema
+    task_name: str = Field(
+        "",
+        validation_alias=AliasChoices("task_name", "taskName", "task_name0", "Task Name", "name")
+    )
+    timeline_days: int = Field(
+        0,
+        validation_alias=AliasChoices("timeline_days", "days", "timeline_days0", "duration_days")
+    )
+    status: str = "Backlog"
+    sequence: Optional[int] = None
+
+    @field_validator("timeline_days", mode="before")
+    @classmethod
+    def _days(cls, value):
+        return coerce_days(value)
+
+    @field_validator("task_name", "status", mode="before")
+    @classmethod
+    def _text(cls, value):
+        return "" if value is None else str(value)
 
 
 class EpicResponse(BaseModel):
-    epic_name: str
-    description: str
-    tasks: List[TaskNested]
+    epic_name: str = Field(
+        "",
+        validation_alias=AliasChoices("epic_name", "Epic Name", "epicName", "name", "epic_name0")
+    )
+    description: str = Field(
+        "",
+        validation_alias=AliasChoices("description", "Description", "epic_description", "description0")
+    )
+    tasks: List[TaskNested] = []
+
+    @field_validator("epic_name", "description", mode="before")
+    @classmethod
+    def _text(cls, value):
+        return "" if value is None else str(value)
 
 
 class ProjectAnalysisResponse(BaseModel):
     project_id: int
     epics: List[EpicResponse]
     milestones: List[Milestone]
+    # Stages that failed or timed out; the other stages are still returned
+    errors: Dict[str, str] = {}
+    # Boilerplate stripped before prompting (tokens saved, lines removed)
+    preprocessing: Optional[Dict[str, Any]] = None
+
+
+class ReanalysisResponse(BaseModel):
+    project_id: int
+    # Section counts of the new SRS: total / unchanged / added / removed
+    sections: Dict[str, int]
+    tasks_kept: int
+    tasks_added: int
+    tasks_retired: int
+    # Every active task of the project after the re-analysis
+    epics: List[EpicResponse]
+    errors: Dict[str, str] = {}
+    preprocessing: Optional[Dict[str, Any]] = None
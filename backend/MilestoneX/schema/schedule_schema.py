@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from typing import List
+from .milestone_schema import Milestone
+
+
+class ScheduledTask(BaseModel):
+    id: int
+    epic_name: str
+    task_name: str
+    timeline_days: int
+    # Days from project start
+    start_day: int
+    finish_day: int
+    # Days the task can slip without delaying the project
+    slack_days: int
+    critical: bool
+    depends_on: List[int] = []
+
+
+class ScheduleResponse(BaseModel):
+    project_id: int
+    duration_days: int
+    # Task ids of one zero-slack chain from project start to end
+    critical_path: List[int]
+    tasks: List[ScheduledTask]
+    # One milestone per epic, due when its last task finishes
+    milestones: List[Milestone]
+
+
+class DependencyCreate(BaseModel):
+    depends_on_id: int
+
+
+class DependencyResponse(BaseModel):
+    task_id: int
+    depends_on: List[int]
@@ -1,11 +1,14 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 class TaskCreate(BaseModel):
     epic_name: str
     description: Optional[str] = None
     task_name: str
     timeline_days: int
+    sequence: Optional[int] = None
+    # Predecessor task ids; the task is scheduled after all of them
+    depends_on: List[int] = []
 
 
 class TaskUpdate(BaseModel):
@@ -15,6 +18,7 @@ class TaskUpdate(BaseModel):
     timeline_days: Optional[int] = None
     assigned_to: Optional[str] = None
     status: Optional[str] = None
+    sequence: Optional[int] = None
 
 
 class TaskResponse(BaseModel):
@@ -26,6 +30,33 @@ class TaskResponse(BaseModel):
     timeline_days: int
     assigned_to: Optional[str]
     status: str
+    sequence: Optional[int] = None
+    start_day: Optional[int] = None
+    finish_day: Optional[int] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class TaskBatchUpdate(TaskUpdate):
+    id: int
+
+
+class TaskBatchDelete(BaseModel):
+    ids: List[int]
+
+
+class TaskBatchItemResult(BaseModel):
+    # Position of the item in the request array
+    index: int
+    id: Optional[int] = None
+    ok: bool
+    error: Optional[str] = None
+    # The task as committed (not set for deletes and failed items)
+    task: Optional[TaskResponse] = None
+
+
+class TaskBatchResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[TaskBatchItemResult]
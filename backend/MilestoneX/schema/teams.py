@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 
 class TeamMember(BaseModel):
@@ -15,4 +15,17 @@ class Task(BaseModel):
     estimated_hours: int
 
 class AllocationRequest(BaseModel):
-    team: List[TeamMember]
\ No newline at end of file
+    team: List[TeamMember]
+
+
+class TeamMemberLoad(TeamMember):
+    availability_days: Optional[int] = None
+    # Days of active tasks assigned to the member
+    load_days: int = 0
+    # None when the member has no availability limit
+    remaining_days: Optional[int] = None
+
+
+class TeamResponse(BaseModel):
+    project_id: int
+    team: List[TeamMemberLoad]
\ No newline at end of file
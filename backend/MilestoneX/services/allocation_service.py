@@ -1,16 +1,538 @@
 from AI_Backend.ai_allocation_generator import TaskAllocator
+from AI_Backend.llm_client import agather_bounded
+from AI_Backend.skill_matcher import SkillAllocationEngine
+from sqlalchemy import update, case, func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from ..models.task import Task, RETIRED_STATUS
+from ..models.team_member import TeamMember
+import asyncio
+import json
+import os
+import re
+
+
+# -------------------------
+# Sharded allocation
+# -------------------------
+# Largest shard sent in one prompt; bigger epics are split so a shard's
+# prompt and answer stay well inside the model context
+ALLOCATION_SHARD_TASKS = int(os.getenv("MILESTONEX_ALLOCATION_SHARD_TASKS", "20"))
+
+
+class CapacityLedger:
+    """
+    Remaining availability_days per member, shared by concurrently running
+    allocation shards. A shard sees the capacity left when it starts and
+    only keeps assignments that still fit when it finishes.
+    Members without availability_days have unlimited capacity.
+    """
+
+    def __init__(self, team: list):
+        self.remaining = {m["name"]: m.get("availability_days") for m in team}
+        self.load = dict.fromkeys(self.remaining, 0)
+        self._lock = asyncio.Lock()
+
+    async def snapshot(self) -> dict:
+        async with self._lock:
+            return dict(self.remaining)
+
+    async def commit(self, assignments: list) -> list:
+        """
+        Debits every assignment that fits and returns the ones that do not
+        (unknown member or not enough days left).
+        """
+        rejected = []
+
+        async with self._lock:
+            for assignment in assignments:
+                member = assignment.get("assigned_to")
+                days = max(int(assignment.get("timeline_days") or 0), 0)
+
+                if member not in self.remaining:
+                    rejected.append(assignment)
+                    continue
+
+                left = self.remaining[member]
+                if left is not None and left < days:
+                    rejected.append(assignment)
+                    continue
+
+                if left is not None:
+                    self.remaining[member] = left - days
+                self.load[member] += days
+
+        return rejected
 
 
 class AllocationService:
 
     @staticmethod
-    def allocate(team_payload, tasks_payload):
+    async def allocate(team_payload, tasks_payload, use_cache: bool = True, mode: str = "llm"):
         """
-        Bridges FastAPI backend and AI TaskAllocator.
+        Bridges FastAPI backend and the allocators.
+
+        mode:
+          - "llm":    TaskAllocator (phi3) only; a prompt too large for the
+            context window is allocated sharded instead
+          - "engine": deterministic SkillAllocationEngine, no LLM call
+          - "hybrid": engine result refined by TaskAllocator
+          - "sharded": TaskAllocator per epic shard, run concurrently
+            against a shared capacity ledger (see allocate_sharded)
         """
 
+        if mode == "sharded":
+            return await AllocationService.allocate_sharded(
+                team_payload,
+                tasks_payload,
+                use_cache
+            )
+
+        if mode in ("engine", "hybrid"):
+            engine_result = SkillAllocationEngine(team_payload, tasks_payload).allocate()
+
+            if mode == "engine":
+                return engine_result
+
+            return await AllocationService._refine(
+                team_payload,
+                tasks_payload,
+                engine_result,
+                use_cache
+            )
+
         team_data = {"team": team_payload}
         tasks_data = tasks_payload
 
         allocator = TaskAllocator(team_data, tasks_data)
-        return allocator.allocate_tasks()
\ No newline at end of file
+
+        if not allocator.fits_context():
+            print(f"🧩 {len(tasks_payload)} tasks do not fit one allocation prompt, sharding")
+            return await AllocationService.allocate_sharded(
+                team_payload,
+                tasks_payload,
+                use_cache
+            )
+
+        return await allocator.aallocate_tasks(use_cache)
+
+    @staticmethod
+    def shard_tasks(tasks_payload: list, max_tasks: int = ALLOCATION_SHARD_TASKS) -> list:
+        """
+        Groups tasks by epic_name (first-seen order) and splits epics larger
+        than max_tasks into consecutive chunks.
+        """
+        by_epic = {}
+        for task in tasks_payload:
+            by_epic.setdefault(task.get("epic_name"), []).append(task)
+
+        return [
+            tasks[start:start + max_tasks]
+            for tasks in by_epic.values()
+            for start in range(0, len(tasks), max_tasks)
+        ]
+
+    @staticmethod
+    async def allocate_sharded(team_payload, tasks_payload, use_cache: bool = True) -> dict:
+        """
+        Allocates each epic shard with its own small prompt, at most
+        OLLAMA_NUM_PARALLEL shards at a time. Each shard is prompted with the
+        capacity the ledger has left when it starts.
+
+        The merged result has every task id exactly once: assignments for
+        unknown or duplicate ids are dropped, assignments that no longer fit
+        the ledger are rejected, and whatever the model left out is filled
+        in by SkillAllocationEngine against the remaining capacity.
+        """
+        ledger = CapacityLedger(team_payload)
+        shards = AllocationService.shard_tasks(tasks_payload)
+
+        print(f"🧩 Allocating {len(tasks_payload)} tasks in {len(shards)} shards")
+
+        async def allocate_shard(shard: list) -> list:
+            remaining = await ledger.snapshot()
+            team = [
+                {**member, "availability_days": remaining[member["name"]]}
+                for member in team_payload
+            ]
+
+            allocator = TaskAllocator({"team": team}, shard)
+            assignments = AllocationService.extract_assignments(
+                await allocator.aallocate_tasks(use_cache)
+            )
+
+            # Keep one assignment per task of this shard, with its real days
+            by_id = {task.get("id"): task for task in shard}
+            accepted = {}
+            for assignment in assignments:
+                try:
+                    task_id = int(assignment.get("id"))
+                except (TypeError, ValueError):
+                    continue
+
+                if task_id in by_id and task_id not in accepted:
+                    accepted[task_id] = {
+                        **SkillAllocationEngine._task_fields(by_id[task_id]),
+                        "assigned_to": assignment.get("assigned_to"),
+                    }
+
+            rejected = await ledger.commit(list(accepted.values()))
+            for assignment in rejected:
+                accepted.pop(assignment["id"])
+
+            return list(accepted.values())
+
+        results = await agather_bounded([
+            lambda shard=shard: allocate_shard(shard)
+            for shard in shards
+        ])
+
+        assigned = {
+            assignment["id"]: assignment
+            for assignments in results
+            for assignment in assignments
+        }
+
+        # Gap fill: tasks the model dropped, garbled or overbooked
+        missing = [task for task in tasks_payload if task.get("id") not in assigned]
+        unassigned = []
+
+        if missing:
+            print(f"🩹 {len(missing)} tasks left by the model, filled by the skill engine")
+            filled = SkillAllocationEngine(team_payload, missing).allocate(
+                capacity=await ledger.snapshot()
+            )
+            unassigned = filled["unassigned"]
+
+            # The engine already respects the snapshot, so nothing is rejected
+            await ledger.commit([a for a in filled["task_assignments"] if a["assigned_to"]])
+
+            for assignment in filled["task_assignments"]:
+                assignment.pop("match_score", None)
+                assigned[assignment["id"]] = assignment
+
+        return {
+            "task_assignments": [assigned[task.get("id")] for task in tasks_payload],
+            "unassigned": unassigned,
+            "member_load": ledger.load,
+            "shards": len(shards),
+            "filled_by_engine": len(missing),
+        }
+
+    @staticmethod
+    async def _refine(team_payload, tasks_payload, engine_result: dict, use_cache: bool):
+        draft = {
+            a["id"]: a["assigned_to"]
+            for a in engine_result["task_assignments"]
+        }
+
+        allocator = TaskAllocator({"team": team_payload}, tasks_payload, draft=draft)
+        refined = AllocationService.extract_assignments(
+            await allocator.aallocate_tasks(use_cache)
+        )
+
+        # Only consider model changes that name a real member; everything the
+        # model dropped or garbled keeps the engine's assignment
+        members = {m["name"] for m in team_payload}
+        overrides = {}
+        for a in refined:
+            try:
+                task_id = int(a.get("id"))
+            except (TypeError, ValueError):
+                continue
+
+            if a.get("assigned_to") in members and task_id in draft and task_id not in overrides:
+                overrides[task_id] = a["assigned_to"]
+
+        changed = {
+            task_id: member
+            for task_id, member in overrides.items()
+            if member != draft[task_id]
+        }
+
+        # Replay against a fresh ledger so hybrid output keeps the engine's
+        # capacity guarantee: untouched engine assignments are debited first,
+        # then each override only if it still fits, falling back to the
+        # engine's choice (or unassigned) when it does not
+        ledger = CapacityLedger(team_payload)
+        await ledger.commit([
+            a for a in engine_result["task_assignments"]
+            if a["assigned_to"] and a["id"] not in changed
+        ])
+
+        assignments = []
+        for a in engine_result["task_assignments"]:
+            if a["id"] in changed:
+                override = {**a, "assigned_to": changed[a["id"]]}
+                if not await ledger.commit([override]):
+                    a = override
+                elif not a["assigned_to"] or await ledger.commit([a]):
+                    a = {**a, "assigned_to": None}
+
+            assignments.append(a)
+
+        return {
+            **engine_result,
+            "task_assignments": assignments,
+            "unassigned": [a["id"] for a in assignments if not a["assigned_to"]],
+            "member_load": ledger.load,
+        }
+
+    @staticmethod
+    def extract_assignments(allocation_result) -> list:
+        """
+        Pulls the list of assignments out of whatever shape the model returned
+        (a bare list, a {"task_assignments": [...]} wrapper, or one object).
+        """
+        if isinstance(allocation_result, list):
+            return [a for a in allocation_result if isinstance(a, dict)]
+
+        if isinstance(allocation_result, dict):
+            for key in ("task_assignments", "assignments", "allocation", "tasks"):
+                if isinstance(allocation_result.get(key), list):
+                    return AllocationService.extract_assignments(allocation_result[key])
+
+            if "assigned_to" in allocation_result:
+                return [allocation_result]
+
+            # Any other single list value is taken as the assignment list
+            lists = [v for v in allocation_result.values() if isinstance(v, list)]
+            if len(lists) == 1:
+                return AllocationService.extract_assignments(lists[0])
+
+        return []
+
+    @staticmethod
+    def normalize_task_name(name) -> str:
+        return re.sub(r"\s+", " ", str(name or "")).strip().lower()
+
+    @staticmethod
+    def apply_allocations(db: Session, project_id: int, tasks: list, assignments: list) -> dict:
+        """
+        Writes model assignments onto already-loaded tasks with a single
+        UPDATE ... CASE statement. Assignments are matched on id first and
+        on normalized task_name when the model left the id out.
+
+        Returns {task_id: assigned_to} for the rows that were updated. No
+        commit: the caller commits the assignments together with the
+        refreshed member load.
+        """
+        by_id = {t.id: t for t in tasks}
+
+        by_name = {}
+        for t in tasks:
+            by_name.setdefault(AllocationService.normalize_task_name(t.task_name), []).append(t)
+
+        updates = {}
+
+        for alloc in assignments:
+            assigned_to = alloc.get("assigned_to")
+            if not assigned_to:
+                continue
+
+            task = None
+            try:
+                task = by_id.get(int(alloc.get("id")))
+            except (TypeError, ValueError):
+                pass
+
+            if task is None:
+                # Same name can appear in several epics: take the first one
+                # not already matched by an earlier assignment
+                candidates = by_name.get(
+                    AllocationService.normalize_task_name(alloc.get("task_name")), []
+                )
+                task = next((t for t in candidates if t.id not in updates), None)
+
+            if task is not None and task.id not in updates:
+                updates[task.id] = str(assigned_to)
+
+        if updates:
+            db.execute(
+                update(Task)
+                .where(Task.project_id == project_id, Task.id.in_(updates))
+                .values(assigned_to=case(updates, value=Task.id))
+                .execution_options(synchronize_session=False)
+            )
+
+        return updates
+
+    # ---------- Incremental allocation ----------
+
+    @staticmethod
+    def save_team(db: Session, project_id: int, team_payload: list):
+        """
+        Replaces the project's stored team and recomputes every member's
+        load from the tasks (one GROUP BY). No commit.
+
+        Raises ValueError when two members share a name (assignments are
+        stored by name, so they could not be told apart).
+        """
+        names = [member["name"] for member in team_payload]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate team member names: {', '.join(duplicates)}")
+
+        db.query(TeamMember).filter(TeamMember.project_id == project_id).delete()
+
+        db.add_all([
+            TeamMember(
+                project_id=project_id,
+                name=member["name"],
+                role=member.get("role"),
+                skills=json.dumps(member.get("skills") or []),
+                availability_days=member.get("availability_days")
+            )
+            for member in team_payload
+        ])
+        db.flush()
+
+        AllocationService.refresh_load(db, project_id)
+
+    @staticmethod
+    def refresh_load(db: Session, project_id: int):
+        """
+        Rebuilds the load_days aggregates from the active tasks. No commit.
+        """
+        loads = dict(db.execute(
+            select(Task.assigned_to, func.sum(Task.timeline_days))
+            .where(
+                Task.project_id == project_id,
+                Task.status != RETIRED_STATUS,
+                Task.assigned_to.is_not(None)
+            )
+            .group_by(Task.assigned_to)
+        ).all())
+
+        for member in db.query(TeamMember).filter(TeamMember.project_id == project_id):
+            member.load_days = int(loads.get(member.name) or 0)
+
+    @staticmethod
+    def member_payload(member: TeamMember) -> dict:
+        return {
+            "name": member.name,
+            "role": member.role or "",
+            "skills": json.loads(member.skills or "[]"),
+            "availability_days": member.availability_days,
+        }
+
+    @staticmethod
+    def team_members(db: Session, project_id: int) -> dict:
+        return {
+            member.name: member
+            for member in db.query(TeamMember).filter(TeamMember.project_id == project_id)
+        }
+
+    @staticmethod
+    def allocate_task(
+        db: Session,
+        task: Task,
+        old_assignee: str = None,
+        old_days: int = 0,
+        allocate: bool = True,
+        members: dict = None
+    ):
+        """
+        Incremental allocation for one created or edited task (no model
+        call, no commit).
+
+        The load aggregates are moved from (old_assignee, old_days) to the
+        task's current assignee and days. With allocate, an unassigned task
+        gets the best-matching member with room, and a task whose member is
+        now over capacity is moved to one that has room. Every other
+        assignment is left alone. Does nothing for projects without a
+        stored team. Batches pass members (see team_members) so the team is
+        loaded once.
+
+        Returns the task's assignee.
+        """
+        if members is None:
+            members = AllocationService.team_members(db, task.project_id)
+
+        if not members:
+            return task.assigned_to
+
+        if old_assignee in members:
+            AllocationService._add_load(db, members[old_assignee], -(old_days or 0))
+
+        if task.status == RETIRED_STATUS:
+            return task.assigned_to
+
+        days = max(task.timeline_days or 0, 0)
+        current = members.get(task.assigned_to)
+
+        def over_capacity(member):
+            return member.availability_days is not None and member.load_days + days > member.availability_days
+
+        if allocate and (current is None or over_capacity(current)):
+            capacity = {
+                name: None if member.availability_days is None else member.availability_days - member.load_days
+                for name, member in members.items()
+            }
+
+            result = SkillAllocationEngine(
+                [AllocationService.member_payload(member) for member in members.values()],
+                [{"id": task.id, "task_name": task.task_name, "timeline_days": days, "epic_name": task.epic_name}]
+            ).allocate(capacity=capacity)
+
+            # Nobody has room: an existing assignment stays where it is
+            best = result["task_assignments"][0]["assigned_to"]
+            if best is not None and best != task.assigned_to:
+                print(f"🎯 Task {task.id} allocated to {best} (was {task.assigned_to})")
+                task.assigned_to = best
+                current = members[best]
+
+        if current is not None and task.assigned_to == current.name:
+            AllocationService._add_load(db, current, days)
+
+        return task.assigned_to
+
+    @staticmethod
+    def _add_load(db: Session, member: TeamMember, delta: int):
+        """
+        Moves a member's load with an atomic load_days + delta UPDATE, so
+        concurrent edits don't overwrite each other's change. The loaded row
+        is updated without being marked dirty (a flush would write back the
+        stale absolute value) so later capacity checks in a batch see it.
+        """
+        if not delta:
+            return
+
+        set_committed_value(member, "load_days", (member.load_days or 0) + delta)
+
+        db.query(TeamMember).filter(TeamMember.id == member.id).update(
+            {TeamMember.load_days: TeamMember.load_days + delta},
+            synchronize_session=False
+        )
+
+    @staticmethod
+    def release_task(db: Session, task: Task):
+        """
+        Takes a task that is about to be deleted off its member's load.
+        """
+        if task.assigned_to is None or task.status == RETIRED_STATUS:
+            return
+
+        db.query(TeamMember).filter(
+            TeamMember.project_id == task.project_id,
+            TeamMember.name == task.assigned_to
+        ).update(
+            {TeamMember.load_days: TeamMember.load_days - (task.timeline_days or 0)},
+            synchronize_session=False
+        )
+
+    @staticmethod
+    def team_response(db: Session, project_id: int) -> list:
+        return [
+            {
+                **AllocationService.member_payload(member),
+                "load_days": member.load_days or 0,
+                "remaining_days": (
+                    None if member.availability_days is None
+                    else member.availability_days - (member.load_days or 0)
+                ),
+            }
+            for member in db.query(TeamMember)
+            .filter(TeamMember.project_id == project_id)
+            .order_by(TeamMember.id)
+        ]
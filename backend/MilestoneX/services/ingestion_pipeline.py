@@ -0,0 +1,205 @@
+from AI_Backend.ai_task_generator import agenerate_epics_tasks_json_with_timeline, SECTION_TOKENS
+from AI_Backend.ai_milestone_generator import agenerate_milestones
+from AI_Backend.tokens import SectionBuilder
+from .pdf_services import PDFService
+from .preprocess_service import SRSPreprocessor, SRS_PREPROCESS
+from .project_service import EpicMerger, ProjectService, GENERATION_MAX_WORKERS, GENERATION_MODE, STAGE_TIMEOUTS
+from ..schema.generation_schema import EPICS_SCHEMA, MILESTONES_SCHEMA
+import asyncio
+import os
+import threading
+
+
+# -------------------------
+# Pipeline settings
+# -------------------------
+# Prompt tokens of SRS text per generation call; defaults to what the epic
+# generator's token planner fits next to its prompt and answer in LLM_MAX_CTX
+SECTION_TOKEN_BUDGET = int(os.getenv("MILESTONEX_SECTION_TOKENS", str(SECTION_TOKENS)))
+# Generation modes the pipeline can run: epics are always generated per
+# section, so "joint" (one call for the whole plan) does not apply
+PIPELINE_MODES = ("separate", "scheduled")
+
+_DONE = object()
+
+
+class IngestionPipeline:
+    """
+    Overlaps PDF extraction with generation.
+
+    Pages are read one at a time on a background thread, grouped into
+    token-budgeted sections, and every finished section is handed to a
+    generation worker straight away instead of waiting for the whole
+    document to be extracted.
+    """
+
+    @staticmethod
+    def _produce_pages(content: bytes, loop, pages: asyncio.Queue, stop: threading.Event):
+        try:
+            for number, text in PDFService.iter_pages(content):
+                if stop.is_set():
+                    break
+                loop.call_soon_threadsafe(pages.put_nowait, (number, text))
+        except Exception as e:
+            loop.call_soon_threadsafe(pages.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(pages.put_nowait, _DONE)
+
+    @staticmethod
+    async def run(
+        content: bytes,
+        use_cache: bool = True,
+        budget_tokens: int = SECTION_TOKEN_BUDGET,
+        preprocess: bool = SRS_PREPROCESS,
+        mode: str = GENERATION_MODE
+    ):
+        """
+        Returns the same shape as ProjectService.analyze_project plus the
+        extracted "srs_text" (still needed for the projects row) and the
+        "preprocessing" report.
+
+        mode is a generation mode from PIPELINE_MODES: "separate" plans
+        milestones from the merged epics, "scheduled" leaves them to the
+        task schedule when the result is saved.
+        """
+        if mode not in PIPELINE_MODES:
+            raise ValueError(f"Generation mode '{mode}' cannot be pipelined")
+
+        loop = asyncio.get_running_loop()
+        pages = asyncio.Queue()
+        sections = asyncio.Queue()
+        stop = threading.Event()
+
+        producer = loop.run_in_executor(
+            None,
+            IngestionPipeline._produce_pages,
+            content,
+            loop,
+            pages,
+            stop
+        )
+
+        # Sections finish out of order; each one is merged once, as soon as
+        # every section before it is done, so document order is kept
+        merger = EpicMerger()
+        finished = {}
+        merged_count = 0
+        errors = {}
+
+        def finish_section(index: int, epics: list):
+            nonlocal merged_count
+            finished[index] = epics
+            while merged_count in finished:
+                merger.add(finished.pop(merged_count))
+                merged_count += 1
+
+        async def generation_worker():
+            while True:
+                item = await sections.get()
+                if item is _DONE:
+                    return
+
+                index, section_text = item
+                try:
+                    raw_epics = await ProjectService._run_stage(
+                        f"epics:{index}",
+                        lambda: agenerate_epics_tasks_json_with_timeline(
+                            section_text,
+                            use_cache,
+                            schema=EPICS_SCHEMA,
+                            validate=ProjectService.clean_epics
+                        ),
+                        STAGE_TIMEOUTS["epics"]
+                    )
+                    finish_section(index, ProjectService.clean_epics(raw_epics))
+                except Exception as e:
+                    print(f"❌ Section {index} failed:", e)
+                    errors[f"epics:{index}"] = str(e) or type(e).__name__
+                    finish_section(index, [])
+
+        workers = [
+            asyncio.create_task(generation_worker())
+            for _ in range(GENERATION_MAX_WORKERS)
+        ]
+
+        builder = SectionBuilder(budget_tokens)
+        # Pages arrive one at a time, so boilerplate is stripped in one pass
+        preprocessor = SRSPreprocessor() if preprocess else None
+        page_texts = []
+        section_count = 0
+
+        try:
+            while True:
+                item = await pages.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+
+                number, text = item
+                if preprocessor:
+                    text = preprocessor.clean_page(text)
+                page_texts.append(text)
+
+                for section_text in builder.add(text):
+                    await sections.put((section_count, section_text))
+                    section_count += 1
+
+            for section_text in builder.flush():
+                await sections.put((section_count, section_text))
+                section_count += 1
+        except BaseException:
+            for worker in workers:
+                worker.cancel()
+            raise
+        finally:
+            stop.set()
+            for _ in workers:
+                sections.put_nowait(_DONE)
+
+        await producer
+        await asyncio.gather(*workers)
+
+        print(f"🧩 Pipelined {len(page_texts)} pages into {section_count} sections")
+
+        epics = merger.epics()
+
+        # Milestones are planned from the merged epics, which is far shorter
+        # than the SRS and only known once every section is done
+        milestones = []
+        try:
+            if epics and mode == "separate":
+                raw_milestones = await ProjectService._run_stage(
+                    "milestones",
+                    lambda: agenerate_milestones(
+                        IngestionPipeline.summarize_epics(epics),
+                        use_cache,
+                        schema=MILESTONES_SCHEMA
+                    ),
+                    STAGE_TIMEOUTS["milestones"]
+                )
+                milestones = ProjectService.clean_milestones(raw_milestones)
+        except Exception as e:
+            print("❌ Stage 'milestones' failed:", e)
+            errors["milestones"] = str(e) or type(e).__name__
+
+        return {
+            "srs_text": "\n".join(t for t in page_texts if t).strip(),
+            "epics": epics,
+            "milestones": milestones,
+            "errors": errors,
+            "preprocessing": preprocessor.report() if preprocessor else None,
+        }
+
+    @staticmethod
+    def summarize_epics(epics: list) -> str:
+        lines = []
+
+        for epic in epics:
+            days = sum(task["timeline_days"] for task in epic["tasks"])
+            lines.append(
+                f"Epic: {epic['epic_name']} - {epic['description']} "
+                f"({len(epic['tasks'])} tasks, about {days} days of work)"
+            )
+
+        return "\n".join(lines)
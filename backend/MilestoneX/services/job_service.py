@@ -0,0 +1,414 @@
+import asyncio
+import json
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_
+
+from ..database import SessionLocal
+from ..models.job import Job
+from .pdf_services import PDFService
+from .project_service import ProjectService
+
+
+# -------------------------
+# Job queue settings
+# -------------------------
+JOB_MAX_WORKERS = int(os.getenv("MILESTONEX_JOB_WORKERS", "2"))
+# A running job's lease is renewed every third of this; when it lapses the
+# owning process is presumed dead and any process may re-queue the job
+JOB_LEASE_SECONDS = int(os.getenv("MILESTONEX_JOB_LEASE_SECONDS", "120"))
+
+# Identifies this process's claims among every worker sharing the database
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# Progress reported when each pipeline stage starts / finishes
+STAGE_PROGRESS = {
+    "queued": 0,
+    "extracting": 5,
+    "generating": 20,
+    "epics": 40,         # +40 when the epic stage finishes
+    "milestones": 20,    # +20 when the milestone stage finishes
+    "plan": 60,          # +60 when a joint epics + milestones stage finishes
+    "saving": 90,
+    "completed": 100,
+}
+
+FINISHED_STATUSES = ("completed", "failed")
+
+
+class JobService:
+    """
+    Runs /analyze-project as a background job on a bounded pool of asyncio
+    workers. Job state lives in the jobs table so it survives restarts.
+
+    Several processes (uvicorn --workers N, rolling restarts) may queue the
+    same job; a worker only runs it after atomically claiming the queued
+    row, so each job runs once.
+    """
+
+    _queue = None
+    _queued = set()
+    _workers = []
+    _sweeper = None
+    _changed = None
+
+    # ---------- Lifecycle ----------
+
+    @staticmethod
+    async def start():
+        JobService._queue = asyncio.Queue()
+        JobService._changed = asyncio.Condition()
+        JobService._queued = set()
+        JobService._workers = [
+            asyncio.create_task(JobService._worker())
+            for _ in range(JOB_MAX_WORKERS)
+        ]
+
+        # Picks up waiting jobs and ones orphaned by a dead process, now
+        # and every lease period
+        JobService._sweeper = asyncio.create_task(JobService._sweep())
+
+    @staticmethod
+    async def stop():
+        tasks = [*JobService._workers, JobService._sweeper]
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+        JobService._workers = []
+
+        # Hand our interrupted jobs back right away instead of waiting for
+        # their leases to lapse
+        await asyncio.to_thread(JobService._release)
+
+    # ---------- Public API ----------
+
+    @staticmethod
+    async def submit(filename: str, content: bytes, use_cache: bool = True) -> str:
+        """
+        Stores the job (PDF blob included) off the event loop and queues it;
+        returns the job id.
+        """
+        job_id = await asyncio.to_thread(JobService._insert, filename, content, use_cache)
+
+        JobService._enqueue(job_id)
+
+        return job_id
+
+    @staticmethod
+    def _insert(filename: str, content: bytes, use_cache: bool) -> str:
+        job = Job(
+            id=uuid.uuid4().hex,
+            status="queued",
+            stage="queued",
+            progress=STAGE_PROGRESS["queued"],
+            filename=filename,
+            use_cache=use_cache,
+            pdf_content=content
+        )
+        db = SessionLocal()
+        try:
+            db.add(job)
+            db.commit()
+            return job.id
+        finally:
+            db.close()
+
+    @staticmethod
+    def get(db, job_id: str):
+        return db.query(Job).filter(Job.id == job_id).first()
+
+    @staticmethod
+    def snapshot(job_id: str):
+        """
+        to_dict() of the job from a fresh session, or None; blocking, run it
+        with asyncio.to_thread from async code.
+        """
+        db = SessionLocal()
+        try:
+            job = JobService.get(db, job_id)
+            return JobService.to_dict(job) if job else None
+        finally:
+            db.close()
+
+    @staticmethod
+    def to_dict(job: Job) -> dict:
+        return {
+            "id": job.id,
+            "status": job.status,
+            "stage": job.stage,
+            "progress": job.progress,
+            "project_id": job.project_id,
+            "error": job.error,
+            "result": json.loads(job.result) if job.result else None,
+            "created_at": job.created_at,
+            "updated_at": job.updated_at,
+        }
+
+    @staticmethod
+    async def wait_for_change(timeout: float):
+        """
+        Blocks until any job is updated in this process, or the timeout
+        elapses (updates from other workers are picked up by polling).
+        """
+        async with JobService._changed:
+            try:
+                await asyncio.wait_for(JobService._changed.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    # ---------- Queue and leases ----------
+
+    @staticmethod
+    def _enqueue(job_id: str):
+        if job_id not in JobService._queued:
+            JobService._queued.add(job_id)
+            JobService._queue.put_nowait(job_id)
+
+    @staticmethod
+    def _lease_expiry() -> datetime:
+        return datetime.utcnow() + timedelta(seconds=JOB_LEASE_SECONDS)
+
+    @staticmethod
+    async def _sweep():
+        while True:
+            for job_id in await asyncio.to_thread(JobService._requeue_orphans):
+                JobService._enqueue(job_id)
+
+            await asyncio.sleep(JOB_LEASE_SECONDS)
+
+    @staticmethod
+    def _requeue_orphans() -> list:
+        """
+        Resets running jobs whose lease has lapsed (or that predate leases)
+        to queued, and returns every queued job id, oldest first.
+        """
+        db = SessionLocal()
+        try:
+            db.query(Job).filter(
+                Job.status == "running",
+                or_(Job.lease_expires_at.is_(None), Job.lease_expires_at < datetime.utcnow())
+            ).update({
+                "status": "queued",
+                "stage": "queued",
+                "progress": STAGE_PROGRESS["queued"],
+                "worker_id": None,
+                "lease_expires_at": None,
+            }, synchronize_session=False)
+            db.commit()
+
+            return [
+                job_id
+                for (job_id,) in db.query(Job.id).filter(
+                    Job.status == "queued"
+                ).order_by(Job.created_at)
+            ]
+        finally:
+            db.close()
+
+    @staticmethod
+    def _claim(job_id: str) -> bool:
+        """
+        queued -> running for this process, in one conditional UPDATE; False
+        when another worker got there first or the job is gone.
+        """
+        db = SessionLocal()
+        try:
+            claimed = db.query(Job).filter(
+                Job.id == job_id,
+                Job.status == "queued"
+            ).update({
+                "status": "running",
+                "stage": "extracting",
+                "progress": STAGE_PROGRESS["extracting"],
+                "worker_id": WORKER_ID,
+                "lease_expires_at": JobService._lease_expiry(),
+            }, synchronize_session=False)
+            db.commit()
+
+            return claimed == 1
+        finally:
+            db.close()
+
+    @staticmethod
+    def _renew(job_id: str):
+        db = SessionLocal()
+        try:
+            db.query(Job).filter(
+                Job.id == job_id,
+                Job.worker_id == WORKER_ID,
+                Job.status == "running"
+            ).update({"lease_expires_at": JobService._lease_expiry()}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    async def _heartbeat(job_id: str):
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            await asyncio.to_thread(JobService._renew, job_id)
+
+    @staticmethod
+    def _release():
+        db = SessionLocal()
+        try:
+            db.query(Job).filter(
+                Job.worker_id == WORKER_ID,
+                Job.status == "running"
+            ).update({
+                "status": "queued",
+                "stage": "queued",
+                "progress": STAGE_PROGRESS["queued"],
+                "worker_id": None,
+                "lease_expires_at": None,
+            }, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    # ---------- Worker ----------
+
+    @staticmethod
+    async def _worker():
+        while True:
+            job_id = await JobService._queue.get()
+            JobService._queued.discard(job_id)
+            try:
+                await JobService.run_job(job_id)
+            except Exception as e:
+                print(f"❌ Job {job_id} failed:", e)
+                await JobService._update(
+                    job_id,
+                    status="failed",
+                    error=str(e),
+                    pdf_content=None,
+                    lease_expires_at=None
+                )
+            finally:
+                JobService._queue.task_done()
+
+    @staticmethod
+    async def run_job(job_id: str):
+        # Another process may have queued (and claimed) the same job
+        if not await asyncio.to_thread(JobService._claim, job_id):
+            return
+
+        heartbeat = asyncio.create_task(JobService._heartbeat(job_id))
+        try:
+            await JobService._run_claimed(job_id)
+        finally:
+            heartbeat.cancel()
+
+    @staticmethod
+    def _load_input(job_id: str) -> tuple:
+        db = SessionLocal()
+        try:
+            job = JobService.get(db, job_id)
+            return job.pdf_content, job.use_cache
+        finally:
+            db.close()
+
+    @staticmethod
+    async def _run_claimed(job_id: str):
+        content, use_cache = await asyncio.to_thread(JobService._load_input, job_id)
+
+        # 1️⃣ Extract SRS
+        extracted_text, report = await PDFService.extract_pages(content)
+
+        if not extracted_text:
+            raise ValueError("Empty PDF")
+
+        # 2️⃣ Generate AI Output, bumping progress as each stage finishes
+        await JobService._update(
+            job_id,
+            stage="generating",
+            progress=STAGE_PROGRESS["generating"]
+        )
+
+        progress = {"value": STAGE_PROGRESS["generating"]}
+        stage_updates = []
+
+        # on_stage is a plain callback: its writes are tracked and awaited
+        # below, never left to run unreferenced
+        def on_stage(name, error):
+            progress["value"] += STAGE_PROGRESS.get(name, 0)
+            stage_updates.append(asyncio.create_task(
+                JobService._update(job_id, stage=name, progress=progress["value"])
+            ))
+
+        try:
+            result = await ProjectService.analyze_project(
+                extracted_text,
+                use_cache=use_cache,
+                on_stage=on_stage
+            )
+        finally:
+            await asyncio.gather(*stage_updates)
+
+        if ProjectService.generation_failed(result):
+            raise RuntimeError(f"AI generation failed: {result['errors']}")
+
+        # 3️⃣ Store Project + Tasks
+        await JobService._update(
+            job_id,
+            stage="saving",
+            progress=STAGE_PROGRESS["saving"]
+        )
+        response = await asyncio.to_thread(
+            JobService._save,
+            extracted_text,
+            result
+        )
+        response["preprocessing"] = report["preprocess"]
+
+        await JobService._update(
+            job_id,
+            status="completed",
+            stage="completed",
+            progress=STAGE_PROGRESS["completed"],
+            project_id=response["project_id"],
+            result=json.dumps(response),
+            pdf_content=None,
+            lease_expires_at=None
+        )
+
+    @staticmethod
+    def _save(extracted_text: str, result: dict):
+        db = SessionLocal()
+        try:
+            return ProjectService.save_analysis(db, extracted_text, result)
+        finally:
+            db.close()
+
+    @staticmethod
+    async def _update(job_id: str, **fields):
+        """
+        Writes job fields, only while this process still owns the job.
+        """
+        await asyncio.to_thread(JobService._write, job_id, fields)
+
+        async with JobService._changed:
+            JobService._changed.notify_all()
+
+    @staticmethod
+    def _write(job_id: str, fields: dict):
+        db = SessionLocal()
+        try:
+            query = db.query(Job).filter(
+                Job.id == job_id,
+                Job.worker_id == WORKER_ID
+            )
+
+            # Progress never moves backwards, so concurrent stage updates
+            # that land out of order cannot undo a later one
+            if "progress" in fields:
+                query = query.filter(Job.progress <= fields["progress"])
+
+            query.update(fields)
+            db.commit()
+        finally:
+            db.close()
@@ -1,12 +1,12 @@
-from AI_Backend.ai_milestone_generator import generate_milestones
+from AI_Backend.ai_milestone_generator import agenerate_milestones
 
 
 class MilestoneService:
 
     @staticmethod
-    def create_milestones(text: str):
+    async def create_milestones(text: str):
 
-        raw_milestones = generate_milestones(text)
+        raw_milestones = await agenerate_milestones(text)
 
         cleaned = []
 
@@ -0,0 +1,201 @@
+from AI_Backend.tokens import estimate_tokens, split_sentences
+from collections import Counter
+import os
+import re
+
+
+# -------------------------
+# Pre-processing settings
+# -------------------------
+SRS_PREPROCESS = os.getenv("MILESTONEX_PREPROCESS", "1") == "1"
+# Lines this close to the top / bottom of a page are header/footer candidates
+EDGE_LINES = 3
+# A candidate repeated on at least this share of pages is boilerplate
+REPEAT_SHARE = 0.5
+# Shorter sentences (headings, labels) are never dropped as duplicates
+MIN_DEDUPE_CHARS = 20
+
+# A well-formed roman numeral from i to xcix (front-matter page numbers)
+ROMAN_NUMERAL = r"(?=[ivxl])(xc|xl|l?x{0,3})(ix|iv|v?i{0,3})"
+# "Page 3", "page iv", "Page 3 of 12": a page number wherever it appears
+PAGE_LABEL = re.compile(
+    rf"^page\s*(\d+|{ROMAN_NUMERAL})(\s*(of|/)\s*\d+)?$",
+    re.IGNORECASE
+)
+# "3", "3/12", "- 3 -", "iv": only a page number in a header/footer line;
+# case-sensitive so words like "CLI" or "Civil" are never taken for one
+BARE_PAGE_NUMBER = re.compile(
+    rf"^(\d+(\s*(of|/)\s*\d+)?|[-–]\s*\d+\s*[-–]|{ROMAN_NUMERAL})$"
+)
+TOC_HEADING = re.compile(r"^(table\s+of\s+contents|contents)$", re.IGNORECASE)
+# Inside a TOC block: "1.2 Scope ..... 4", "Scope … 4" or "1.2 Scope 4"
+TOC_ENTRY = re.compile(r"(\.{2,}|…+|\s)\s*\d+$")
+REVISION_HEADING = re.compile(
+    r"^(revision|version|document|change)\s+(history|log|control)$|^change\s*log$",
+    re.IGNORECASE
+)
+# Revision rows carry a version number or a date; the header row names columns
+REVISION_ROW = re.compile(r"\bv?\d+\.\d+(\.\d+)?\b|\b\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}\b")
+REVISION_COLUMNS = re.compile(r"\b(version|date|author|description|changes?)\b", re.IGNORECASE)
+
+
+def _signature(line: str) -> str:
+    signature = re.sub(r"\s+", " ", line).strip().lower()
+
+    # "ACME SRS - Page 3" and "ACME SRS - Page 4" share a signature; other
+    # digits stay significant so numbered requirements never look repeated
+    if re.search(r"\bpage\b", signature):
+        signature = re.sub(r"\d+", "#", signature)
+
+    return signature
+
+
+class SRSPreprocessor:
+    """
+    Strips PDF boilerplate from extracted SRS text before it is prompted:
+    headers/footers repeated across pages, page numbers, table-of-contents
+    and revision-history blocks, redundant whitespace and exact duplicate
+    sentences.
+
+    clean() works on a whole document; clean_page() is the one-pass variant
+    for pages that arrive one at a time, where a header/footer is dropped
+    once it has been seen on two earlier pages.
+    """
+
+    def __init__(self):
+        self._seen_sentences = set()
+        self._edge_counts = Counter()
+        self.stats = {
+            "pages": 0,
+            "chars_before": 0,
+            "chars_after": 0,
+            "tokens_before": 0,
+            "tokens_after": 0,
+            "tokens_saved": 0,
+            "removed": Counter(),
+        }
+
+    # ---------- Public API ----------
+
+    def clean(self, pages: list) -> str:
+        split = [self._lines(page) for page in pages]
+
+        counts = Counter(
+            signature
+            for lines in split
+            for signature in {_signature(line) for line in self._edges(lines)}
+        )
+        threshold = max(2, int(len(pages) * REPEAT_SHARE))
+        repeated = {signature for signature, count in counts.items() if count >= threshold}
+
+        cleaned = [
+            self._clean_lines(page, lines, repeated)
+            for page, lines in zip(pages, split)
+        ]
+
+        return "\n".join(text for text in cleaned if text).strip()
+
+    def clean_page(self, text: str) -> str:
+        lines = self._lines(text)
+        edges = {_signature(line) for line in self._edges(lines)}
+
+        repeated = {signature for signature in edges if self._edge_counts[signature] >= 2}
+        self._edge_counts.update(edges)
+
+        return self._clean_lines(text, lines, repeated)
+
+    def report(self) -> dict:
+        before = self.stats["tokens_before"]
+        return {
+            **self.stats,
+            "removed": dict(self.stats["removed"]),
+            "saved_percent": round(100 * self.stats["tokens_saved"] / before, 1) if before else 0.0,
+        }
+
+    # ---------- Cleaning ----------
+
+    @staticmethod
+    def _lines(text: str) -> list:
+        return [re.sub(r"\s+", " ", line).strip() for line in (text or "").splitlines()]
+
+    @staticmethod
+    def _edges(lines: list) -> list:
+        content = [line for line in lines if line]
+        return content[:EDGE_LINES] + content[-EDGE_LINES:]
+
+    def _clean_lines(self, original: str, lines: list, repeated: set) -> str:
+        removed = self.stats["removed"]
+        edges = set(self._edges(lines))
+        kept = []
+        block = None   # "toc" / "revision" while inside such a block
+
+        for line in lines:
+            if not line:
+                block = None
+                continue
+
+            if line in edges and _signature(line) in repeated:
+                removed["header_footer"] += 1
+                continue
+
+            if PAGE_LABEL.match(line) or (line in edges and BARE_PAGE_NUMBER.match(line)):
+                removed["page_number"] += 1
+                continue
+
+            if TOC_HEADING.match(line):
+                block = "toc"
+                removed["toc"] += 1
+                continue
+
+            if REVISION_HEADING.match(line):
+                block = "revision"
+                removed["revision_table"] += 1
+                continue
+
+            if block == "toc" and TOC_ENTRY.search(line):
+                removed["toc"] += 1
+                continue
+
+            if block == "revision" and (
+                REVISION_ROW.search(line) or len(REVISION_COLUMNS.findall(line)) >= 2
+            ):
+                removed["revision_table"] += 1
+                continue
+
+            block = None
+
+            # Dot-leader lines are TOC entries even without a heading
+            if re.search(r"\.{4,}\s*\d+$", line):
+                removed["toc"] += 1
+                continue
+
+            line = self._dedupe(line)
+            if line:
+                kept.append(line)
+
+        self.stats["pages"] += 1
+        text = "\n".join(kept)
+        self._count(original, text)
+
+        return text
+
+    def _dedupe(self, line: str) -> str:
+        sentences = []
+
+        for sentence in split_sentences(line):
+            key = sentence.lower()
+            if len(sentence) >= MIN_DEDUPE_CHARS:
+                if key in self._seen_sentences:
+                    self.stats["removed"]["duplicate_sentence"] += 1
+                    continue
+                self._seen_sentences.add(key)
+            sentences.append(sentence)
+
+        return " ".join(sentences)
+
+    def _count(self, before: str, after: str):
+        self.stats["chars_before"] += len(before or "")
+        self.stats["chars_after"] += len(after)
+        self.stats["tokens_before"] += estimate_tokens(before)
+        self.stats["tokens_after"] += estimate_tokens(after)
+        self.stats["tokens_saved"] = self.stats["tokens_before"] - self.stats["tokens_after"]
@@ -1,132 +1,413 @@
-from AI_Backend.ai_task_generator import generate_epics_tasks_json_with_timeline
-from AI_Backend.ai_milestone_generator import generate_milestones
-from AI_Backend.rag import generate_clean_epics_tasks
-import json
-import re
+from AI_Backend.ai_task_generator import agenerate_epics_tasks_json_with_timeline
+from AI_Backend.ai_milestone_generator import agenerate_milestones
+from AI_Backend.ai_project_generator import agenerate_project_plan
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from ..models.project import Project
+from ..models.task import Task
+from .schedule_service import ScheduleService
+from .section_service import SectionService
+from ..schema.generation_schema import (
+    EPICS_SCHEMA,
+    MILESTONES_SCHEMA,
+    PROJECT_PLAN_SCHEMA,
+    validate_epics,
+    validate_milestones
+)
+import asyncio
+import os
+
+
+# -------------------------
+# Generation concurrency
+# -------------------------
+# Task and milestone generation are independent phi3 calls over the same SRS,
+# so they are fanned out together instead of running back to back.
+# GENERATION_MAX_WORKERS caps the generations in flight across all requests.
+GENERATION_MAX_WORKERS = int(os.getenv("MILESTONEX_GENERATION_WORKERS", "2"))
+
+# "separate": one call for epics and one for milestones (run concurrently)
+# "joint": a single call returns both, so the SRS prompt is evaluated once
+# "scheduled": epics only; milestones come from the task schedule (no call)
+GENERATION_MODES = ("separate", "joint", "scheduled")
+GENERATION_MODE = os.getenv("MILESTONEX_GENERATION_MODE", "separate")
+
+# Per-stage timeouts in seconds (None = wait forever)
+STAGE_TIMEOUTS = {
+    "epics": float(os.getenv("MILESTONEX_EPICS_TIMEOUT", "600")),
+    "milestones": float(os.getenv("MILESTONEX_MILESTONES_TIMEOUT", "300")),
+    "plan": float(os.getenv("MILESTONEX_PLAN_TIMEOUT", "900")),
+}
+
+_generation_semaphore = None
+_generation_semaphore_loop = None
+
+
+def _get_generation_semaphore() -> asyncio.Semaphore:
+    global _generation_semaphore, _generation_semaphore_loop
+
+    loop = asyncio.get_running_loop()
+
+    if _generation_semaphore is None or _generation_semaphore_loop is not loop:
+        _generation_semaphore = asyncio.Semaphore(GENERATION_MAX_WORKERS)
+        _generation_semaphore_loop = loop
+
+    return _generation_semaphore
+
+
+class EpicMerger:
+    """
+    Accumulator behind ProjectService.merge_epics: add() each section's
+    cleaned epics once, in document order, and read the merged list with
+    epics(). Work is proportional to the epics added, and task dicts are
+    copied, never modified.
+    """
+
+    def __init__(self):
+        self._merged = {}
+
+    def add(self, epics: list):
+        for epic in epics or []:
+            key = epic["epic_name"].strip().lower()
+
+            if key not in self._merged:
+                self._merged[key] = {
+                    "epic_name": epic["epic_name"],
+                    "description": epic["description"],
+                    "tasks": []
+                }
+
+            tasks = self._merged[key]["tasks"]
+            for task in epic["tasks"]:
+                tasks.append({**task, "sequence": len(tasks) + 1})
+
+    def epics(self) -> list:
+        return list(self._merged.values())
 
 
 class ProjectService:
 
     @staticmethod
-    def analyze_project(srs_text: str):
-        # srs_text = srs_text[:6000]
+    async def _run_stage(name: str, factory, timeout, on_stage=None):
+        try:
+            async with _get_generation_semaphore():
+                result = await asyncio.wait_for(factory(), timeout=timeout)
+        except Exception as e:
+            if on_stage:
+                on_stage(name, e)
+            raise
+
+        if on_stage:
+            on_stage(name, None)
+
+        return result
+
+    @staticmethod
+    async def _run_stages(
+        stages: dict,
+        concurrent: bool = True,
+        timeouts: dict = None,
+        on_stage=None
+    ):
+        """
+        Runs independent generation stages and collects partial results.
+
+        stages maps a stage name to a zero-argument coroutine factory.
+        on_stage(name, error) is called as each stage finishes.
+        Returns (results, errors): a failed or timed-out stage is reported in
+        errors and gets None in results, the other stages are kept.
+        """
+        timeouts = {**STAGE_TIMEOUTS, **(timeouts or {})}
+
+        if concurrent:
+            outcomes = await asyncio.gather(
+                *(
+                    ProjectService._run_stage(name, factory, timeouts.get(name), on_stage)
+                    for name, factory in stages.items()
+                ),
+                return_exceptions=True
+            )
+        else:
+            outcomes = []
+            for name, factory in stages.items():
+                try:
+                    outcomes.append(
+                        await ProjectService._run_stage(
+                            name, factory, timeouts.get(name), on_stage
+                        )
+                    )
+                except Exception as e:
+                    outcomes.append(e)
+
+        results = {}
+        errors = {}
+
+        for name, outcome in zip(stages, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                print(f"⏱️ Stage '{name}' timed out after {timeouts.get(name)}s")
+                results[name] = None
+                errors[name] = f"timed out after {timeouts.get(name)}s"
+            elif isinstance(outcome, Exception):
+                print(f"❌ Stage '{name}' failed:", outcome)
+                results[name] = None
+                errors[name] = str(outcome)
+            else:
+                results[name] = outcome
+
+        return results, errors
+
+    @staticmethod
+    def clean_epics(raw_epics) -> list:
+        """
+        Validates raw model epics through the prebuilt TypeAdapter (key
+        aliases, int timelines) and fills in defaults. Invalid epics are
+        dropped.
+        """
+        return [
+            {
+                "epic_name": epic.epic_name,
+                "description": epic.description or f"Implementation of {epic.epic_name} module.",
+                "tasks": [
+                    {
+                        "task_name": task.task_name,
+                        "timeline_days": task.timeline_days,
+                        "status": task.status or "Backlog",
+                        "sequence": task.sequence or idx + 1
+                    }
+                    for idx, task in enumerate(epic.tasks)
+                ]
+            }
+            for epic in validate_epics(raw_epics)
+        ]
+
+    @staticmethod
+    def clean_epic(epic: dict):
+        """
+        Single-epic clean_epics for streamed output; None if invalid.
+        """
+        cleaned = ProjectService.clean_epics([epic])
+        return cleaned[0] if cleaned else None
+
+    @staticmethod
+    def merge_epics(epic_lists: list) -> list:
+        """
+        Merges cleaned epics generated from separate SRS sections: epics with
+        the same name are combined and their tasks re-sequenced in order.
+        """
+        merger = EpicMerger()
+
+        for epics in epic_lists:
+            merger.add(epics)
+
+        return merger.epics()
+
+    @staticmethod
+    def clean_milestones(raw_milestones) -> list:
+        """
+        Validates raw model milestones through the prebuilt TypeAdapter.
+        """
+        return [
+            {
+                "name": milestone.name,
+                "description": milestone.description or f"Milestone for {milestone.name}",
+                "timeline_days": milestone.timeline_days
+            }
+            for milestone in validate_milestones(raw_milestones)
+        ]
+
+    @staticmethod
+    async def analyze_project(
+        srs_text: str,
+        concurrent: bool = True,
+        timeouts: dict = None,
+        use_cache: bool = True,
+        on_stage=None,
+        mode: str = GENERATION_MODE
+    ):
+        """
+        mode selects "separate" (epics and milestones from two calls),
+        "joint" (one call returning both) or "scheduled" (epics only,
+        milestones derived when the tasks are saved), see GENERATION_MODE.
+        """
+        if mode not in GENERATION_MODES:
+            raise ValueError(f"Unknown generation mode '{mode}'")
+
+        # Long SRS text is split into context-sized sections by the
+        # generators themselves, so nothing is truncated here
         # ---------- Generate AI Output ----------
-        raw_epics = generate_epics_tasks_json_with_timeline(srs_text)
         # epics_tasks_rag = generate_clean_epics_tasks(srs_text)
-        raw_milestones = generate_milestones(srs_text)
+        if mode == "joint":
+            results, errors = await ProjectService._run_stages(
+                {
+                    "plan": lambda: agenerate_project_plan(
+                        srs_text, use_cache, schema=PROJECT_PLAN_SCHEMA
+                    ),
+                },
+                timeouts=timeouts,
+                on_stage=on_stage
+            )
+            plan = results["plan"] or {}
+            raw_epics = plan.get("epics")
+            raw_milestones = plan.get("milestones")
+        else:
+            stages = {
+                "epics": lambda: agenerate_epics_tasks_json_with_timeline(
+                    srs_text,
+                    use_cache,
+                    schema=EPICS_SCHEMA,
+                    validate=ProjectService.clean_epics
+                ),
+            }
+            if mode == "separate":
+                stages["milestones"] = lambda: agenerate_milestones(
+                    srs_text, use_cache, schema=MILESTONES_SCHEMA
+                )
+
+            results, errors = await ProjectService._run_stages(
+                stages,
+                concurrent=concurrent,
+                timeouts=timeouts,
+                on_stage=on_stage
+            )
+            raw_epics = results["epics"]
+            raw_milestones = results.get("milestones")
 
         print("\n=========== RAW EPICS ===========\n", raw_epics)
         # print("\n=========== EPICS TASKS RAG ===========\n", epics_tasks_rag)
         print("\n=========== RAW MILESTONES ===========\n", raw_milestones)
 
         # ---------- CLEAN EPICS ----------
-        cleaned_epics = []
+        # (sections of a long SRS can repeat an epic, so merge by name)
+        cleaned_epics = ProjectService.merge_epics([
+            ProjectService.clean_epics(raw_epics)
+        ])
 
-        for epic in raw_epics or []:
+        # ---------- CLEAN MILESTONES ----------
+        cleaned_milestones = ProjectService.clean_milestones(raw_milestones)
 
-            epic_name = (
-                epic.get("epic_name")
-                or epic.get("Epic Name")
-                or epic.get("name")
-                or ""
-            )
+        return {
+            "epics": cleaned_epics,
+            "milestones": cleaned_milestones,
+            "errors": errors,
+            # "epics_tasks_rag": epics_tasks_rag
+        }
 
-            description = (
-                epic.get("description")
-                or epic.get("Description")
-                or epic.get("epic_description")
-                or f"Implementation of {epic_name} module."
-            )
+    @staticmethod
+    def generation_failed(result: dict) -> bool:
+        """
+        True when every stage failed and there is nothing worth storing.
+        """
+        return bool(result["errors"]) and not result["epics"] and not result["milestones"]
 
-            cleaned_tasks = []
+    @staticmethod
+    def task_rows(project_id: int, epics: list) -> list:
+        """
+        Insert rows for every valid generated task (empty names and
+        non-positive timelines are dropped).
+        """
+        rows = []
 
-            for idx, task in enumerate(epic.get("tasks", [])):
+        for epic in epics:
 
-                task_name = (
-                    task.get("task_name")
-                    or task.get("taskName")
-                    or task.get("task_name0")
-                    or task.get("name")
-                    or ""
-                )
+            for task in epic["tasks"]:
 
-                timeline = (
-                    task.get("timeline_days")
-                    or task.get("days")
-                    or 0
-                )
+                task_name = task.get("task_name", "").strip()
+                timeline = task.get("timeline_days", 0)
 
-                try:
-                    timeline = int(timeline)
-                except:
-                    timeline = 0
-
-                status = task.get("status") or "Backlog"
-                sequence = task.get("sequence") or idx + 1
-
-                cleaned_tasks.append({
-                    "task_name": str(task_name),
-                    "timeline_days": timeline,
-                    "status": str(status),
-                    "sequence": int(sequence)
+                # 🔥 Filter invalid AI tasks
+                if not task_name or int(timeline) <= 0:
+                    continue
+
+                rows.append({
+                    "project_id": project_id,
+                    "epic_name": epic["epic_name"],   # ✅ correct field
+                    "description": epic["description"],
+                    "task_name": task_name,
+                    "timeline_days": int(timeline),
+                    "sequence": task.get("sequence"),
+                    "assigned_to": None,
+                    "status": "pending"
                 })
 
-            cleaned_epics.append({
-                "epic_name": str(epic_name),
-                "description": str(description),
-                "tasks": cleaned_tasks
+        return rows
+
+    @staticmethod
+    def insert_tasks(db: Session, rows: list) -> list:
+        """
+        One executemany INSERT ... RETURNING id; ids come back in row order.
+        """
+        if not rows:
+            return []
+
+        return db.scalars(
+            insert(Task).returning(Task.id, sort_by_parameter_order=True),
+            rows
+        ).all()
+
+    @staticmethod
+    def epics_response(task_ids: list, rows: list) -> list:
+        """
+        Groups written task rows back into the nested epics payload.
+        """
+        epic_map = {}
+
+        for task_id, row in zip(task_ids, rows):
+            epic = epic_map.setdefault(row["epic_name"], {
+                "epic_name": row["epic_name"],
+                "description": "",
+                "tasks": []
             })
+            epic["description"] = row["description"]
 
-        # ---------- CLEAN MILESTONES ----------
-        cleaned_milestones = []
+            epic["tasks"].append({
+                "id": task_id,
+                "task_name": row["task_name"],
+                "timeline_days": row["timeline_days"],
+                "status": row["status"],
+                "sequence": row.get("sequence")
+            })
 
-        # If milestone returned as string with ```json wrapper
-        if isinstance(raw_milestones, str):
-            match = re.search(r'\[.*\]', raw_milestones, re.DOTALL)
-            if match:
-                try:
-                    raw_milestones = json.loads(match.group())
-                except:
-                    raw_milestones = []
-
-        for m in raw_milestones or []:
-            # Normalize keys to lowercase
-            normalized = {k.lower(): v for k, v in m.items()}
-
-            # Auto-detect name-like keys
-            name = (
-                normalized.get("name")
-                or normalized.get("names")
-                or normalized.get("Name")
-                or next((v for k, v in normalized.items() if k.startswith("name")), "")
-            )
+        return list(epic_map.values())
 
-            description = (
-            normalized.get("description")
-            or normalized.get("descriptions")
-            or normalized.get("Description")
-            or next((v for k, v in normalized.items() if k.startswith("description")), "")
-            or f"Milestone for {name}"
-        )
+    @staticmethod
+    def save_analysis(db: Session, srs_text: str, result: dict):
+        """
+        Persists a project with its generated tasks and returns the
+        ProjectAnalysisResponse payload.
+        """
+        # 1️⃣ Create Project (flush only: project + tasks share one commit)
+        project = Project(srs_text=srs_text)
+        db.add(project)
+        db.flush()
 
-            timeline = normalized.get("timeline_days") or 0
+        # 2️⃣ Collect valid task rows, tagged with their SRS section
+        rows = ProjectService.task_rows(project.id, result["epics"])
 
-            try:
-                timeline = int(timeline)
-            except:
-                timeline = 0
+        section_keys = SectionService.attribute(SectionService.split(srs_text), rows)
+        for row, section_key in zip(rows, section_keys):
+            row["section_key"] = section_key
 
-            # Prevent negative hallucinated timelines
-            timeline = max(0, timeline)
+        # 3️⃣ Schedule before inserting: epic sequence edges + start/finish days
+        edges = ScheduleService.schedule_rows(rows)
 
-            cleaned_milestones.append({
-                "name": str(name),
-                "description": str(description),
-                "timeline_days": timeline
-            })
+        # 4️⃣ Store Tasks in one executemany INSERT ... RETURNING id, then edges
+        task_ids = ProjectService.insert_tasks(db, rows)
+        ScheduleService.insert_edges(
+            db,
+            project.id,
+            [(task_ids[index], task_ids[pred]) for index, pred in edges]
+        )
+
+        db.commit()
 
+        # 5️⃣ Build response from the rows we just wrote (no re-query)
+        epics_response = ProjectService.epics_response(task_ids, rows)
+
+        # 6️⃣ Return correct structure (milestones from the schedule when the
+        # model produced none, e.g. in "scheduled" mode)
         return {
-            "epics": cleaned_epics,
-            "milestones": cleaned_milestones,
-            # "epics_tasks_rag": epics_tasks_rag
-        }
\ No newline at end of file
+            "project_id": project.id,
+            "epics": epics_response,
+            "milestones": result["milestones"] or ScheduleService.milestones(rows),
+            "errors": result["errors"]
+        }
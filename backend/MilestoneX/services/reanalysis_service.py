@@ -0,0 +1,204 @@
+from AI_Backend.ai_task_generator import agenerate_epics_tasks_json_with_timeline
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..models.project import Project
+from ..models.task import Task, RETIRED_STATUS
+from ..schema.generation_schema import EPICS_SCHEMA
+from .allocation_service import AllocationService
+from .project_service import ProjectService, STAGE_TIMEOUTS
+from .schedule_service import ScheduleService
+from .section_service import SectionService
+
+
+class ReanalysisService:
+    """
+    Re-analyzes an existing project against a revised SRS: only sections
+    that are new or changed are sent to the model, tasks of removed
+    sections are retired, and every other task is left untouched (same id,
+    assigned_to and status).
+    """
+
+    @staticmethod
+    def diff(old_sections: list, new_sections: list) -> dict:
+        old_keys = {key for key, _ in old_sections}
+        new_keys = {key for key, _ in new_sections}
+
+        added = []
+        seen = set()
+        for key, text in new_sections:
+            if key not in old_keys and key not in seen:
+                added.append((key, text))
+                seen.add(key)
+
+        return {
+            "unchanged": old_keys & new_keys,
+            "added": added,
+            "removed": old_keys - new_keys,
+        }
+
+    @staticmethod
+    def generation_failed(result: dict) -> bool:
+        """
+        True when changed sections produced no tasks; nothing was written.
+        """
+        return bool(result["errors"]) and result["sections"]["added"] > 0 and not result["tasks_added"]
+
+    @staticmethod
+    def _tag_legacy_tasks(old_sections: list, tasks: list):
+        """
+        Projects analyzed before tasks carried a section_key get one now,
+        attributed against the stored SRS. Once any task is tagged, untagged
+        tasks are manual ones and are never retired.
+        """
+        if any(task.section_key for task in tasks):
+            return
+
+        keys = SectionService.attribute(
+            old_sections,
+            [{"epic_name": t.epic_name, "task_name": t.task_name} for t in tasks]
+        )
+        for task, key in zip(tasks, keys):
+            task.section_key = key
+
+    @staticmethod
+    async def reanalyze(db: AsyncSession, project: Project, srs_text: str, use_cache: bool = True) -> dict:
+        old_sections = SectionService.split(project.srs_text)
+        new_sections = SectionService.split(srs_text)
+        changes = ReanalysisService.diff(old_sections, new_sections)
+
+        print(
+            f"🔁 Re-analyzing project {project.id}: {len(changes['unchanged'])} unchanged, "
+            f"{len(changes['added'])} added/changed, {len(changes['removed'])} removed sections"
+        )
+
+        # 1️⃣ Generate only for new / changed sections (before touching the DB,
+        # so a failed generation leaves the project as it was)
+        new_epics = []
+        errors = {}
+
+        if changes["added"]:
+            changed_text = "\n".join(text for _, text in changes["added"])
+            try:
+                raw_epics = await ProjectService._run_stage(
+                    "epics",
+                    lambda: agenerate_epics_tasks_json_with_timeline(
+                        changed_text,
+                        use_cache,
+                        schema=EPICS_SCHEMA,
+                        validate=ProjectService.clean_epics
+                    ),
+                    STAGE_TIMEOUTS["epics"]
+                )
+                new_epics = ProjectService.merge_epics([ProjectService.clean_epics(raw_epics)])
+            except Exception as e:
+                print("❌ Re-analysis generation failed:", e)
+                errors["epics"] = str(e) or type(e).__name__
+
+        sections = {
+            "total": len(new_sections),
+            "unchanged": len(changes["unchanged"]),
+            "added": len(changes["added"]),
+            "removed": len(changes["removed"]),
+        }
+
+        if changes["added"] and not new_epics:
+            errors.setdefault("epics", "no tasks generated for the changed sections")
+            return {
+                "project_id": project.id,
+                "sections": sections,
+                "tasks_kept": 0,
+                "tasks_added": 0,
+                "tasks_retired": 0,
+                "epics": [],
+                "errors": errors,
+            }
+
+        # 2️⃣ - 4️⃣ Database writes run as plain Session code in one transaction
+        applied = await db.run_sync(
+            ReanalysisService.apply,
+            project,
+            srs_text,
+            old_sections,
+            changes,
+            new_epics
+        )
+
+        return {
+            "project_id": project.id,
+            "sections": sections,
+            **applied,
+            "errors": errors,
+        }
+
+    @staticmethod
+    def apply(db: Session, project: Project, srs_text: str, old_sections: list, changes: dict, new_epics: list) -> dict:
+        """
+        Retires the tasks of removed sections, inserts the new ones and
+        stores the revised SRS (one commit). Returns the task counts and the
+        active epics.
+        """
+        # 2️⃣ Retire tasks whose section is gone
+        tasks = db.query(Task).filter(
+            Task.project_id == project.id,
+            Task.status != RETIRED_STATUS
+        ).all()
+
+        ReanalysisService._tag_legacy_tasks(old_sections, tasks)
+
+        retired_ids = [task.id for task in tasks if task.section_key in changes["removed"]]
+        if retired_ids:
+            db.execute(
+                update(Task)
+                .where(Task.id.in_(retired_ids))
+                .values(status=RETIRED_STATUS)
+                .execution_options(synchronize_session=False)
+            )
+
+        kept = [task for task in tasks if task.section_key not in changes["removed"]]
+        kept_ids = [task.id for task in kept]
+
+        # Read before commit() expires the loaded tasks
+        kept_rows = [
+            {
+                "epic_name": task.epic_name,
+                "description": task.description,
+                "task_name": task.task_name,
+                "timeline_days": task.timeline_days,
+                "status": task.status,
+                "sequence": task.sequence,
+            }
+            for task in kept
+        ]
+
+        # 3️⃣ Insert tasks for the changed sections, tagged with their section
+        rows = ProjectService.task_rows(project.id, new_epics)
+        section_keys = SectionService.attribute(changes["added"], rows)
+        for row, section_key in zip(rows, section_keys):
+            row["section_key"] = section_key
+
+        task_ids = ProjectService.insert_tasks(db, rows)
+        ScheduleService.insert_edges(
+            db,
+            project.id,
+            [(task_ids[index], task_ids[pred]) for index, pred in ScheduleService.sequence_edges(rows)]
+        )
+
+        # 4️⃣ Retired and new tasks shift the schedule and member loads
+        db.flush()
+        ScheduleService.reschedule(db, project.id)
+        AllocationService.refresh_load(db, project.id)
+
+        project.srs_text = srs_text
+        db.commit()
+
+        return {
+            "tasks_kept": len(kept_ids),
+            "tasks_added": len(task_ids),
+            "tasks_retired": len(retired_ids),
+            # Every active task: kept ones (unchanged id/status) + new ones
+            "epics": ProjectService.epics_response(
+                kept_ids + list(task_ids),
+                kept_rows + rows
+            ),
+        }
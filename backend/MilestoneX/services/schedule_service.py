@@ -0,0 +1,459 @@
+from collections import deque
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from ..models.task import Task, RETIRED_STATUS
+from ..models.task_dependency import TaskDependency
+
+
+class ScheduleService:
+    """
+    Critical-path scheduling over the task DAG of a project.
+
+    Tasks are nodes weighted by timeline_days, task_dependencies rows are
+    predecessor edges. Every pass is a single topological sweep (Kahn), so
+    a schedule costs O(V + E) and milestones fall out of epic finish times
+    instead of a separate model call.
+    """
+
+    # ---------- Graph algorithms ----------
+
+    @staticmethod
+    def _adjacency(durations: dict, edges) -> tuple:
+        """
+        (predecessors, successors) restricted to the nodes in durations.
+        """
+        preds = {node: [] for node in durations}
+        succs = {node: [] for node in durations}
+
+        for node, depends_on in edges:
+            if node in durations and depends_on in durations and node != depends_on:
+                preds[node].append(depends_on)
+                succs[depends_on].append(node)
+
+        return preds, succs
+
+    @staticmethod
+    def _forward(nodes, durations: dict, preds: dict, succs: dict, fixed_finish: dict = None) -> tuple:
+        """
+        Earliest starts for nodes in topological order. Predecessors outside
+        nodes are not recomputed; their finish is read from fixed_finish.
+
+        Returns (order, start). Raises ValueError on a cycle.
+        """
+        nodes = set(nodes)
+        fixed_finish = fixed_finish or {}
+
+        indegree = {
+            node: sum(1 for pred in preds[node] if pred in nodes)
+            for node in nodes
+        }
+        queue = deque(sorted(node for node, degree in indegree.items() if degree == 0))
+
+        order = []
+        start = {}
+
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+
+            start[node] = max(
+                (
+                    start[pred] + durations[pred] if pred in nodes else fixed_finish.get(pred) or 0
+                    for pred in preds[node]
+                ),
+                default=0
+            )
+
+            for succ in succs[node]:
+                if succ in nodes:
+                    indegree[succ] -= 1
+                    if indegree[succ] == 0:
+                        queue.append(succ)
+
+        if len(order) != len(nodes):
+            raise ValueError("Task dependencies contain a cycle")
+
+        return order, start
+
+    @staticmethod
+    def compute(durations: dict, edges) -> dict:
+        """
+        Full critical-path pass.
+
+        durations maps node -> days, edges are (node, depends_on) pairs.
+        Returns earliest start/finish, slack (latest minus earliest start),
+        the project duration and one critical chain from start to end.
+        """
+        preds, succs = ScheduleService._adjacency(durations, edges)
+        order, start = ScheduleService._forward(durations, durations, preds, succs)
+
+        finish = {node: start[node] + durations[node] for node in order}
+        duration_days = max(finish.values(), default=0)
+
+        # Backward pass: latest finish that does not delay the project
+        latest_finish = {}
+        for node in reversed(order):
+            latest_finish[node] = min(
+                (latest_finish[succ] - durations[succ] for succ in succs[node]),
+                default=duration_days
+            )
+
+        slack = {node: latest_finish[node] - finish[node] for node in order}
+
+        critical_path = []
+        current = next((node for node in order if slack[node] == 0 and start[node] == 0), None)
+        while current is not None:
+            critical_path.append(current)
+            current = next(
+                (
+                    succ for succ in succs[current]
+                    if slack[succ] == 0 and start[succ] == finish[current]
+                ),
+                None
+            )
+
+        return {
+            "order": order,
+            "start": start,
+            "finish": finish,
+            "slack": slack,
+            "duration_days": duration_days,
+            "critical_path": critical_path,
+        }
+
+    @staticmethod
+    def creates_cycle(edges, task_id: int, depends_on_id: int) -> bool:
+        """
+        True when adding task_id -> depends_on_id would close a cycle, i.e.
+        depends_on_id already (transitively) depends on task_id.
+        """
+        if task_id == depends_on_id:
+            return True
+
+        succs = {}
+        for node, depends_on in edges:
+            succs.setdefault(depends_on, []).append(node)
+
+        seen = set()
+        stack = [task_id]
+        while stack:
+            node = stack.pop()
+            if node == depends_on_id:
+                return True
+            if node in seen:
+                continue
+            seen.add(node)
+            stack.extend(succs.get(node, ()))
+
+        return False
+
+    # ---------- Generated tasks ----------
+
+    @staticmethod
+    def sequence_edges(rows: list) -> list:
+        """
+        Default edges for generated task rows: tasks of one epic run in
+        sequence order, different epics run in parallel.
+
+        Returns (row_index, predecessor_row_index) pairs.
+        """
+        by_epic = {}
+        for index, row in enumerate(rows):
+            by_epic.setdefault(row["epic_name"], []).append(index)
+
+        edges = []
+        for indexes in by_epic.values():
+            indexes.sort(key=lambda i: rows[i].get("sequence") or 0)
+            edges.extend(zip(indexes[1:], indexes[:-1]))
+
+        return edges
+
+    @staticmethod
+    def schedule_rows(rows: list) -> list:
+        """
+        Fills start_day / finish_day on not-yet-inserted task rows and
+        returns their sequence edges (row indexes).
+        """
+        edges = ScheduleService.sequence_edges(rows)
+        schedule = ScheduleService.compute(
+            {index: row["timeline_days"] for index, row in enumerate(rows)},
+            edges
+        )
+
+        for index, row in enumerate(rows):
+            row["start_day"] = schedule["start"][index]
+            row["finish_day"] = schedule["finish"][index]
+
+        return edges
+
+    @staticmethod
+    def insert_edges(db: Session, project_id: int, edges: list):
+        """
+        One executemany INSERT for (task_id, depends_on_id) pairs.
+        """
+        if not edges:
+            return
+
+        db.execute(
+            insert(TaskDependency),
+            [
+                {"project_id": project_id, "task_id": task_id, "depends_on_id": depends_on_id}
+                for task_id, depends_on_id in edges
+            ]
+        )
+
+    @staticmethod
+    def milestones(tasks) -> list:
+        """
+        One milestone per epic, due when its last task finishes.
+        tasks are dicts with epic_name and finish_day.
+        """
+        finish_by_epic = {}
+        count_by_epic = {}
+
+        for task in tasks:
+            epic = task["epic_name"]
+            finish_by_epic[epic] = max(finish_by_epic.get(epic, 0), task["finish_day"] or 0)
+            count_by_epic[epic] = count_by_epic.get(epic, 0) + 1
+
+        return [
+            {
+                "name": f"{epic} complete",
+                "description": f"All {count_by_epic[epic]} tasks of {epic} finished",
+                "timeline_days": finish
+            }
+            for epic, finish in sorted(finish_by_epic.items(), key=lambda item: item[1])
+        ]
+
+    # ---------- Stored projects ----------
+
+    @staticmethod
+    def load(db: Session, project_id: int) -> tuple:
+        """
+        (active task rows, every dependency edge of the project).
+        """
+        tasks = db.execute(
+            select(
+                Task.id,
+                Task.epic_name,
+                Task.task_name,
+                Task.timeline_days,
+                Task.start_day,
+                Task.finish_day
+            ).where(
+                Task.project_id == project_id,
+                Task.status != RETIRED_STATUS
+            )
+        ).all()
+
+        edges = db.execute(
+            select(TaskDependency.task_id, TaskDependency.depends_on_id)
+            .where(TaskDependency.project_id == project_id)
+        ).all()
+
+        return tasks, [tuple(edge) for edge in edges]
+
+    @staticmethod
+    def reschedule(db: Session, project_id: int, changed: list = None) -> int:
+        """
+        Recomputes start/finish days after an edit and writes the rows that
+        moved (no commit).
+
+        Only changed tasks and their descendants are recomputed; the rest
+        keep their stored days. changed may contain tasks that are gone or
+        retired, their former successors are recomputed. changed=None (or a
+        project with unscheduled tasks) recomputes everything.
+
+        Returns the number of tasks whose days changed.
+        """
+        tasks, edges = ScheduleService.load(db, project_id)
+
+        durations = {task.id: task.timeline_days or 0 for task in tasks}
+        stored = {task.id: (task.start_day, task.finish_day) for task in tasks}
+        preds, succs = ScheduleService._adjacency(durations, edges)
+
+        unscheduled = any(
+            start is None
+            for task_id, (start, _) in stored.items()
+            if changed is None or task_id not in changed
+        )
+
+        if changed is None or unscheduled:
+            affected = set(durations)
+        else:
+            # succs only covers scheduled tasks; a changed task that was just
+            # retired still has edges to the successors it no longer delays
+            dependents = {}
+            for node, depends_on in edges:
+                dependents.setdefault(depends_on, []).append(node)
+
+            seeds = set()
+            for task_id in changed:
+                if task_id in durations:
+                    seeds.add(task_id)
+                seeds.update(node for node in dependents.get(task_id, ()) if node in durations)
+
+            affected = set()
+            stack = list(seeds)
+            while stack:
+                node = stack.pop()
+                if node not in affected:
+                    affected.add(node)
+                    stack.extend(succs[node])
+
+        _, start = ScheduleService._forward(
+            affected,
+            durations,
+            preds,
+            succs,
+            fixed_finish={task_id: finish for task_id, (_, finish) in stored.items()}
+        )
+
+        moved = [
+            {"id": task_id, "start_day": start[task_id], "finish_day": start[task_id] + durations[task_id]}
+            for task_id in affected
+            if stored[task_id] != (start[task_id], start[task_id] + durations[task_id])
+        ]
+
+        if moved:
+            db.execute(update(Task), moved)
+
+        print(f"🗓️ Rescheduled project {project_id}: {len(affected)} recomputed, {len(moved)} moved")
+
+        return len(moved)
+
+    @staticmethod
+    def add_dependency(db: Session, task: Task, depends_on: Task):
+        """
+        Adds the edge and reschedules task and its descendants (no commit).
+        Raises ValueError if the tasks belong to different projects or the
+        edge would create a cycle.
+        """
+        if task.project_id != depends_on.project_id:
+            raise ValueError("Tasks belong to different projects")
+
+        _, edges = ScheduleService.load(db, task.project_id)
+
+        if (task.id, depends_on.id) in edges:
+            return
+
+        if ScheduleService.creates_cycle(edges, task.id, depends_on.id):
+            raise ValueError(f"Task {task.id} depending on task {depends_on.id} creates a cycle")
+
+        ScheduleService.insert_edges(db, task.project_id, [(task.id, depends_on.id)])
+        ScheduleService.reschedule(db, task.project_id, [task.id])
+
+    @staticmethod
+    def remove_dependency(db: Session, task: Task, depends_on_id: int) -> bool:
+        """
+        Removes the edge and reschedules (no commit). False if it did not exist.
+        """
+        edge = db.query(TaskDependency).filter(
+            TaskDependency.task_id == task.id,
+            TaskDependency.depends_on_id == depends_on_id
+        ).first()
+
+        if not edge:
+            return False
+
+        db.delete(edge)
+        db.flush()
+        ScheduleService.reschedule(db, task.project_id, [task.id])
+
+        return True
+
+    @staticmethod
+    def detach_task(db: Session, task: Task) -> list:
+        """
+        Drops every edge touching task before it is deleted and returns its
+        former successors, which need rescheduling afterwards.
+        """
+        edges = db.query(TaskDependency).filter(
+            (TaskDependency.task_id == task.id) | (TaskDependency.depends_on_id == task.id)
+        ).all()
+
+        successors = [edge.task_id for edge in edges if edge.depends_on_id == task.id]
+
+        for edge in edges:
+            db.delete(edge)
+
+        return successors
+
+    @staticmethod
+    def depends_on(db: Session, task_id: int) -> list:
+        return list(db.scalars(
+            select(TaskDependency.depends_on_id)
+            .where(TaskDependency.task_id == task_id)
+            .order_by(TaskDependency.depends_on_id)
+        ))
+
+    @staticmethod
+    def ensure_sequence_edges(db: Session, project_id: int) -> int:
+        """
+        Projects stored before dependencies existed get the default epic
+        sequence edges (by sequence, then id). Returns the edges added.
+        """
+        tasks, edges = ScheduleService.load(db, project_id)
+
+        if edges or not tasks:
+            return 0
+
+        sequences = dict(db.execute(
+            select(Task.id, Task.sequence).where(Task.project_id == project_id)
+        ).all())
+
+        rows = [
+            {"epic_name": task.epic_name, "sequence": sequences.get(task.id) or index + 1}
+            for index, task in enumerate(sorted(tasks, key=lambda t: t.id))
+        ]
+        task_ids = sorted(task.id for task in tasks)
+
+        new_edges = [
+            (task_ids[index], task_ids[pred])
+            for index, pred in ScheduleService.sequence_edges(rows)
+        ]
+        ScheduleService.insert_edges(db, project_id, new_edges)
+
+        return len(new_edges)
+
+    @staticmethod
+    def project_schedule(db: Session, project_id: int) -> dict:
+        """
+        ScheduleResponse payload: full critical-path pass over the stored
+        tasks (read only).
+        """
+        tasks, edges = ScheduleService.load(db, project_id)
+
+        schedule = ScheduleService.compute(
+            {task.id: task.timeline_days or 0 for task in tasks},
+            edges
+        )
+        critical = set(schedule["critical_path"])
+
+        depends_on = {}
+        for task_id, pred in edges:
+            if pred in schedule["start"]:
+                depends_on.setdefault(task_id, []).append(pred)
+
+        scheduled = [
+            {
+                "id": task.id,
+                "epic_name": task.epic_name,
+                "task_name": task.task_name,
+                "timeline_days": task.timeline_days or 0,
+                "start_day": schedule["start"][task.id],
+                "finish_day": schedule["finish"][task.id],
+                "slack_days": schedule["slack"][task.id],
+                "critical": task.id in critical,
+                "depends_on": sorted(depends_on.get(task.id, [])),
+            }
+            for task in sorted(tasks, key=lambda t: (schedule["start"][t.id], t.id))
+        ]
+
+        return {
+            "project_id": project_id,
+            "duration_days": schedule["duration_days"],
+            "critical_path": schedule["critical_path"],
+            "tasks": scheduled,
+            "milestones": ScheduleService.milestones(scheduled),
+        }
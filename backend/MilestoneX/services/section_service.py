@@ -0,0 +1,57 @@
+from AI_Backend.rag import BM25Index
+from AI_Backend.tokens import content_sections
+from AI_Backend.llm_cache import normalize_text
+import hashlib
+import os
+
+
+# -------------------------
+# Section diff settings
+# -------------------------
+# Smaller sections make revisions cheaper to re-analyze (less unchanged
+# text around an edit) at the cost of more generation calls
+DIFF_SECTION_TOKENS = int(os.getenv("MILESTONEX_DIFF_SECTION_TOKENS", "400"))
+
+
+class SectionService:
+    """
+    Splits SRS text into content-defined sections and ties tasks to the
+    section they were generated from, so a revised SRS can be diffed
+    section by section.
+    """
+
+    @staticmethod
+    def split(srs_text: str) -> list:
+        """
+        Returns [(section_key, section_text)] in document order.
+        """
+        return [
+            (SectionService.key(section), section)
+            for section in content_sections(srs_text or "", DIFF_SECTION_TOKENS)
+        ]
+
+    @staticmethod
+    def key(section_text: str) -> str:
+        return hashlib.sha1(normalize_text(section_text).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def attribute(sections: list, rows: list) -> list:
+        """
+        Best-matching section key for every task row (BM25 over the section
+        texts with the epic and task names as the query). Rows that share no
+        term with any section fall back to the first section.
+        """
+        if not sections:
+            return [None] * len(rows)
+
+        if len(sections) == 1:
+            return [sections[0][0]] * len(rows)
+
+        index = BM25Index([text for _, text in sections])
+
+        keys = []
+        for row in rows:
+            hits = index.search(f"{row.get('epic_name', '')} {row.get('task_name', '')}", 1)
+            keys.append(sections[hits[0][0] if hits else 0][0])
+
+        return keys
@@ -0,0 +1,357 @@
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.orm import Session
+from ..models.task import Task, RETIRED_STATUS
+from ..models.task_dependency import TaskDependency
+from ..schema.task_schema import TaskResponse
+import os
+from .allocation_service import AllocationService
+from .schedule_service import ScheduleService
+
+
+# Columns a task listing can project with fields=
+TASK_FIELDS = tuple(TaskResponse.model_fields)
+
+# -------------------------
+# Batch mutations
+# -------------------------
+TASK_BATCH_MAX = int(os.getenv("MILESTONEX_TASK_BATCH_MAX", "1000"))
+
+
+class TaskService:
+    """
+    Task writes together with their schedule and allocation upkeep. Plain
+    Session code: the async routers run it through AsyncSession.run_sync.
+    """
+
+    @staticmethod
+    def parse_fields(fields: str = None) -> list:
+        """
+        fields=id,task_name,status -> column names (id is always included,
+        it is the pagination key). Raises ValueError on unknown names.
+        """
+        if not fields:
+            return list(TASK_FIELDS)
+
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in names if name not in TASK_FIELDS]
+
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)} (allowed: {', '.join(TASK_FIELDS)})")
+
+        return ["id"] + [name for name in dict.fromkeys(names) if name != "id"]
+
+    @staticmethod
+    def list_query(
+        project_id: int,
+        fields: list,
+        status: str = None,
+        epic_name: str = None,
+        assigned_to: str = None,
+        cursor: int = None,
+        limit: int = None
+    ):
+        """
+        Keyset page of a project's tasks ordered by id. Every filter is an
+        equality on a (project_id, ...) index, and id > cursor seeks within
+        it. Selects limit + 1 rows so the caller can tell if a next page
+        exists.
+        """
+        query = select(*(getattr(Task, name) for name in fields)).where(Task.project_id == project_id)
+
+        if status is not None:
+            query = query.where(Task.status == status)
+        if epic_name is not None:
+            query = query.where(Task.epic_name == epic_name)
+        if assigned_to is not None:
+            query = query.where(Task.assigned_to == assigned_to)
+        if cursor is not None:
+            query = query.where(Task.id > cursor)
+
+        query = query.order_by(Task.id)
+
+        if limit is not None:
+            query = query.limit(limit + 1)
+
+        return query
+
+    @staticmethod
+    def create_task(db: Session, project_id: int, fields: dict, depends_on: list, allocate: bool = True) -> Task:
+        """
+        Raises ValueError if a depends_on id is not a task of the project.
+        """
+        depends_on = set(depends_on or [])
+
+        if depends_on:
+            found = db.query(Task.id).filter(
+                Task.project_id == project_id,
+                Task.id.in_(depends_on)
+            ).count()
+
+            if found != len(depends_on):
+                raise ValueError("depends_on must be tasks of this project")
+
+        task = Task(project_id=project_id, status="pending", **fields)
+
+        db.add(task)
+        db.flush()
+
+        # A new task has no successors, so its edges cannot form a cycle
+        ScheduleService.insert_edges(db, project_id, [(task.id, pred) for pred in sorted(depends_on)])
+        ScheduleService.reschedule(db, project_id, [task.id])
+
+        AllocationService.allocate_task(db, task, allocate=allocate)
+
+        db.commit()
+        db.refresh(task)
+
+        return task
+
+    @staticmethod
+    def update_task(db: Session, task_id: int, changes: dict, allocate: bool = True):
+        """
+        Returns the updated task, or None if it does not exist.
+        """
+        task = db.query(Task).filter(Task.id == task_id).first()
+
+        if not task:
+            return None
+
+        old_assignee = task.assigned_to
+        old_days = task.timeline_days if task.status != RETIRED_STATUS else 0
+
+        for key, value in changes.items():
+            setattr(task, key, value)
+
+        # Duration or status (retired tasks drop out) moves the task and its
+        # descendants; nothing else affects the schedule
+        if "timeline_days" in changes or "status" in changes:
+            db.flush()
+            ScheduleService.reschedule(db, task.project_id, [task.id])
+
+        # An explicit assigned_to is kept as given
+        AllocationService.allocate_task(
+            db,
+            task,
+            old_assignee,
+            old_days,
+            allocate=allocate and "assigned_to" not in changes
+        )
+
+        db.commit()
+        db.refresh(task)
+
+        return task
+
+    @staticmethod
+    def delete_task(db: Session, task_id: int) -> bool:
+        task = db.query(Task).filter(Task.id == task_id).first()
+
+        if not task:
+            return False
+
+        project_id = task.project_id
+        successors = ScheduleService.detach_task(db, task)
+        AllocationService.release_task(db, task)
+
+        db.delete(task)
+        db.flush()
+        ScheduleService.reschedule(db, project_id, successors)
+
+        db.commit()
+
+        return True
+
+    # ---------- Batches (one transaction, one commit) ----------
+
+    @staticmethod
+    def _committed(db: Session, task_ids: list) -> dict:
+        """
+        Final state of the batch's tasks in one SELECT (the schedule is
+        written with bulk UPDATEs that bypass the loaded objects).
+        """
+        if not task_ids:
+            return {}
+
+        return {
+            task.id: task
+            for task in db.query(Task)
+            .filter(Task.id.in_(task_ids))
+            .execution_options(populate_existing=True)
+        }
+
+    @staticmethod
+    def create_tasks(db: Session, project_id: int, items: list, allocate: bool = True) -> list:
+        """
+        items are (fields, depends_on) pairs. Valid items are written with
+        one INSERT ... RETURNING and one edge INSERT; an item whose
+        depends_on names a task outside the project fails alone.
+
+        Returns one result dict per item, in order.
+        """
+        wanted = {pred for _, depends_on in items for pred in depends_on or []}
+        existing = set()
+        if wanted:
+            existing = set(db.scalars(
+                select(Task.id).where(Task.project_id == project_id, Task.id.in_(wanted))
+            ))
+
+        results = [None] * len(items)
+        valid = []
+
+        for index, (fields, depends_on) in enumerate(items):
+            missing = sorted(set(depends_on or []) - existing)
+            if missing:
+                results[index] = {
+                    "index": index,
+                    "ok": False,
+                    "error": f"depends_on must be tasks of this project: {missing}",
+                }
+            else:
+                valid.append((index, fields, sorted(set(depends_on or []))))
+
+        if valid:
+            tasks = db.scalars(
+                insert(Task).returning(Task, sort_by_parameter_order=True),
+                [{**fields, "project_id": project_id, "status": "pending"} for _, fields, _ in valid]
+            ).all()
+
+            # New tasks have no successors, so their edges cannot form a cycle
+            ScheduleService.insert_edges(db, project_id, [
+                (task.id, pred)
+                for task, (_, _, depends_on) in zip(tasks, valid)
+                for pred in depends_on
+            ])
+            ScheduleService.reschedule(db, project_id, [task.id for task in tasks])
+
+            members = AllocationService.team_members(db, project_id)
+            for task in tasks:
+                AllocationService.allocate_task(db, task, allocate=allocate, members=members)
+
+            db.commit()
+
+            committed = TaskService._committed(db, [task.id for task in tasks])
+            for task, (index, _, _) in zip(tasks, valid):
+                results[index] = {"index": index, "id": task.id, "ok": True, "task": committed[task.id]}
+
+        return results
+
+    @staticmethod
+    def update_tasks(db: Session, items: list, allocate: bool = True) -> list:
+        """
+        items are (task_id, changes) pairs. Targets are loaded with one
+        SELECT and flushed together (same-column UPDATEs are batched into
+        one executemany); each project is rescheduled once. Missing or
+        repeated ids fail alone.
+        """
+        task_ids = {task_id for task_id, _ in items}
+        tasks = {
+            task.id: task
+            for task in db.query(Task).filter(Task.id.in_(task_ids))
+        } if task_ids else {}
+
+        results = [None] * len(items)
+        updated = []
+        seen = set()
+
+        for index, (task_id, changes) in enumerate(items):
+            task = tasks.get(task_id)
+
+            if task is None:
+                results[index] = {"index": index, "id": task_id, "ok": False, "error": "Task not found"}
+                continue
+            if task_id in seen:
+                results[index] = {"index": index, "id": task_id, "ok": False, "error": "Task repeated in batch"}
+                continue
+            seen.add(task_id)
+
+            old_assignee = task.assigned_to
+            old_days = task.timeline_days if task.status != RETIRED_STATUS else 0
+
+            for key, value in changes.items():
+                setattr(task, key, value)
+
+            updated.append((index, task, changes, old_assignee, old_days))
+
+        if updated:
+            db.flush()
+
+            rescheduled = {}
+            for _, task, changes, _, _ in updated:
+                if "timeline_days" in changes or "status" in changes:
+                    rescheduled.setdefault(task.project_id, []).append(task.id)
+
+            for project_id, changed in rescheduled.items():
+                ScheduleService.reschedule(db, project_id, changed)
+
+            members_by_project = {}
+            for _, task, changes, old_assignee, old_days in updated:
+                if task.project_id not in members_by_project:
+                    members_by_project[task.project_id] = AllocationService.team_members(db, task.project_id)
+
+                # An explicit assigned_to is kept as given
+                AllocationService.allocate_task(
+                    db,
+                    task,
+                    old_assignee,
+                    old_days,
+                    allocate=allocate and "assigned_to" not in changes,
+                    members=members_by_project[task.project_id]
+                )
+
+            db.commit()
+
+            committed = TaskService._committed(db, [task.id for _, task, _, _, _ in updated])
+            for index, task, _, _, _ in updated:
+                results[index] = {"index": index, "id": task.id, "ok": True, "task": committed[task.id]}
+
+        return results
+
+    @staticmethod
+    def delete_tasks(db: Session, task_ids: list) -> list:
+        """
+        One DELETE for the edges and one for the tasks; member loads are
+        rebuilt and former successors rescheduled once per project.
+        """
+        found = dict(db.execute(
+            select(Task.id, Task.project_id).where(Task.id.in_(task_ids))
+        ).all()) if task_ids else {}
+
+        results = []
+        deleted = set()
+        for index, task_id in enumerate(task_ids):
+            if task_id not in found:
+                results.append({"index": index, "id": task_id, "ok": False, "error": "Task not found"})
+            elif task_id in deleted:
+                results.append({"index": index, "id": task_id, "ok": False, "error": "Task repeated in batch"})
+            else:
+                deleted.add(task_id)
+                results.append({"index": index, "id": task_id, "ok": True})
+
+        if not deleted:
+            return results
+
+        successors = db.execute(
+            select(TaskDependency.project_id, TaskDependency.task_id)
+            .where(TaskDependency.depends_on_id.in_(deleted), TaskDependency.task_id.not_in(deleted))
+        ).all()
+
+        db.execute(delete(TaskDependency).where(
+            or_(TaskDependency.task_id.in_(deleted), TaskDependency.depends_on_id.in_(deleted))
+        ))
+        db.execute(
+            delete(Task)
+            .where(Task.id.in_(deleted))
+            .execution_options(synchronize_session=False)
+        )
+
+        for project_id in sorted({found[task_id] for task_id in deleted}):
+            ScheduleService.reschedule(
+                db,
+                project_id,
+                [task_id for edge_project, task_id in successors if edge_project == project_id]
+            )
+            AllocationService.refresh_load(db, project_id)
+
+        db.commit()
+
+        return results
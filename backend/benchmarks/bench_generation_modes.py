@@ -0,0 +1,94 @@
+"""
+Compares the two-call generation path (epics + milestones) with the joint
+single-prompt path against a running Ollama server.
+
+Run from backend/:  python -m benchmarks.bench_generation_modes path/to/srs.pdf [repeat]
+
+Both modes run with the LLM cache disabled, so every run hits the model.
+"""
+import asyncio
+import sys
+import time
+
+from AI_Backend import ai_milestone_generator, ai_project_generator, ai_task_generator
+from AI_Backend.tokens import estimate_tokens, split_sections
+from MilestoneX.services.pdf_services import PDFService
+from MilestoneX.services.project_service import ProjectService
+
+REPEAT = 3
+
+
+def load_srs(path: str) -> str:
+    with open(path, "rb") as f:
+        content = f.read()
+
+    if path.lower().endswith(".pdf"):
+        text, _ = asyncio.run(PDFService.extract_pages(content))
+        return text
+
+    return content.decode("utf-8")
+
+
+def prompt_tokens(srs_text: str, build_prompt, section_tokens: int) -> int:
+    # Prompt tokens the server has to evaluate for one generator
+    if estimate_tokens(srs_text) <= section_tokens:
+        sections = [srs_text]
+    else:
+        sections = split_sections(srs_text, section_tokens)
+
+    return sum(estimate_tokens(build_prompt(section)) for section in sections)
+
+
+def timed(srs_text: str, mode: str):
+    best = float("inf")
+    result = None
+
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        result = asyncio.run(ProjectService.analyze_project(srs_text, use_cache=False, mode=mode))
+        best = min(best, time.perf_counter() - started)
+
+    return best, result
+
+
+def main():
+    global REPEAT
+
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    if len(sys.argv) > 2:
+        REPEAT = int(sys.argv[2])
+
+    srs_text = load_srs(sys.argv[1])
+
+    tokens = {
+        "separate": (
+            prompt_tokens(srs_text, ai_task_generator.build_epics_prompt, ai_task_generator.SECTION_TOKENS)
+            + prompt_tokens(srs_text, ai_milestone_generator.build_milestones_prompt, ai_milestone_generator.SECTION_TOKENS)
+        ),
+        "joint": prompt_tokens(
+            srs_text, ai_project_generator.build_project_prompt, ai_project_generator.SECTION_TOKENS
+        ),
+    }
+
+    print(f"SRS: ~{estimate_tokens(srs_text)} tokens, best of {REPEAT}")
+    print(f"{'mode':>10} {'prompt tok':>11} {'seconds':>9} {'epics':>6} {'tasks':>6} {'milestones':>11}")
+
+    timings = {}
+    for mode in ("separate", "joint"):
+        seconds, result = timed(srs_text, mode)
+        timings[mode] = seconds
+        print(
+            f"{mode:>10} {tokens[mode]:>11} {seconds:>9.2f} {len(result['epics']):>6} "
+            f"{sum(len(e['tasks']) for e in result['epics']):>6} {len(result['milestones']):>11}"
+        )
+        if result["errors"]:
+            print(f"{'':>10} errors: {result['errors']}")
+
+    print(f"joint speedup: {timings['separate'] / timings['joint']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Compares the old SQLite setup (default engine, rollback journal, no
+indexes on tasks.project_id) with the tuned storage layer (WAL + pragmas,
+pooled engine, composite indexes from the migrations) on a 100k-task
+database.
+
+Run from backend/:  python -m benchmarks.bench_storage [tasks]
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, func, insert, select, text
+
+from MilestoneX.database import Base, make_engine
+from MilestoneX.migrations import run_migrations
+from MilestoneX.models.project import Project
+from MilestoneX.models.task import Task, RETIRED_STATUS
+
+TASKS = 100_000
+TASKS_PER_PROJECT = 200
+TASKS_PER_EPIC = 10
+STATUSES = ["pending", "pending", "in_progress", "done", RETIRED_STATUS]
+SAMPLED_PROJECTS = 50
+REPEAT = 3
+
+WRITERS = 4
+READERS = 4
+WRITES_PER_THREAD = 100
+
+
+def legacy_engine(path: str):
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+
+    # The schema before any of the tasks.project_id indexes existed
+    with engine.begin() as conn:
+        for index_name in (
+            "ix_tasks_project_epic",
+            "ix_tasks_project_status",
+            "ix_tasks_project_assignee",
+            "ix_tasks_project_id",
+        ):
+            conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+
+    return engine
+
+
+def tuned_engine(path: str):
+    engine = make_engine(f"sqlite:///{path}")
+    run_migrations(engine)
+    return engine
+
+
+def populate(engine, task_count: int):
+    projects = task_count // TASKS_PER_PROJECT
+    rng = random.Random(42)
+
+    with engine.begin() as conn:
+        conn.execute(insert(Project), [{"id": p + 1, "srs_text": "srs"} for p in range(projects)])
+
+        rows = [
+            {
+                "project_id": p + 1,
+                "epic_name": f"Epic {t // TASKS_PER_EPIC}",
+                "description": "Generated epic description",
+                "task_name": f"Task {p}-{t}",
+                "timeline_days": 1 + t % 5,
+                "status": rng.choice(STATUSES),
+            }
+            for p in range(projects)
+            for t in range(TASKS_PER_PROJECT)
+        ]
+
+        # Interleave projects like a real database filled over time
+        rng.shuffle(rows)
+        conn.execute(insert(Task), rows)
+
+    return projects
+
+
+QUERIES = {
+    "project tasks": lambda p: select(Task).where(Task.project_id == p),
+    "active tasks": lambda p: select(Task.id, Task.timeline_days).where(
+        Task.project_id == p, Task.status != RETIRED_STATUS
+    ),
+    "epic tasks": lambda p: select(Task).where(Task.project_id == p, Task.epic_name == "Epic 3"),
+    "status counts": lambda p: select(Task.status, func.count()).where(
+        Task.project_id == p
+    ).group_by(Task.status),
+}
+
+
+def time_query(engine, build, projects: list) -> float:
+    best = float("inf")
+
+    for _ in range(REPEAT):
+        with engine.connect() as conn:
+            started = time.perf_counter()
+            for p in projects:
+                conn.execute(build(p)).all()
+            best = min(best, time.perf_counter() - started)
+
+    return best / len(projects)
+
+
+def concurrent_load(engine, projects: int) -> tuple:
+    """
+    Writers insert single tasks in their own transactions while readers
+    list projects. Returns (seconds, errors).
+    """
+    errors = []
+
+    def writer(n):
+        for i in range(WRITES_PER_THREAD):
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(Task).values(
+                        project_id=1 + (n * WRITES_PER_THREAD + i) % projects,
+                        epic_name="Epic 0",
+                        task_name=f"Concurrent {n}-{i}",
+                        timeline_days=1,
+                        status="pending"
+                    ))
+            except Exception as e:
+                errors.append(e)
+
+    def reader(n):
+        rng = random.Random(n)
+        for _ in range(WRITES_PER_THREAD):
+            try:
+                with engine.connect() as conn:
+                    conn.execute(QUERIES["project tasks"](rng.randint(1, projects))).all()
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(WRITERS)]
+    threads += [threading.Thread(target=reader, args=(n,)) for n in range(READERS)]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return time.perf_counter() - started, len(errors)
+
+
+def main():
+    task_count = int(sys.argv[1]) if len(sys.argv) > 1 else TASKS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engines = {
+            "legacy": legacy_engine(os.path.join(tmp, "legacy.db")),
+            "tuned": tuned_engine(os.path.join(tmp, "tuned.db")),
+        }
+
+        projects = 0
+        for name, engine in engines.items():
+            started = time.perf_counter()
+            projects = populate(engine, task_count)
+            print(f"{name:>7}: inserted {task_count} tasks in {time.perf_counter() - started:.2f}s")
+
+        sampled = random.Random(7).sample(range(1, projects + 1), min(SAMPLED_PROJECTS, projects))
+
+        print(f"\n{'query':>15} {'legacy ms':>11} {'tuned ms':>10} {'speedup':>9}")
+        for label, build in QUERIES.items():
+            legacy = time_query(engines["legacy"], build, sampled)
+            tuned = time_query(engines["tuned"], build, sampled)
+            print(f"{label:>15} {legacy * 1000:>11.3f} {tuned * 1000:>10.3f} {legacy / tuned:>8.1f}x")
+
+        print(f"\nconcurrent: {WRITERS} writers x {WRITES_PER_THREAD} inserts + {READERS} readers")
+        for name, engine in engines.items():
+            seconds, errors = concurrent_load(engine, projects)
+            print(f"{name:>7}: {seconds:.2f}s, {errors} errors")
+
+        for engine in engines.values():
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
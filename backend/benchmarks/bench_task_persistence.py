@@ -0,0 +1,111 @@
+"""
+Compares the old per-object task persistence of /analyze-project with the
+bulk INSERT ... RETURNING path in ProjectService.save_analysis.
+
+Run from backend/:  python -m benchmarks.bench_task_persistence
+"""
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from MilestoneX.database import Base
+from MilestoneX.models.project import Project
+from MilestoneX.models.task import Task
+from MilestoneX.services.project_service import ProjectService
+
+SIZES = [50, 500, 2000]
+TASKS_PER_EPIC = 10
+REPEAT = 5
+
+
+def fake_result(task_count: int) -> dict:
+    epics = []
+    for e in range(task_count // TASKS_PER_EPIC):
+        epics.append({
+            "epic_name": f"Epic {e}",
+            "description": "Generated epic description " * 8,
+            "tasks": [
+                {"task_name": f"Task {e}-{t}", "timeline_days": 1 + t % 5, "status": "Backlog", "sequence": t + 1}
+                for t in range(TASKS_PER_EPIC)
+            ]
+        })
+    return {"epics": epics, "milestones": [], "errors": {}}
+
+
+def legacy_save(db, srs_text: str, result: dict):
+    # The pre-bulk implementation, kept here as the baseline
+    project = Project(srs_text=srs_text)
+    db.add(project)
+    db.commit()
+    db.refresh(project)
+
+    for epic in result["epics"]:
+        for task in epic["tasks"]:
+            task_name = task.get("task_name", "").strip()
+            timeline = task.get("timeline_days", 0)
+            if not task_name or int(timeline) <= 0:
+                continue
+            db.add(Task(
+                project_id=project.id,
+                epic_name=epic["epic_name"],
+                description=epic["description"],
+                task_name=task_name,
+                timeline_days=int(timeline),
+                assigned_to=None,
+                status="pending"
+            ))
+    db.commit()
+
+    stored_tasks = db.query(Task).filter(Task.project_id == project.id).all()
+
+    epic_map = defaultdict(lambda: {"epic_name": "", "description": "", "tasks": []})
+    for t in stored_tasks:
+        epic_map[t.epic_name]["epic_name"] = t.epic_name
+        epic_map[t.epic_name]["description"] = t.description
+        epic_map[t.epic_name]["tasks"].append({
+            "task_name": t.task_name,
+            "timeline_days": t.timeline_days,
+            "status": t.status
+        })
+
+    return {"project_id": project.id, "epics": list(epic_map.values())}
+
+
+def timed(session_factory, fn, result) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        db = session_factory()
+        try:
+            started = time.perf_counter()
+            fn(db, "srs", result)
+            best = min(best, time.perf_counter() - started)
+        finally:
+            db.close()
+    return best
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(
+            f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            connect_args={"check_same_thread": False}
+        )
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        print(f"{'tasks':>8} {'legacy ms':>12} {'bulk ms':>12} {'speedup':>9}")
+        for size in SIZES:
+            result = fake_result(size)
+            legacy = timed(session_factory, legacy_save, result)
+            bulk = timed(session_factory, ProjectService.save_analysis, result)
+            print(f"{size:>8} {legacy * 1000:>12.2f} {bulk * 1000:>12.2f} {legacy / bulk:>8.1f}x")
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
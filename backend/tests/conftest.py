@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+
+# Settings are read at import time: point the LLM cache and the database at
+# throwaway locations before any application module is imported
+os.environ["LLM_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="milestonex-tests-"), "cache.db")
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.pop("MILESTONEX_DATABASE_URL", None)
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import AI_Backend.llm_client as llm_client
+from MilestoneX.database import make_engine
+from MilestoneX.migrations import run_migrations
+from MilestoneX.models.project import Project
+
+
+@pytest.fixture
+def db():
+    """
+    A session on a fresh, fully migrated in-memory database.
+    """
+    engine = make_engine("sqlite://")
+    run_migrations(engine)
+
+    session = sessionmaker(bind=engine, autoflush=False)()
+    session.add(Project(id=1, srs_text="srs"))
+    session.commit()
+
+    yield session
+
+    session.close()
+    engine.dispose()
+
+
+class FakeLLM:
+    """
+    Stands in for the Ollama AsyncClient: records every prompt and answers
+    with reply(prompt), JSON-encoded.
+    """
+
+    def __init__(self):
+        self.prompts = []
+        self.reply = lambda prompt: []
+
+    async def chat(self, model=None, format=None, messages=None, options=None, stream=False, **kwargs):
+        prompt = messages[0]["content"]
+        self.prompts.append(prompt)
+        return {"message": {"content": json.dumps(self.reply(prompt))}}
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    fake = FakeLLM()
+    monkeypatch.setattr(llm_client, "get_async_client", lambda: fake)
+    return fake
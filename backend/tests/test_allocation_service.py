@@ -0,0 +1,151 @@
+import asyncio
+import json
+import re
+
+from MilestoneX.services.allocation_service import AllocationService, CapacityLedger
+
+
+TEAM = [
+    {"name": "Asha", "role": "Backend", "skills": ["python", "api"], "availability_days": 5},
+    {"name": "Ben", "role": "Frontend", "skills": ["design", "ui"], "availability_days": 5},
+]
+
+
+def task(task_id, name, days, epic="Core"):
+    return {"id": task_id, "task_name": name, "timeline_days": days, "epic_name": epic}
+
+
+def prompt_tasks(prompt: str) -> list:
+    """
+    The task list a TaskAllocator prompt was built with.
+    """
+    match = re.search(r"Tasks to assign:\s*(\[.*?\])\s*Strict Instructions", prompt, re.S)
+    return json.loads(match.group(1))
+
+
+def allocate(tasks, mode, team=TEAM):
+    return asyncio.run(AllocationService.allocate(team, tasks, use_cache=False, mode=mode))
+
+
+def assigned_days(result) -> dict:
+    load = {}
+    for assignment in result["task_assignments"]:
+        if assignment["assigned_to"]:
+            name = assignment["assigned_to"]
+            load[name] = load.get(name, 0) + assignment["timeline_days"]
+    return load
+
+
+# ---------- CapacityLedger ----------
+
+def test_ledger_commits_what_fits_and_rejects_the_rest():
+    ledger = CapacityLedger(TEAM + [{"name": "Cy", "skills": [], "availability_days": None}])
+
+    rejected = asyncio.run(ledger.commit([
+        {"id": 1, "assigned_to": "Asha", "timeline_days": 3},
+        {"id": 2, "assigned_to": "Asha", "timeline_days": 3},    # over capacity
+        {"id": 3, "assigned_to": "Nobody", "timeline_days": 1},  # unknown member
+        {"id": 4, "assigned_to": "Cy", "timeline_days": 40},     # unlimited
+    ]))
+
+    assert [a["id"] for a in rejected] == [2, 3]
+    assert ledger.load == {"Asha": 3, "Ben": 0, "Cy": 40}
+    assert asyncio.run(ledger.snapshot()) == {"Asha": 2, "Ben": 5, "Cy": None}
+
+
+def test_ledger_snapshot_is_a_copy():
+    ledger = CapacityLedger(TEAM)
+
+    snapshot = asyncio.run(ledger.snapshot())
+    snapshot["Asha"] = 0
+
+    assert asyncio.run(ledger.snapshot())["Asha"] == 5
+
+
+# ---------- Allocation modes ----------
+
+def test_engine_mode_respects_availability(fake_llm):
+    tasks = [task(1, "python api", 4), task(2, "design ui", 4), task(3, "python db", 3)]
+
+    result = allocate(tasks, "engine")
+
+    assert [a["assigned_to"] for a in result["task_assignments"]] == ["Asha", "Ben", None]
+    assert result["unassigned"] == [3]
+    assert result["member_load"] == {"Asha": 4, "Ben": 4}
+    assert fake_llm.prompts == []
+
+
+def test_hybrid_keeps_overrides_that_fit_and_rejects_overbooking(fake_llm):
+    tasks = [task(1, "python api", 4), task(2, "design ui", 4), task(3, "python db", 3)]
+    # Ids come back as strings; swapping 1 and 2 fits, putting 3 on Asha does not
+    fake_llm.reply = lambda prompt: [
+        {"id": "1", "assigned_to": "Ben"},
+        {"id": "2", "assigned_to": "Asha"},
+        {"id": "3", "assigned_to": "Asha"},
+    ]
+
+    result = allocate(tasks, "hybrid")
+
+    assert [a["assigned_to"] for a in result["task_assignments"]] == ["Ben", "Asha", None]
+    assert result["unassigned"] == [3]
+    assert result["member_load"] == assigned_days(result) == {"Asha": 4, "Ben": 4}
+
+
+def test_hybrid_ignores_unknown_members_and_ids(fake_llm):
+    tasks = [task(1, "python api", 2), task(2, "design ui", 2)]
+    fake_llm.reply = lambda prompt: [
+        {"id": 1, "assigned_to": "Mallory"},
+        {"id": 99, "assigned_to": "Ben"},
+        {"id": "not a number", "assigned_to": "Ben"},
+    ]
+
+    result = allocate(tasks, "hybrid")
+
+    assert [a["assigned_to"] for a in result["task_assignments"]] == ["Asha", "Ben"]
+
+
+def test_sharded_assigns_every_task_once_within_capacity(fake_llm):
+    team = [{**member, "availability_days": 20} for member in TEAM]
+    tasks = [task(i, f"python api {i}", 2, epic=f"E{i % 3}") for i in range(1, 16)]
+
+    # The model answers for its shard, with string ids, a duplicate and an
+    # id from outside the shard; everything past the capacity is dropped
+    def reply(prompt):
+        shard = prompt_tasks(prompt)
+        answer = [{"id": str(t["id"]), "assigned_to": "Asha"} for t in shard]
+        return answer + answer[:1] + [{"id": 999, "assigned_to": "Ben"}]
+
+    fake_llm.reply = reply
+
+    result = allocate(tasks, "sharded", team=team)
+
+    assert [a["id"] for a in result["task_assignments"]] == [t["id"] for t in tasks]
+    assert result["shards"] == 3
+    assert result["unassigned"] == []
+
+    load = assigned_days(result)
+    assert load == result["member_load"]
+    assert all(days <= 20 for days in load.values())
+    assert sum(load.values()) == 30
+
+
+def test_llm_mode_sends_one_prompt_when_it_fits(fake_llm):
+    tasks = [task(1, "python api", 2), task(2, "design ui", 2)]
+    fake_llm.reply = lambda prompt: [{"id": 1, "assigned_to": "Asha"}, {"id": 2, "assigned_to": "Ben"}]
+
+    result = allocate(tasks, "llm")
+
+    assert len(fake_llm.prompts) == 1
+    assert AllocationService.extract_assignments(result)[1]["assigned_to"] == "Ben"
+
+
+def test_llm_mode_shards_a_prompt_that_would_overflow_the_context(fake_llm):
+    team = [{**member, "availability_days": 500} for member in TEAM]
+    tasks = [task(i, f"python api endpoint number {i}", 2, epic=f"E{i // 15}") for i in range(120)]
+
+    result = allocate(tasks, "llm", team=team)
+
+    assert result["shards"] == 8
+    assert len(fake_llm.prompts) == 8
+    assert all(len(prompt_tasks(prompt)) <= 20 for prompt in fake_llm.prompts)
+    assert len(result["task_assignments"]) == 120
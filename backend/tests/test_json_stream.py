@@ -0,0 +1,48 @@
+import json
+
+from AI_Backend.json_stream import IncrementalEpicParser
+
+
+EPICS = [
+    {"epic_name": "Auth", "description": "Log in {and} out", "tasks": [{"task_name": "Login \"form\""}]},
+    {"epic_name": "Billing", "description": "Pay [monthly]", "tasks": []},
+]
+
+
+def feed_all(text: str, step: int = 1) -> list:
+    parser = IncrementalEpicParser()
+    epics = []
+    for i in range(0, len(text), step):
+        epics.extend(parser.feed(text[i:i + step]))
+    return epics
+
+
+def test_epics_are_emitted_as_soon_as_they_close():
+    parser = IncrementalEpicParser()
+    text = json.dumps(EPICS)
+    first_end = text.index("}]}") + 3
+
+    assert parser.feed(text[:first_end]) == [EPICS[0]]
+    assert parser.feed(text[first_end:]) == [EPICS[1]]
+
+
+def test_char_by_char_matches_a_single_feed():
+    text = json.dumps(EPICS, indent=2)
+
+    assert feed_all(text) == feed_all(text, step=len(text)) == EPICS
+
+
+def test_wrapper_object_and_leading_prose():
+    text = "Here is the plan:\n```json\n" + json.dumps({"epics": EPICS}) + "\n```"
+
+    assert feed_all(text, step=7) == EPICS
+
+
+def test_bare_epic_object():
+    assert feed_all(json.dumps(EPICS[0]), step=5) == [EPICS[0]]
+
+
+def test_invalid_epic_is_dropped():
+    text = '[{"epic_name": "Broken", "tasks": [,]}, ' + json.dumps(EPICS[1]) + "]"
+
+    assert feed_all(text, step=3) == [EPICS[1]]
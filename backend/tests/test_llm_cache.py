@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+import AI_Backend.llm_cache as llm_cache
+from AI_Backend.llm_cache import LLMCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache.time, "time", clock)
+    return clock
+
+
+def make_cache(tmp_path, max_entries=100, max_bytes=10_000, ttl_seconds=60):
+    return LLMCache(str(tmp_path / "cache.db"), max_entries, max_bytes, ttl_seconds)
+
+
+def test_round_trip_and_counters(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.set("a", {"epics": [1, 2]})
+
+    assert cache.get("a") == {"epics": [1, 2]}
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_by_entry_count(tmp_path, clock):
+    cache = make_cache(tmp_path, max_entries=2)
+
+    cache.set("a", 1)
+    clock.now += 1
+    cache.set("b", 2)
+    clock.now += 1
+    cache.get("a")            # b is now least recently used
+    clock.now += 1
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_lru_eviction_by_size(tmp_path, clock):
+    cache = make_cache(tmp_path, max_bytes=25)
+
+    for key in ("a", "b", "c"):
+        cache.set(key, "x" * 8)   # 10 bytes of JSON each
+        clock.now += 1
+
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 2
+
+
+def test_ttl_expiry(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl_seconds=60)
+    cache.set("a", 1)
+
+    clock.now += 59
+    assert cache.get("a") == 1
+
+    clock.now += 2
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_expired_entries_are_purged_on_write(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl_seconds=60)
+    cache.set("old", 1)
+
+    clock.now += 61
+    cache.set("new", 2)
+
+    assert cache.stats()["entries"] == 1
+
+
+def test_async_round_trip(tmp_path, clock):
+    cache = make_cache(tmp_path)
+
+    async def run():
+        await cache.aset("a", [1])
+        return await cache.aget("a")
+
+    assert asyncio.run(run()) == [1]
@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import select
+
+from MilestoneX.models.task import Task, RETIRED_STATUS
+from MilestoneX.services.schedule_service import ScheduleService
+
+
+def add_chain(db):
+    """
+    a(3) -> b(2) -> c(1), and d(4) on its own; returns {name: id}.
+    """
+    ids = {}
+    for name, days in (("a", 3), ("b", 2), ("c", 1), ("d", 4)):
+        task = Task(project_id=1, epic_name="E", task_name=name, timeline_days=days, status="pending")
+        db.add(task)
+        db.flush()
+        ids[name] = task.id
+
+    ScheduleService.insert_edges(db, 1, [(ids["b"], ids["a"]), (ids["c"], ids["b"])])
+    ScheduleService.reschedule(db, 1)
+    db.commit()
+
+    return ids
+
+
+def days(db, ids) -> dict:
+    rows = db.execute(select(Task.id, Task.start_day, Task.finish_day)).all()
+    by_id = {task_id: (start, finish) for task_id, start, finish in rows}
+    return {name: by_id[task_id] for name, task_id in ids.items()}
+
+
+def test_full_reschedule_follows_dependencies(db):
+    ids = add_chain(db)
+
+    assert days(db, ids) == {"a": (0, 3), "b": (3, 5), "c": (5, 6), "d": (0, 4)}
+
+
+def test_incremental_reschedule_moves_descendants_only(db):
+    ids = add_chain(db)
+
+    # A stale row outside the changed subgraph must be left alone
+    db.get(Task, ids["d"]).start_day = 99
+    db.get(Task, ids["b"]).timeline_days = 5
+    db.flush()
+
+    moved = ScheduleService.reschedule(db, 1, [ids["b"]])
+    db.commit()
+
+    assert moved == 2
+    assert days(db, ids) == {"a": (0, 3), "b": (3, 8), "c": (8, 9), "d": (99, 4)}
+
+
+def test_retired_predecessor_releases_its_successors(db):
+    ids = add_chain(db)
+
+    db.get(Task, ids["a"]).status = RETIRED_STATUS
+    db.flush()
+
+    ScheduleService.reschedule(db, 1, [ids["a"]])
+    db.commit()
+
+    schedule = days(db, ids)
+    assert schedule["b"] == (0, 2)
+    assert schedule["c"] == (2, 3)
+
+
+def test_unscheduled_task_triggers_full_recompute(db):
+    ids = add_chain(db)
+
+    task = Task(project_id=1, epic_name="E", task_name="e", timeline_days=2, status="pending")
+    db.add(task)
+    db.flush()
+    ScheduleService.insert_edges(db, 1, [(task.id, ids["c"])])
+
+    # Only c is reported as changed, yet e has never been scheduled
+    ScheduleService.reschedule(db, 1, [ids["c"]])
+    db.commit()
+
+    assert db.get(Task, task.id).start_day == 6
+
+
+def test_cycles_are_detected():
+    assert ScheduleService.creates_cycle([(2, 1), (3, 2)], 1, 3)
+    assert not ScheduleService.creates_cycle([(2, 1), (3, 2)], 3, 1)
+
+    with pytest.raises(ValueError):
+        ScheduleService.compute({1: 1, 2: 1}, [(1, 2), (2, 1)])
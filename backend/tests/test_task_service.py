@@ -0,0 +1,71 @@
+import pytest
+
+from MilestoneX.models.task import Task
+from MilestoneX.services.task_service import TaskService, TASK_FIELDS
+
+
+def add_tasks(db, count):
+    for i in range(count):
+        db.add(Task(
+            project_id=1,
+            epic_name=f"E{i % 2}",
+            task_name=f"task {i}",
+            timeline_days=1,
+            status="done" if i % 3 == 0 else "pending",
+            assigned_to="Asha" if i % 2 else None
+        ))
+    db.commit()
+
+
+def pages(db, limit, **filters):
+    """
+    Walks list_query the way the endpoint does; returns the id of every page.
+    """
+    fields = TaskService.parse_fields("id,task_name")
+    cursor = None
+    result = []
+
+    while True:
+        rows = db.execute(TaskService.list_query(1, fields, cursor=cursor, limit=limit, **filters)).all()
+        page = rows[:limit]
+        result.append([row.id for row in page])
+        if len(rows) <= limit:
+            return result
+        cursor = page[-1].id
+
+
+def test_keyset_pages_cover_every_task_once_in_order(db):
+    add_tasks(db, 23)
+
+    result = pages(db, limit=5)
+
+    assert [len(page) for page in result] == [5, 5, 5, 5, 3]
+    ids = [task_id for page in result for task_id in page]
+    assert ids == sorted(ids) and len(set(ids)) == 23
+
+
+def test_exact_multiple_of_the_limit_has_no_empty_trailing_page(db):
+    add_tasks(db, 10)
+
+    assert [len(page) for page in pages(db, limit=5)] == [5, 5]
+
+
+def test_filters_apply_across_pages(db):
+    add_tasks(db, 23)
+
+    ids = [task_id for page in pages(db, limit=3, status="pending", epic_name="E1") for task_id in page]
+    expected = [
+        task.id for task in db.query(Task).order_by(Task.id)
+        if task.status == "pending" and task.epic_name == "E1"
+    ]
+
+    assert ids == expected
+    assert all(db.get(Task, task_id).assigned_to == "Asha" for task_id in ids)
+
+
+def test_parse_fields():
+    assert TaskService.parse_fields(None) == list(TASK_FIELDS)
+    assert TaskService.parse_fields("status, id,task_name,status") == ["id", "status", "task_name"]
+
+    with pytest.raises(ValueError):
+        TaskService.parse_fields("id,password")